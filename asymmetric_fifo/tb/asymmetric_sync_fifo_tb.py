@@ -1,14 +1,25 @@
+import  os
 import  cocotb
-from    cocotb.triggers import Timer, RisingEdge, Join
+from    cocotb.triggers import Timer, RisingEdge
 from    cocotb.clock    import Clock
-from    random          import randint
+from    width_model     import compare_streams
+from    stimulus        import Stimulus
+from    drivers         import ClockDomain, StreamSource, StreamSink
+from    traffic         import from_env
+from    benchmark       import Benchmark
+import  simspeed
+import  profiler
+from    drain           import drain
+import  report
+from    report          import Reporter
 
 # Constants
 c_CLK_PERIOD_RD = 10 #ns
+simspeed.track("clk")
+profiler.install()
 
 #========================================================================================#
-async def write_data(dut, number):
-    i = 0
+def write_data(dut, number):
     global input_data
 
     try :
@@ -16,42 +27,49 @@ async def write_data(dut, number):
     except:
         g_INPUT_WIDTH = 128
 
-    try :
-        g_OUTPUT_WIDTH = dut.g_OUTPUT_WIDTH.value
-    except:
-        g_OUTPUT_WIDTH = 32
-
+    # wr_en only while the FIFO is not full, a word counts when full is still low on the edge
     input_data = []
-    await RisingEdge(dut.clk)
-    done = 0
-    while done == 0:
-        if int(dut.full) == 0:
-            random_num = randint(0,2**int(g_INPUT_WIDTH)-1)
-            dut.wr_data.value = random_num
-            dut.wr_en.value = 1
-            i = i+1
-        else:
-            dut.wr_en.value = 0
-        await RisingEdge(dut.clk)
-        if int(dut.full) == 0 and dut.wr_en.value == 1:
-            input_data.append(random_num)
-        if i == number:
-            done = 1
-    dut.wr_en.value = 0
-    return 0  
+    words = Stimulus(int(g_INPUT_WIDTH), number, log=dut._log)
+    traffic = from_env("SOURCE_TRAFFIC", "always")
+    return StreamSource(dut.wr_data, dut.wr_en, words, ready=dut.full, ready_level=0, gate=dut.full, gate_level=0, pattern=traffic, on_accept=input_data.append)
 # ==============================================================================
-async def random_rd_en(dut):
-    while True:
-        await RisingEdge(dut.clk)
-        dut.rd_en.value = randint(0,1)
+def random_rd_en(dut, data):
+    # rd_en shaped by SINK_TRAFFIC and rd_data capture on the same clock coroutine
+    traffic = from_env("SINK_TRAFFIC", "bernoulli:duty=0.5")
+    return StreamSink(dut.rd_data, dut.rd_valid, data.append, ready=dut.rd_en, pattern=traffic)
 #========================================================================================#
-async def read_data(dut,data):
-    while True:
-        await RisingEdge(dut.clk)
-        if int(dut.rd_valid.value) == 1 and int(dut.rd_en.value) == 1:
-            rd_data = int(dut.rd_data.value)
-            data += [rd_data]
-        
+def read_data(dut,data):
+    return StreamSink(dut.rd_data, dut.rd_valid, data.append, ready=dut.rd_en)
+
+#========================================================================================#
+def check_data(dut, c_INPUT_WIDTH, c_OUTPUT_WIDTH, output_data):
+    # Regroup input and output streams to the wider width and compare them at once
+    result = compare_streams(input_data, c_INPUT_WIDTH, output_data, c_OUTPUT_WIDTH, max_errors=report.max_errors(), context=report.context())
+    log = Reporter(dut._log)
+    if log.tracing:
+        for index, word in enumerate(output_data):
+            log.trace("Output word %d: %s", index, hex(word))
+    # First mismatches with the words around them, each word shown once
+    reported = set(index for index, _, _ in result.mismatches)
+    shown = -1
+    for window in result.windows:
+        for index, expected, received in window:
+            if index <= shown:
+                continue
+            shown = index
+            if index in reported:
+                log.error("Word %d: input data %s differs from ouput data %s", index, hex(expected), hex(received))
+            else:
+                log.word("check", index, expected, received)
+    # Words past the end of the shorter stream
+    for index, expected, received in result.unmatched:
+        if received is None:
+            log.error("Word %d: input data %s missing from the output", index, hex(expected))
+        else:
+            log.error("Word %d: output data %s not in the input", index, hex(received))
+    assert result.received == result.expected, "%d output words for %d input words" % (result.received, result.expected)
+    assert result.errors == 0, "%d of %d words differ" % (result.errors, result.compared)
+    log.summary("All data is correct! (%d words)", result.compared)
 #========================================================================================#
 @cocotb.test(skip = False, stage = 1, timeout_time=10000, timeout_unit='us')
 def run_multiple_data_test(dut):
@@ -68,10 +86,6 @@ def run_multiple_data_test(dut):
 
     c_OUTPUT_WIDTH = int(g_OUTPUT_WIDTH)
     c_INPUT_WIDTH = int(g_INPUT_WIDTH)
-    if c_INPUT_WIDTH <= c_OUTPUT_WIDTH:
-        up_or_down = True
-    else:
-        up_or_down = False
     # Setting up clocks
     clk_rd_100MHz = Clock(dut.clk, c_CLK_PERIOD_RD, units='ns')
     cocotb.start_soon(clk_rd_100MHz.start(start_high=False))
@@ -84,9 +98,9 @@ def run_multiple_data_test(dut):
     dut.rd_en.value = 0
 
     output_data = []
+    clk = ClockDomain(dut.clk)
     yield RisingEdge(dut.clk)
-    rand_rd_en = cocotb.start_soon(random_rd_en(dut))
-    out_data = cocotb.start_soon(read_data(dut,output_data))
+    clk.add(random_rd_en(dut,output_data))
 
     # Deactivate reset
     yield RisingEdge(dut.clk)
@@ -94,33 +108,18 @@ def run_multiple_data_test(dut):
 
     # Gen data
     yield RisingEdge(dut.clk)
-    gen_data = cocotb.start_soon(write_data(dut,10000))
+    gen_data = clk.add(write_data(dut,10000))
 
-    yield Join(gen_data)
+    yield gen_data.wait()
 
-    yield Timer(10, units='us')
+    # Until every whole output word is read and rd_valid is low
+    yield drain(dut.clk, lambda: gen_data.count * c_INPUT_WIDTH // c_OUTPUT_WIDTH, lambda: len(output_data), idle=[(dut.rd_valid, 0)], log=dut._log)
     yield RisingEdge(dut.clk)
-    out_data.kill()
-    rand_rd_en.kill()
+    clk.stop()
     dut.rd_en.value = 0
     yield RisingEdge(dut.clk)
     # Compare
-    if up_or_down == True:
-        for i in range(len(output_data)):
-            input_number = 0
-            for k in range(0,c_OUTPUT_WIDTH,c_INPUT_WIDTH):
-                input_number = input_number + (int(input_data[(i*int(c_OUTPUT_WIDTH/c_INPUT_WIDTH))+int(k/c_INPUT_WIDTH)]) << k)
-            assert input_number == output_data[i], "Input data: %s differs from ouput data %s" % (hex(input_number),hex(output_data[i]))
-            dut._log.info("Input data: %s = Ouput data %s" % (hex(input_number),hex(output_data[i])))
-        dut._log.info("All data is correct!")
-    else:
-        for i in range(int(len(output_data)/int(c_INPUT_WIDTH/c_OUTPUT_WIDTH))):
-            output_number = 0
-            for k in range(0,c_INPUT_WIDTH,c_OUTPUT_WIDTH):
-                output_number = output_number + (int(output_data[(i*int(c_INPUT_WIDTH/c_OUTPUT_WIDTH))+int(k/c_OUTPUT_WIDTH)]) << k)
-            assert output_number == input_data[i], "Input data: %s differs from ouput data %s" % (hex(input_data[i]),hex(output_number))
-            dut._log.info("Input data: %s = Ouput data %s" % (hex(input_data[i]),hex(output_number)))
-        dut._log.info("All data is correct!")
+    check_data(dut, c_INPUT_WIDTH, c_OUTPUT_WIDTH, output_data)
 #========================================================================================#        
 @cocotb.test(skip = False, stage = 2, timeout_time=1000, timeout_unit='us')
 def run_one_data_test(dut):
@@ -138,10 +137,8 @@ def run_one_data_test(dut):
     c_OUTPUT_WIDTH = int(g_OUTPUT_WIDTH)
     c_INPUT_WIDTH = int(g_INPUT_WIDTH)
     if c_INPUT_WIDTH <= c_OUTPUT_WIDTH:
-        up_or_down = True
         ratio = int(c_OUTPUT_WIDTH/c_INPUT_WIDTH)
     else:
-        up_or_down = False
         ratio = int(c_INPUT_WIDTH/c_OUTPUT_WIDTH)
     # Setting up clocks
     clk_rd_100MHz = Clock(dut.clk, c_CLK_PERIOD_RD, units='ns')
@@ -155,9 +152,9 @@ def run_one_data_test(dut):
     dut.rd_en.value = 0
 
     output_data = []
+    clk = ClockDomain(dut.clk)
     yield RisingEdge(dut.clk)
-    rand_rd_en = cocotb.start_soon(random_rd_en(dut))
-    out_data = cocotb.start_soon(read_data(dut,output_data))
+    clk.add(random_rd_en(dut,output_data))
 
     # Deactivate reset
     yield RisingEdge(dut.clk)
@@ -165,33 +162,18 @@ def run_one_data_test(dut):
 
     # Gen data
     yield RisingEdge(dut.clk)
-    gen_data = cocotb.start_soon(write_data(dut,ratio))
+    gen_data = clk.add(write_data(dut,ratio))
 
-    yield Join(gen_data)
+    yield gen_data.wait()
 
-    yield Timer(10, units='us')
+    # Until every whole output word is read and rd_valid is low
+    yield drain(dut.clk, lambda: gen_data.count * c_INPUT_WIDTH // c_OUTPUT_WIDTH, lambda: len(output_data), idle=[(dut.rd_valid, 0)], log=dut._log)
     yield RisingEdge(dut.clk)
-    out_data.kill()
-    rand_rd_en.kill()
+    clk.stop()
     dut.rd_en.value = 0
     yield RisingEdge(dut.clk)
     # Compare
-    if up_or_down == True:
-        for i in range(len(output_data)):
-            input_number = 0
-            for k in range(0,c_OUTPUT_WIDTH,c_INPUT_WIDTH):
-                input_number = input_number + (int(input_data[(i*int(c_OUTPUT_WIDTH/c_INPUT_WIDTH))+int(k/c_INPUT_WIDTH)]) << k)
-            assert input_number == output_data[i], "Input data: %s differs from ouput data %s" % (hex(input_number),hex(output_data[i]))
-            dut._log.info("Input data: %s = Ouput data %s" % (hex(input_number),hex(output_data[i])))
-        dut._log.info("All data is correct!")
-    else:
-        for i in range(int(len(output_data)/int(c_INPUT_WIDTH/c_OUTPUT_WIDTH))):
-            output_number = 0
-            for k in range(0,c_INPUT_WIDTH,c_OUTPUT_WIDTH):
-                output_number = output_number + (int(output_data[(i*int(c_INPUT_WIDTH/c_OUTPUT_WIDTH))+int(k/c_OUTPUT_WIDTH)]) << k)
-            assert output_number == input_data[i], "Input data: %s differs from ouput data %s" % (hex(input_data[i]),hex(output_number))
-            dut._log.info("Input data: %s = Ouput data %s" % (hex(input_data[i]),hex(output_number)))
-        dut._log.info("All data is correct!")
+    check_data(dut, c_INPUT_WIDTH, c_OUTPUT_WIDTH, output_data)
 #========================================================================================#
 @cocotb.test(skip = False, stage = 3, timeout_time=1000, timeout_unit='us')
 def run_test_flags(dut):
@@ -215,17 +197,63 @@ def run_test_flags(dut):
     # Gen data
     yield RisingEdge(dut.clk)
     output_data = []
-    gen_data = cocotb.start_soon(write_data(dut,10000))
+    clk = ClockDomain(dut.clk)
+    clk.add(write_data(dut,10000))
     yield RisingEdge(dut.full)
     assert dut.full.value == 1, "Error! Full must be 1"
 
-    gen_data.kill()
+    clk.stop()
     yield RisingEdge(dut.clk)
     dut.wr_en.value = 0
     dut.rd_en.value = 1
 
-    store_data = cocotb.start_soon(read_data(dut,output_data))
+    ClockDomain(dut.clk).add(read_data(dut,output_data))
     yield RisingEdge(dut.empty)
     assert dut.empty.value == 1, "Error! Empty must be 1"
 
     yield Timer(500, units='ns')
+#========================================================================================#
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 4)
+def benchmark(dut):
+    global input_data
+    # Traffic and length set by runner.run_benchmark()
+    c_INPUT_WIDTH = int(dut.g_INPUT_WIDTH.value)
+    c_OUTPUT_WIDTH = int(dut.g_OUTPUT_WIDTH.value)
+    # Whole number of output words
+    ratio = max(1, c_OUTPUT_WIDTH // c_INPUT_WIDTH)
+    words = -(-int(os.getenv("BENCHMARK_WORDS", 2000)) // ratio) * ratio
+    words_out = words * c_INPUT_WIDTH // c_OUTPUT_WIDTH
+
+    # Setting up clocks
+    clk_rd_100MHz = Clock(dut.clk, c_CLK_PERIOD_RD, units='ns')
+    cocotb.start_soon(clk_rd_100MHz.start(start_high=False))
+
+    # Setting init values
+    dut.rst.value = 1
+    dut.wr_en.value = 0
+    dut.wr_data.value = 0
+    dut.rd_en.value = 0
+    yield RisingEdge(dut.clk)
+    yield RisingEdge(dut.clk)
+    dut.rst.value = 0
+    yield RisingEdge(dut.clk)
+
+    bench = Benchmark(c_INPUT_WIDTH, c_OUTPUT_WIDTH, c_CLK_PERIOD_RD, c_CLK_PERIOD_RD)
+    input_data = []
+    output_data = []
+    def accepted(word):
+        input_data.append(word)
+        bench.input()
+    def received(word):
+        output_data.append(word)
+        bench.output()
+
+    clk = ClockDomain(dut.clk)
+    clk.add(StreamSource(dut.wr_data, dut.wr_en, Stimulus(c_INPUT_WIDTH, words, log=dut._log), ready=dut.full, ready_level=0, gate=dut.full, gate_level=0, pattern=from_env("SOURCE_TRAFFIC", "always"), on_accept=accepted))
+    sink = clk.add(StreamSink(dut.rd_data, dut.rd_valid, received, ready=dut.rd_en, pattern=from_env("SINK_TRAFFIC", "always"), count=words_out))
+
+    yield sink.wait()
+    clk.stop()
+
+    check_data(dut, c_INPUT_WIDTH, c_OUTPUT_WIDTH, output_data)
+    bench.write(log=dut._log)
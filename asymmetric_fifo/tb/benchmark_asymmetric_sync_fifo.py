@@ -0,0 +1,32 @@
+import pytest
+import os
+import glob
+import sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_benchmark, BENCHMARK_TRAFFIC, SIMULATORS
+
+vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
+
+@pytest.mark.parametrize("source, sink", BENCHMARK_TRAFFIC)
+@pytest.mark.parametrize(
+    "parameters", [
+                    {"g_input_width": "32",  "g_output_width": "32",  "g_depth": "64"},
+                    {"g_input_width": "32",  "g_output_width": "128", "g_depth": "64"},
+                    {"g_input_width": "128", "g_output_width": "32",  "g_depth": "64"}
+                   ]
+)
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_benchmark_asymmetric_sync_fifo(parameters, source, sink):
+    run_benchmark(
+        vhdl_sources=vhdl_src,                          # sources
+        toplevel="asymmetric_sync_fifo",                # top level HDL
+        module="asymmetric_sync_fifo_tb",               # name of cocotb test module
+        ip="asymmetric_fifo",
+        parameters=parameters,
+        source=source,
+        sink=sink
+    )
@@ -1,80 +1,41 @@
 import pytest
 import os
 import glob
-from cocotb_test.simulator import run
+import sys
 
 current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_sim, SIMULATORS
+from param_space import ParameterSpace
+
 vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
 
-@pytest.mark.parametrize(
-    "parameters", [
-                    {"g_input_width": "2",   "g_output_width": "128", "g_depth": "64"}, 
-                    {"g_input_width": "2",   "g_output_width": "64",  "g_depth": "64"}, 
-                    {"g_input_width": "2",   "g_output_width": "32",  "g_depth": "64"}, 
-                    {"g_input_width": "2",   "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "2",   "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "2",   "g_output_width": "4",   "g_depth": "64"}, 
-                    {"g_input_width": "2",   "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "128", "g_depth": "64"}, 
-                    {"g_input_width": "4",   "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "4",   "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "8",   "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "16",  "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "16",  "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "8",   "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "4",   "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "2",   "g_depth": "64"},
-                    {"g_input_width": "256", "g_output_width": "128", "g_depth": "64"},
-                    {"g_input_width": "128", "g_output_width": "256", "g_depth": "64"},
-                    {"g_input_width": "32",  "g_output_width": "256", "g_depth": "64"},
-                    {"g_input_width": "256", "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "256", "g_output_width": "64",  "g_depth": "64"},
-                    {"g_input_width": "64",  "g_output_width": "256", "g_depth": "64"},
-                    {"g_input_width": "96",  "g_output_width": "32",  "g_depth": "64"},
-                    {"g_input_width": "192", "g_output_width": "64",  "g_depth": "64"}
-                   ]
+WIDTHS = [2, 4, 8, 16, 32, 64, 128]
+
+# Every input/output width pair, plus wider and non power of 2 ratios
+PARAMETER_SPACE = ParameterSpace(
+    axes={"g_input_width": WIDTHS, "g_output_width": WIDTHS, "g_depth": [64]},
+    constraint=lambda p: max(p["g_input_width"], p["g_output_width"]) % min(p["g_input_width"], p["g_output_width"]) == 0,
+    include=[
+        {"g_input_width": "256", "g_output_width": "128", "g_depth": "64"},
+        {"g_input_width": "128", "g_output_width": "256", "g_depth": "64"},
+        {"g_input_width": "32",  "g_output_width": "256", "g_depth": "64"},
+        {"g_input_width": "256", "g_output_width": "32",  "g_depth": "64"},
+        {"g_input_width": "256", "g_output_width": "64",  "g_depth": "64"},
+        {"g_input_width": "64",  "g_output_width": "256", "g_depth": "64"},
+        {"g_input_width": "96",  "g_output_width": "32",  "g_depth": "64"},
+        {"g_input_width": "192", "g_output_width": "64",  "g_depth": "64"}
+    ]
 )
-@pytest.mark.skipif(os.getenv("SIM") != "ghdl", reason="")
+
+@pytest.mark.parametrize("parameters", PARAMETER_SPACE.expand())
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
 def test_asymmetric_sync_fifo(parameters):
-    run(
+    run_sim(
         vhdl_sources=vhdl_src,                          # sources
         toplevel="asymmetric_sync_fifo",                # top level HDL
         module="asymmetric_sync_fifo_tb",               # name of cocotb test module
-        toplevel_lang="vhdl",
-        parameters=parameters,
-        extra_env=parameters, 
-        sim_build="sim_build"
+        parameters=parameters
     )
\ No newline at end of file
@@ -0,0 +1,106 @@
+-------------------------------------------------------------------------------
+-- NAME:        async_fifo_soak.vhd
+-- DESCRPTION:  File-driven self-checking harness of async_fifo (soak runs)
+-------------------------------------------------------------------------------
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+--! Streams the words of g_DATA_FILE through async_fifo with the write and
+--! read activity of the pattern files, and checks them against the same
+--! file, without cocotb in the loop. done is set once the result file is
+--! written, and both clocks stop. Files are written by common/tb/soak.py.
+entity async_fifo_soak is
+  generic (
+    g_DATA_WIDTH         : positive := 32;
+    g_ADDR_WIDTH         : positive := 5;
+    g_WORDS              : natural  := 1000;
+    g_WR_PERIOD_PS       : positive := 10000;
+    g_RD_PERIOD_PS       : positive := 4000;
+    g_DATA_FILE          : string   := "data.hex";
+    g_WRITE_PATTERN_FILE : string   := "write_pattern.hex";
+    g_READ_PATTERN_FILE  : string   := "read_pattern.hex";
+    g_RESULT_FILE        : string   := "soak.txt"
+  );
+  port (
+    done : out std_logic
+  );
+end entity;
+
+architecture behavioral of async_fifo_soak is
+
+  constant c_WR_PERIOD : time := g_WR_PERIOD_PS * 1 ps;
+  constant c_RD_PERIOD : time := g_RD_PERIOD_PS * 1 ps;
+
+  signal clk_wr     : std_logic := '0';
+  signal clk_rd     : std_logic := '0';
+  signal rst        : std_logic := '1';
+  signal finished   : std_logic;
+  signal inc_wr     : std_logic;
+  signal dat_wr     : std_logic_vector(g_DATA_WIDTH - 1 downto 0);
+  signal full       : std_logic;
+  signal inc_rd     : std_logic;
+  signal dat_rd     : std_logic_vector(g_DATA_WIDTH - 1 downto 0);
+  signal dat_valid  : std_logic;
+  signal written    : natural;
+
+begin
+
+  clk_wr <= not clk_wr after c_WR_PERIOD / 2 when finished /= '1' else clk_wr;
+  clk_rd <= not clk_rd after c_RD_PERIOD / 2 when finished /= '1' else clk_rd;
+  rst    <= '0' after 4 * c_WR_PERIOD + 4 * c_RD_PERIOD;
+  done   <= finished;
+
+  dut : entity work.async_fifo
+    generic map (
+      g_DATA_WIDTH => g_DATA_WIDTH,
+      g_ADDR_WIDTH => g_ADDR_WIDTH
+    )
+    port map (
+      i_CLK_WR     => clk_wr,
+      i_INC_WR     => inc_wr,
+      i_RST_WR     => rst,
+      i_DAT_WR     => dat_wr,
+      o_FULL_FLAG  => full,
+      i_CLK_RD     => clk_rd,
+      i_INC_RD     => inc_rd,
+      i_RST_RD     => rst,
+      o_DAT_RD     => dat_rd,
+      o_DAT_VALID  => dat_valid,
+      o_EMPTY_FLAG => open
+    );
+
+  source : entity work.soak_source
+    generic map (
+      g_WIDTH        => g_DATA_WIDTH,
+      g_WORDS        => g_WORDS,
+      g_DATA_FILE    => g_DATA_FILE,
+      g_PATTERN_FILE => g_WRITE_PATTERN_FILE
+    )
+    port map (
+      clk   => clk_wr,
+      rst   => rst,
+      full  => full,
+      data  => dat_wr,
+      valid => inc_wr,
+      count => written
+    );
+
+  sink : entity work.soak_sink
+    generic map (
+      g_WIDTH         => g_DATA_WIDTH,
+      g_WORDS         => g_WORDS,
+      g_EXPECTED_FILE => g_DATA_FILE,
+      g_PATTERN_FILE  => g_READ_PATTERN_FILE,
+      g_RESULT_FILE   => g_RESULT_FILE
+    )
+    port map (
+      clk   => clk_rd,
+      rst   => rst,
+      data  => dat_rd,
+      valid => dat_valid,
+      ready => inc_rd,
+      done  => finished
+    );
+
+end architecture;
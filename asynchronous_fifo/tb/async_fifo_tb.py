@@ -1,37 +1,36 @@
+import  os
 import  cocotb
-from    cocotb.triggers import Timer, RisingEdge, Join
-from    cocotb.result   import TestFailure
+from    cocotb.triggers import Timer, RisingEdge
 from    cocotb.clock    import Clock
-import  numpy           as np
+from    scoreboard      import Scoreboard
+from    stimulus        import Stimulus
+from    drivers         import ClockDomain, StreamSource, StreamSink
+from    traffic         import from_env
+from    benchmark       import Benchmark
+import  simspeed
+import  profiler
+from    drain           import drain
+import  transactions
 
 # Constants
 c_CLK_PERIOD_RD = 4 #ns
 c_CLK_PERIOD_WR = 10 #ns
+simspeed.track("i_CLK_RD")
+profiler.install()
 #========================================================================================#
-async def write_data(dut, data):
-    i = 0
-    await RisingEdge(dut.i_CLK_WR)
-    done = 0
-    while done == 0:
-        dut.i_INC_WR.value = 1
-        dut.i_DAT_WR.value = int(data[i])
-        await RisingEdge(dut.i_CLK_WR)
-        if int(dut.o_FULL_FLAG.value) == 0:
-            i = i+1
-        if i == len(data):
-            done = 1
-    dut.i_INC_WR.value = 0
-    return 0  
+def write_data(dut, data, scoreboard):
+    # i_INC_WR always high, each word held until o_FULL_FLAG is low on the edge
+    return StreamSource(dut.i_DAT_WR, dut.i_INC_WR, data, ready=dut.o_FULL_FLAG, ready_level=0, on_accept=scoreboard.push)
 #========================================================================================#
-async def read_data(dut,data):
-    await RisingEdge(dut.i_CLK_RD)
-    dut.i_INC_RD.value = 1
-    while True:
-        if int(dut.o_DAT_VALID) == 1 and dut.i_INC_RD.value == 1:
-            rd_data = int(dut.o_DAT_RD)
-            data += [rd_data]
-            dut._log.info("Data read: " +hex(rd_data))
-        await RisingEdge(dut.i_CLK_RD)
+def read_data(dut,scoreboard):
+    # Words read are only logged with TB_VERBOSITY=trace, by the scoreboard
+    return StreamSink(dut.o_DAT_RD, dut.o_DAT_VALID, scoreboard.check, ready=dut.i_INC_RD)
+#========================================================================================#
+def record(dut, wr_clk, rd_clk):
+    # Both ports and flags when TRACE_TRANSACTIONS=1
+    flags = {"full": dut.o_FULL_FLAG, "empty": dut.o_EMPTY_FLAG}
+    transactions.trace(wr_clk, "write", dut.i_INC_WR, dut.i_DAT_WR, ready=dut.o_FULL_FLAG, ready_level=0, state=flags)
+    transactions.trace(rd_clk, "read", dut.o_DAT_VALID, dut.o_DAT_RD, ready=dut.i_INC_RD, state=flags)
 #========================================================================================#
 @cocotb.test(skip = False, stage = 1)
 def fifo_tb(dut):
@@ -55,22 +54,76 @@ def fifo_tb(dut):
 
     # Gen data
     yield RisingEdge(dut.i_CLK_RD)
-    input_data = np.random.randint(0,2**32-1,10000)
-    output_data = []
-    gen_data = cocotb.start_soon(write_data(dut,input_data))
+    input_data = Stimulus(int(dut.g_DATA_WIDTH), 10000, log=dut._log)
+    scoreboard = Scoreboard(dut._log, expected=input_data.replay())
+    wr_clk = ClockDomain(dut.i_CLK_WR)
+    rd_clk = ClockDomain(dut.i_CLK_RD)
+    record(dut, wr_clk, rd_clk)
+    gen_data = wr_clk.add(write_data(dut,input_data,scoreboard))
     yield Timer(500, units='ns')
-    out_data = cocotb.start_soon(read_data(dut,output_data))
+    yield RisingEdge(dut.i_CLK_RD)
+    dut.i_INC_RD.value = 1
+    sink = rd_clk.add(read_data(dut,scoreboard))
 
-    yield Join(gen_data)
-    yield Timer(1, units='us')
-    out_data.kill()
+    yield gen_data.wait()
+    yield drain(dut.i_CLK_RD, lambda: gen_data.count, lambda: sink.count, idle=[(dut.o_DAT_VALID, 0)], log=dut._log)
+    rd_clk.stop()
+    wr_clk.stop()
     dut.i_INC_RD.value = 0
 
     # Compare
-    for h in range(len(output_data)):
-        if input_data[h] != output_data[h]:
-            raise TestFailure("Input data = " + str(hex(input_data[h])) +" != Output data = " + str(hex(output_data[h])))
-        else:
-            dut._log.info("Input data = " + str(hex(input_data[h])) +" = Output data = " + str(hex(output_data[h])))
+    scoreboard.finish()
     dut._log.info("All data is correct!")
+#========================================================================================#
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 2)
+def benchmark(dut):
+    # Clocks, write traffic and length set by runner.run_benchmark().
+    # The read port has no ready: i_INC_RD stays high and o_DAT_VALID is sampled.
+    c_PERIOD_WR = float(os.getenv("CLK_PERIOD_WR", c_CLK_PERIOD_WR)) #ns
+    c_PERIOD_RD = float(os.getenv("CLK_PERIOD_RD", c_CLK_PERIOD_RD)) #ns
+    words = int(os.getenv("BENCHMARK_WORDS", 2000))
+    width = int(dut.g_DATA_WIDTH)
+
+    # Setting up clocks
+    clk_rd = Clock(dut.i_CLK_RD, c_PERIOD_RD, units='ns')
+    cocotb.start_soon(clk_rd.start(start_high=False))
+    clk_wr = Clock(dut.i_CLK_WR, c_PERIOD_WR, units='ns')
+    cocotb.start_soon(clk_wr.start(start_high=False))
+
+    # Setting init values
+    dut.i_RST_WR.value = 1
+    dut.i_RST_RD.value = 1
+    dut.i_INC_RD.value = 0
+    dut.i_INC_WR.value = 0
+    dut.i_DAT_WR.value = 0
+
+    # Deactivate reset
+    yield RisingEdge(dut.i_CLK_WR)
+    dut.i_RST_WR.value = 0
+    dut.i_RST_RD.value = 0
+    yield RisingEdge(dut.i_CLK_RD)
+    dut.i_INC_RD.value = 1
+
+    bench = Benchmark(width, width, c_PERIOD_WR, c_PERIOD_RD)
+    input_data = Stimulus(width, words, log=dut._log)
+    scoreboard = Scoreboard(dut._log, expected=input_data.replay())
+    def accepted(word):
+        scoreboard.push()
+        bench.input()
+    def received(word):
+        scoreboard.check(word)
+        bench.output()
+
+    wr_clk = ClockDomain(dut.i_CLK_WR)
+    rd_clk = ClockDomain(dut.i_CLK_RD)
+    record(dut, wr_clk, rd_clk)
+    wr_clk.add(StreamSource(dut.i_DAT_WR, dut.i_INC_WR, input_data, ready=dut.o_FULL_FLAG, ready_level=0, pattern=from_env("SOURCE_TRAFFIC", "always"), on_accept=accepted))
+    sink = rd_clk.add(StreamSink(dut.o_DAT_RD, dut.o_DAT_VALID, received, ready=dut.i_INC_RD, count=words))
+
+    yield sink.wait()
+    wr_clk.stop()
+    rd_clk.stop()
+    dut.i_INC_RD.value = 0
 
+    scoreboard.finish()
+    bench.write(log=dut._log)
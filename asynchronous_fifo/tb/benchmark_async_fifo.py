@@ -0,0 +1,30 @@
+import pytest
+import os
+import glob
+import sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_benchmark, BENCHMARK_TRAFFIC, SIMULATORS
+
+vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
+
+# The read port has no ready, only the write traffic changes
+@pytest.mark.parametrize("source", sorted(set(source for source, sink in BENCHMARK_TRAFFIC)))
+@pytest.mark.parametrize(
+    "clocks", [{"CLK_PERIOD_WR": "10", "CLK_PERIOD_RD": "4"},
+               {"CLK_PERIOD_WR": "10", "CLK_PERIOD_RD": "10"},
+               {"CLK_PERIOD_WR": "4",  "CLK_PERIOD_RD": "10"}]
+)
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_benchmark_async_fifo(clocks, source):
+    run_benchmark(
+        vhdl_sources=vhdl_src,              # sources
+        toplevel="async_fifo",              # top level HDL
+        module="async_fifo_tb",             # name of cocotb test module
+        ip="asynchronous_fifo",
+        source=source,
+        extra_env=clocks
+    )
@@ -0,0 +1,32 @@
+import  pytest
+import  os
+import  glob
+import  sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from    runner  import run_soak, SIMULATORS
+
+vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd")) + [os.path.join(current_dir, "async_fifo_soak.vhd")]
+
+# Words per run, SOAK_WORDS=100000000 for an overnight run
+WORDS = int(os.getenv("SOAK_WORDS", 10 ** 6))
+
+@pytest.mark.parametrize("source, sink", [
+    ("always",              "always"),
+    ("bernoulli:duty=0.5",  "bursty:on=16,off=4"),
+])
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_soak_async_fifo(source, sink):
+    run_soak(
+        vhdl_sources=vhdl_src,          # sources
+        toplevel="async_fifo_soak",     # harness around async_fifo
+        width=32,
+        words=WORDS,
+        parameters={"g_DATA_WIDTH": 32, "g_ADDR_WIDTH": 5},
+        source=source,
+        sink=sink,
+        clock_ns=4                      # read clock, g_RD_PERIOD_PS
+    )
@@ -1,57 +1,49 @@
+import  os
 import  cocotb
-from    cocotb.triggers    import Timer, RisingEdge, Join
+from    cocotb.triggers    import Timer, RisingEdge
 from    cocotb.clock       import Clock
-from    random             import randint  
+from    scoreboard         import Scoreboard
+from    stimulus           import Stimulus
+from    drivers            import ClockDomain, PatternDriver, StreamSource, StreamSink
+from    traffic            import from_env
+from    benchmark          import Benchmark
+import  simspeed
+import  profiler
+from    drain              import drain
+from    multiconfig        import instances
+import  transactions
+import  stalls
+
+# Cycles counted on m_axis_aclk, at the period each test starts it with
+simspeed.track("m_axis_aclk")
+profiler.install()
 
 # ==============================================================================
-async def write_data(dut,number):
-    i = 0
-    global input_data
-    global in_init_time, in_last_time
-    input_data = []
-    init = 0
-    
-    await RisingEdge(dut.s_axis_aclk)
-    done = 0
-    while done == 0:
-        random_num = randint(0,2**int(dut.g_DATA_WIDTH)-1)
-        dut.s_axis_tdata.value = random_num
-        dut.s_axis_tvalid.value = randint(0,1)
-        await RisingEdge(dut.s_axis_aclk)
-        if  dut.s_axis_tready.value == 1 and dut.s_axis_tvalid.value == 1: 
-            input_data.append(random_num)
-            i = i+1
-            if init == 0:
-                in_init_time = cocotb.utils.get_sim_time('ns')
-                init = 1
-            in_last_time = cocotb.utils.get_sim_time('ns')
-        if i == number:
-            done = 1
-    dut.s_axis_tdata.value = 0
-    dut.s_axis_tvalid.value = 0
-    return 0  
+def write_data(dut, number, scoreboard):
+    # Random words, tvalid shaped by SOURCE_TRAFFIC, each word held until accepted
+    words = Stimulus(int(dut.g_DATA_WIDTH), number, log=dut._log)
+    traffic = from_env("SOURCE_TRAFFIC", "bernoulli:duty=0.5")
+    dut._log.info("s_axis traffic: %r" % traffic)
+    return StreamSource(dut.s_axis_tdata, dut.s_axis_tvalid, words, ready=dut.s_axis_tready, pattern=traffic, on_accept=scoreboard.push)
 # ==============================================================================
-async def random_tready(dut):
-    while True:
-        await RisingEdge(dut.m_axis_aclk)
-        dut.m_axis_tready.value = randint(0,1)
+def random_tready(dut):
+    # tready shaped by SINK_TRAFFIC
+    traffic = from_env("SINK_TRAFFIC", "bernoulli:duty=0.5")
+    dut._log.info("m_axis traffic: %r" % traffic)
+    return PatternDriver(dut.m_axis_tready, traffic)
 
 # ==============================================================================
-async def read_data(dut):
-    global output_data
-    output_data = []
-    global init_time, last_time
-    init = 0
-    await RisingEdge(dut.m_axis_aclk)
-    while True:
-        if dut.m_axis_tvalid.value == 1 and dut.m_axis_tready.value == 1:
-            output_data.append(dut.m_axis_tdata.value)
-            if init == 0:
-                init_time = cocotb.utils.get_sim_time('ns')
-                init = 1
-            last_time = cocotb.utils.get_sim_time('ns')
-        await RisingEdge(dut.m_axis_aclk)
-        
+def read_data(dut, scoreboard):
+    return StreamSink(dut.m_axis_tdata, dut.m_axis_tvalid, scoreboard.check, ready=dut.m_axis_tready)
+
+# ==============================================================================
+def record(dut, s_axis, m_axis, prefix=""):
+    # Cycles of both ports by stall class, and their transfers when TRACE_TRANSACTIONS=1
+    stalls.monitor(s_axis, prefix + "s_axis", dut.s_axis_tvalid, dut.s_axis_tready)
+    stalls.monitor(m_axis, prefix + "m_axis", dut.m_axis_tvalid, dut.m_axis_tready)
+    transactions.axis(s_axis, prefix + "write", (dut, "s_axis"))
+    transactions.axis(m_axis, prefix + "read", (dut, "m_axis"))
+
 # ==============================================================================
 @cocotb.test(skip = False, stage = 1)
 def axi_stream_fifo_slow_to_fast_tb(dut):
@@ -78,21 +70,24 @@ def axi_stream_fifo_slow_to_fast_tb(dut):
     dut.m_axis_aresetn.value = 1 
      
     yield Timer(2*c_CLK_PERIOD_WR, units='ns')
-    in_data = cocotb.start_soon(write_data(dut,10))
-    out_data = cocotb.start_soon(read_data(dut))
+    scoreboard = Scoreboard(dut._log)
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    record(dut, s_axis, m_axis)
+    source = s_axis.add(write_data(dut,10,scoreboard))
+    sink = m_axis.add(read_data(dut,scoreboard))
     yield Timer(50*c_CLK_PERIOD_WR, units='ns')
-    rand_tready = cocotb.start_soon(random_tready(dut))
+    m_axis.add(random_tready(dut))
 
-    yield Join(in_data)
+    yield source.wait()
 
-    yield Timer(10, units='us')
-    out_data.kill()
-    rand_tready.kill()
+    # Until every accepted word is out and tvalid is low
+    yield drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count, idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+    s_axis.stop()
+    m_axis.stop()
     dut.m_axis_tready.value = 0
 
-    for i in range(len(output_data)):
-        assert (input_data[i]) == output_data[i], "Input data: %s differs from ouput data %s" % (hex((input_data[i])),hex(output_data[i]))
-        dut._log.info("Input data: %s = Ouput data %s" % (hex((input_data[i])),hex(output_data[i])))
+    scoreboard.finish()
     dut._log.info("All data is correct!")
 
     # Reset procedure
@@ -109,29 +104,32 @@ def axi_stream_fifo_slow_to_fast_tb(dut):
     dut.m_axis_aresetn.value = 1
 
     yield Timer(2*c_CLK_PERIOD_WR, units='ns')
-    in_data = cocotb.start_soon(write_data(dut,5000))
-    out_data = cocotb.start_soon(read_data(dut))
+    scoreboard = Scoreboard(dut._log)
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    record(dut, s_axis, m_axis)
+    source = s_axis.add(write_data(dut,5000,scoreboard))
+    sink = m_axis.add(read_data(dut,scoreboard))
     yield Timer(50*c_CLK_PERIOD_WR, units='ns')
-    rand_tready = cocotb.start_soon(random_tready(dut))
+    m_axis.add(random_tready(dut))
 
-    yield Join(in_data)
+    yield source.wait()
 
-    yield Timer(10, units='us')
-    out_data.kill()
-    rand_tready.kill()
+    # Until every accepted word is out and tvalid is low
+    yield drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count, idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+    s_axis.stop()
+    m_axis.stop()
     dut.m_axis_tready.value = 0
 
-    for i in range(len(output_data)):
-        assert (input_data[i]) == output_data[i], "Input data: %s differs from ouput data %s" % (hex((input_data[i])),hex(output_data[i]))
-        dut._log.info("Input data: %s = Ouput data %s" % (hex((input_data[i])),hex(output_data[i])))
+    scoreboard.finish()
     dut._log.info("All data is correct!")
 
     # Check input Throughput
-    in_throughput = (len(input_data)*int(dut.g_DATA_WIDTH))/((in_last_time-in_init_time)*10**-9)/10**6
+    in_throughput = (source.count*int(dut.g_DATA_WIDTH))/((source.last_time-source.first_time)*10**-9)/10**6
     cocotb.log.info("Input Throughput: %f Mbps" % (in_throughput))
 
     # Check output Throughput
-    out_throughput = (len(output_data)*int(dut.g_DATA_WIDTH))/((last_time-init_time)*10**-9)/10**6
+    out_throughput = (sink.count*int(dut.g_DATA_WIDTH))/((sink.last_time-sink.first_time)*10**-9)/10**6
     cocotb.log.info("Output Throughput: %f Mbps" % (out_throughput))
 # ==============================================================================
 @cocotb.test(skip = False, stage = 1)
@@ -159,21 +157,24 @@ def axi_stream_fifo_fast_to_slow_tb(dut):
     dut.m_axis_aresetn.value = 1 
      
     yield Timer(2*c_CLK_PERIOD_WR, units='ns')
-    in_data = cocotb.start_soon(write_data(dut,10))
-    out_data = cocotb.start_soon(read_data(dut))
+    scoreboard = Scoreboard(dut._log)
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    record(dut, s_axis, m_axis)
+    source = s_axis.add(write_data(dut,10,scoreboard))
+    sink = m_axis.add(read_data(dut,scoreboard))
     yield Timer(50*c_CLK_PERIOD_WR, units='ns')
-    rand_tready = cocotb.start_soon(random_tready(dut))
+    m_axis.add(random_tready(dut))
 
-    yield Join(in_data)
+    yield source.wait()
 
-    yield Timer(10, units='us')
-    out_data.kill()
-    rand_tready.kill()
+    # Until every accepted word is out and tvalid is low
+    yield drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count, idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+    s_axis.stop()
+    m_axis.stop()
     dut.m_axis_tready.value = 0
 
-    for i in range(len(output_data)):
-        assert (input_data[i]) == output_data[i], "Input data: %s differs from ouput data %s" % (hex((input_data[i])),hex(output_data[i]))
-        dut._log.info("Input data: %s = Ouput data %s" % (hex((input_data[i])),hex(output_data[i])))
+    scoreboard.finish()
     dut._log.info("All data is correct!")
 
     # Reset procedure
@@ -190,27 +191,123 @@ def axi_stream_fifo_fast_to_slow_tb(dut):
     dut.m_axis_aresetn.value = 1
 
     yield Timer(2*c_CLK_PERIOD_WR, units='ns')
-    in_data = cocotb.start_soon(write_data(dut,5000))
-    out_data = cocotb.start_soon(read_data(dut))
+    scoreboard = Scoreboard(dut._log)
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    record(dut, s_axis, m_axis)
+    source = s_axis.add(write_data(dut,5000,scoreboard))
+    sink = m_axis.add(read_data(dut,scoreboard))
     yield Timer(50*c_CLK_PERIOD_WR, units='ns')
-    rand_tready = cocotb.start_soon(random_tready(dut))
+    m_axis.add(random_tready(dut))
 
-    yield Join(in_data)
+    yield source.wait()
 
-    yield Timer(10, units='us')
-    out_data.kill()
-    rand_tready.kill()
+    # Until every accepted word is out and tvalid is low
+    yield drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count, idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+    s_axis.stop()
+    m_axis.stop()
     dut.m_axis_tready.value = 0
 
-    for i in range(len(output_data)):
-        assert (input_data[i]) == output_data[i], "Input data: %s differs from ouput data %s" % (hex((input_data[i])),hex(output_data[i]))
-        dut._log.info("Input data: %s = Ouput data %s" % (hex((input_data[i])),hex(output_data[i])))
+    scoreboard.finish()
     dut._log.info("All data is correct!")
 
     # Check input Throughput
-    in_throughput = (len(input_data)*int(dut.g_DATA_WIDTH))/((in_last_time-in_init_time)*10**-9)/10**6
+    in_throughput = (source.count*int(dut.g_DATA_WIDTH))/((source.last_time-source.first_time)*10**-9)/10**6
     cocotb.log.info("Input Throughput: %f Mbps" % (in_throughput))
 
     # Check output Throughput
-    out_throughput = (len(output_data)*int(dut.g_DATA_WIDTH))/((last_time-init_time)*10**-9)/10**6
-    cocotb.log.info("Output Throughput: %f Mbps" % (out_throughput))
\ No newline at end of file
+    out_throughput = (sink.count*int(dut.g_DATA_WIDTH))/((sink.last_time-sink.first_time)*10**-9)/10**6
+    cocotb.log.info("Output Throughput: %f Mbps" % (out_throughput))
+# ==============================================================================
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 2)
+def benchmark(dut):
+    # Clocks, traffic and length set by runner.run_benchmark()
+    c_CLK_PERIOD_WR = float(os.getenv("CLK_PERIOD_WR", 10)) #ns
+    c_CLK_PERIOD_RD = float(os.getenv("CLK_PERIOD_RD", 10)) #ns
+    words = int(os.getenv("BENCHMARK_WORDS", 2000))
+    width = int(dut.g_DATA_WIDTH)
+
+    # Setting up clocks
+    s_axis_clk = Clock(dut.s_axis_aclk, c_CLK_PERIOD_WR, units='ns')
+    cocotb.start_soon(s_axis_clk.start(start_high=True))
+    m_axis_clk = Clock(dut.m_axis_aclk, c_CLK_PERIOD_RD, units='ns')
+    cocotb.start_soon(m_axis_clk.start(start_high=True))
+    # Setting init values
+    dut.s_axis_aresetn.value = 0
+    dut.m_axis_aresetn.value = 0
+    dut.s_axis_tdata.value = 0
+    dut.s_axis_tvalid.value = 0
+    dut.m_axis_tready.value = 0
+
+    # Resetn
+    yield Timer(2*c_CLK_PERIOD_WR, units='ns')
+    yield RisingEdge(dut.s_axis_aclk)
+    dut.s_axis_aresetn.value = 1
+    dut.m_axis_aresetn.value = 1
+    yield Timer(2*c_CLK_PERIOD_WR, units='ns')
+
+    bench = Benchmark(width, width, c_CLK_PERIOD_WR, c_CLK_PERIOD_RD)
+    scoreboard = Scoreboard(dut._log)
+    def accepted(word):
+        scoreboard.push(word)
+        bench.input()
+    def received(word):
+        scoreboard.check(word)
+        bench.output()
+
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    record(dut, s_axis, m_axis)
+    s_axis.add(StreamSource(dut.s_axis_tdata, dut.s_axis_tvalid, Stimulus(width, words, log=dut._log), ready=dut.s_axis_tready, pattern=from_env("SOURCE_TRAFFIC", "always"), on_accept=accepted))
+    sink = m_axis.add(StreamSink(dut.m_axis_tdata, dut.m_axis_tvalid, received, ready=dut.m_axis_tready, pattern=from_env("SINK_TRAFFIC", "always"), count=words))
+
+    yield sink.wait()
+    s_axis.stop()
+    m_axis.stop()
+
+    scoreboard.finish()
+    bench.write(log=dut._log, stalls=stalls.results(lengths=False))
+# ==============================================================================
+async def check_instance(dut, words, s_axis, m_axis):
+    # One configuration of the multi-configuration wrapper, on the clock domains shared by all
+    scoreboard = Scoreboard(dut._log)
+    record(dut, s_axis, m_axis, prefix=dut._prefix)
+    source = s_axis.add(write_data(dut,words,scoreboard))
+    sink = m_axis.add(read_data(dut,scoreboard))
+    m_axis.add(random_tready(dut))
+
+    await source.wait()
+    await drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count, idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+    scoreboard.finish()
+
+@cocotb.test(skip = os.getenv("MULTI_CONFIGS") is None, stage = 3)
+def multi_config(dut):
+    # Every generic set of the wrapper generated by runner.run_multi(), checked at once.
+    # Clocks and resets are shared ports: one clock pair and one ClockDomain per clock for all sets.
+    c_CLK_PERIOD_WR = 10 #ns
+    c_CLK_PERIOD_RD = 5 #ns
+
+    cocotb.start_soon(Clock(dut.s_axis_aclk, c_CLK_PERIOD_WR, units='ns').start(start_high=True))
+    cocotb.start_soon(Clock(dut.m_axis_aclk, c_CLK_PERIOD_RD, units='ns').start(start_high=True))
+    configs = instances(dut)
+    dut.s_axis_aresetn.value = 0
+    dut.m_axis_aresetn.value = 0
+    for inst in configs:
+        inst.s_axis_tdata.value = 0
+        inst.s_axis_tvalid.value = 0
+        inst.m_axis_tready.value = 0
+
+    # Resetn
+    yield Timer(2*c_CLK_PERIOD_WR, units='ns')
+    yield RisingEdge(dut.s_axis_aclk)
+    dut.s_axis_aresetn.value = 1
+    dut.m_axis_aresetn.value = 1
+    yield Timer(2*c_CLK_PERIOD_WR, units='ns')
+
+    s_axis = ClockDomain(dut.s_axis_aclk)
+    m_axis = ClockDomain(dut.m_axis_aclk)
+    tasks = [cocotb.start_soon(check_instance(inst, 5000, s_axis, m_axis)) for inst in configs]
+    for task in tasks:
+        yield task
+    s_axis.stop()
+    m_axis.stop()
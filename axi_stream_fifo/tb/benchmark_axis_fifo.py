@@ -0,0 +1,33 @@
+import pytest
+import os
+import glob
+import sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_benchmark, BENCHMARK_TRAFFIC, SIMULATORS
+
+vhdl_srcs = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
+vhdl_srcs += glob.glob("../node_modules/@curbeloangles-dev/asynchronous_fifo/src/*.vhd")
+
+@pytest.mark.parametrize("source, sink", BENCHMARK_TRAFFIC)
+@pytest.mark.parametrize(
+    "clocks", [{"CLK_PERIOD_WR": "10", "CLK_PERIOD_RD": "5"},
+               {"CLK_PERIOD_WR": "10", "CLK_PERIOD_RD": "10"},
+               {"CLK_PERIOD_WR": "2.5", "CLK_PERIOD_RD": "5"}]
+)
+@pytest.mark.parametrize("parameters", [{"g_DATA_WIDTH": "32"}])
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_benchmark_axis_fifo(parameters, clocks, source, sink):
+    run_benchmark(
+        vhdl_sources=vhdl_srcs,         # vhdl sources
+        toplevel="axi_stream_fifo",     # top level HDL
+        module="axi_stream_fifo_tb",    # name of cocotb test module
+        ip="axi_stream_fifo",
+        parameters=parameters,
+        source=source,
+        sink=sink,
+        extra_env=clocks
+    )
@@ -1,28 +1,42 @@
-from cocotb_test.simulator import run
 import pytest
 import os
 import glob
+import sys
 
 current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_sim, run_multi, SIMULATORS
+
 vhdl_srcs = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
 vhdl_srcs += glob.glob("../node_modules/@curbeloangles-dev/asynchronous_fifo/src/*.vhd")
 
-@pytest.mark.parametrize(
-    "parameters", [{"g_DATA_WIDTH": "8"},
-                   {"g_DATA_WIDTH": "16"},
-                   {"g_DATA_WIDTH": "32"},
-                   {"g_DATA_WIDTH": "64"},
-                   {"g_DATA_WIDTH": "128"},
-                   {"g_DATA_WIDTH": "256"}]
-)
-@pytest.mark.skipif(os.getenv("SIM") != "ghdl", reason="")
+PARAMETERS = [{"g_DATA_WIDTH": "8"},
+              {"g_DATA_WIDTH": "16"},
+              {"g_DATA_WIDTH": "32"},
+              {"g_DATA_WIDTH": "64"},
+              {"g_DATA_WIDTH": "128"},
+              {"g_DATA_WIDTH": "256"}]
+
+@pytest.mark.parametrize("parameters", PARAMETERS)
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
 def test_axis_fifo_vhdl(parameters):
-    run(
+    run_sim(
         vhdl_sources=vhdl_srcs,         # vhdl sources
         toplevel="axi_stream_fifo",     # top level HDL
         module="axi_stream_fifo_tb",    # name of cocotb test module
-        toplevel_lang="vhdl",
-        parameters=parameters,
-        extra_env=parameters, 
-        sim_build="sim_build"
-    )
\ No newline at end of file
+        parameters=parameters
+    )
+
+# Every width in one simulation, see multiconfig.py
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_axis_fifo_multi():
+    run_multi(
+        vhdl_sources=vhdl_srcs,
+        toplevel="axi_stream_fifo",
+        module="axi_stream_fifo_tb",
+        configs=PARAMETERS,
+        testcase="multi_config",
+        shared=["s_axis_aclk", "m_axis_aclk", "s_axis_aresetn", "m_axis_aresetn"]
+    )
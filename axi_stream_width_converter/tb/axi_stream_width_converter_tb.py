@@ -1,5 +1,6 @@
 # Libraries
 # =============================================================================
+import os
 import cocotb
 import logging
 import itertools
@@ -10,10 +11,20 @@ from cocotbext.axi      import AxiStreamFrame
 from cocotbext.axi      import AxiStreamBus
 from cocotbext.axi      import AxiStreamSource
 from cocotbext.axi      import AxiStreamSink
+from traffic            import from_env
+from drivers            import ClockDomain, StreamSink
+from benchmark          import Benchmark
+from stimulus           import Stimulus
+import simspeed
+import profiler
+import transactions
+import stalls
 
 # Constants
 #==============================================================================
 CLK_PERIOD      = 10     # ns
+simspeed.track("axis_aclk")
+profiler.install()
 
 # Testbench class
 #==============================================================================
@@ -37,6 +48,13 @@ class TB(object):
         self.axis_source = AxiStreamSource(AxiStreamBus.from_prefix(self.dut, "s_axis"), self.dut.axis_aclk, self.dut.axis_aresetn, reset_active_level=False)
         self.axis_sink = AxiStreamSink(AxiStreamBus.from_prefix(self.dut, "m_axis"), self.dut.axis_aclk, self.dut.axis_aresetn, reset_active_level=False)
 
+        # Cycles of both ports by stall class, and their transfers when TRACE_TRANSACTIONS=1
+        self.clk = ClockDomain(self.dut.axis_aclk)
+        stalls.monitor(self.clk, "s_axis", self.dut.s_axis_tvalid, self.dut.s_axis_tready)
+        stalls.monitor(self.clk, "m_axis", self.dut.m_axis_tvalid, self.dut.m_axis_tready)
+        transactions.axis(self.clk, "write", (self.dut, "s_axis"))
+        transactions.axis(self.clk, "read", (self.dut, "m_axis"))
+
     async def reset(self):
         self.dut.axis_aresetn.setimmediatevalue(1)
         await RisingEdge(self.dut.axis_aclk)
@@ -55,6 +73,16 @@ class TB(object):
             print ("Cycle List needs to be a list")
         self.axis_sink.set_pause_generator(itertools.cycle(cycle_list))
 
+    def set_source_traffic(self, traffic):
+        """tvalid shaped by a traffic profile"""
+        self.dut._log.info("s_axis traffic: %r" % traffic)
+        self.axis_source.set_pause_generator(traffic.pause_generator())
+
+    def set_sink_traffic(self, traffic):
+        """tready shaped by a traffic profile"""
+        self.dut._log.info("m_axis traffic: %r" % traffic)
+        self.axis_sink.set_pause_generator(traffic.pause_generator())
+
     def compare(self, a, b):
         assert len(a) == len(b)
         self.dut._log.info("Input len %d" % (len(a)))
@@ -90,7 +118,6 @@ async def receive_data(tb, capture_size):
         )
 
         output.append(frame_info)
-        await RisingEdge(tb.dut.axis_aclk)
 
     return output      
 # ==============================================================================
@@ -179,19 +206,9 @@ async def test_continuos(dut):
 async def test_back_preassure(dut):
     tb = TB(dut)
     await tb.reset()
-    # Adjust sink back pressure here. 
-    # This list is repeated during the current simulation
-    num_clocks_down = 50
-    num_clocks_up = 3
-    num_clocks = 100
-    t_ready_clocks = []
-    for z in range(num_clocks_up):
-        t_ready_clocks.append(0)
-    for k in range(num_clocks_down):
-        t_ready_clocks.append(1)
-    # for z in range(num_clocks):
-    #     t_ready_clocks.append(random.choice(range(2)))
-    tb.insert_backpressure_list(t_ready_clocks)
+    # Adjust sink back pressure here (SINK_TRAFFIC), by default
+    # 3 cycles ready followed by 50 cycles of back pressure
+    tb.set_sink_traffic(from_env("SINK_TRAFFIC", "periodic:on=3,off=50"))
 
     num_transfers_total = 10
     num_frames = 10
@@ -248,14 +265,8 @@ async def test_back_preassure(dut):
 async def test_starvation(dut):
     tb = TB(dut)
     await tb.reset()
-    # Adjust source starvation here. 
-    # This list is repeated during the current simulation
-    num_clocks = 100
-    t_valid_clocks = []
-    for z in range(num_clocks):
-        t_valid_clocks.append(random.choice(range(2)))
-
-    tb.insert_idle_list(t_valid_clocks)
+    # Adjust source starvation here (SOURCE_TRAFFIC)
+    tb.set_source_traffic(from_env("SOURCE_TRAFFIC", "bernoulli:duty=0.5"))
 
     num_transfers_total = 10
     num_frames = 10
@@ -312,17 +323,9 @@ async def test_starvation(dut):
 async def test_Tready_Tvalid_random(dut):
     tb = TB(dut)
     await tb.reset()
-    # Adjust source starvation here. 
-    # This list is repeated during the current simulation
-    num_clocks = 100
-    t_valid_clocks = []
-    t_ready_clocks = []
-    for z in range(num_clocks):
-        t_valid_clocks.append(random.choice(range(2)))
-        t_ready_clocks.append(random.choice(range(2)))
-    
-    tb.insert_backpressure_list(t_ready_clocks)
-    tb.insert_idle_list(t_valid_clocks)
+    # Adjust source starvation and sink back pressure here (SOURCE_TRAFFIC, SINK_TRAFFIC)
+    tb.set_sink_traffic(from_env("SINK_TRAFFIC", "bernoulli:duty=0.5"))
+    tb.set_source_traffic(from_env("SOURCE_TRAFFIC", "bernoulli:duty=0.5"))
 
     num_transfers_total = 10
     num_frames = 10
@@ -390,9 +393,7 @@ async def fifo_wr_when_full(dut):
     # Force m_axis_tready = 0 to avoid data to be read from FIFO
     fifo_size = int(dut.g_DEPTH) if fifo_up == False else int(dut.g_DEPTH) * c_io_factor
     num_clocks = int(fifo_size)
-    t_ready_clocks = []
-    for z in range(num_clocks):
-        t_ready_clocks.append(1)
+    t_ready_clocks = [1] * num_clocks
     tb.insert_backpressure_list(t_ready_clocks)
 
     data_width = int(dut.g_output_width) // 8 if fifo_up else int(dut.g_input_width) // 8
@@ -424,4 +425,38 @@ async def fifo_rd_when_empty(dut):
     for i in range(10000):
         # To be sure that is not accepted more data into fifo
         assert dut.m_axis_tvalid.value == 0
-        await RisingEdge(dut.axis_aclk)
\ No newline at end of file
+        await RisingEdge(dut.axis_aclk)
+
+#==============================================================================
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 7)
+async def benchmark(dut):
+    tb = TB(dut)
+    await tb.reset()
+
+    # Traffic and length set by runner.run_benchmark()
+    tb.set_source_traffic(from_env("SOURCE_TRAFFIC", "always"))
+    tb.set_sink_traffic(from_env("SINK_TRAFFIC", "always"))
+    input_width = int(dut.g_input_width)
+    output_width = int(dut.g_output_width)
+    # One frame made of a whole number of input and output words
+    ratio = max(1, output_width // input_width)
+    words = -(-int(os.getenv("BENCHMARK_WORDS", 2000)) // ratio) * ratio
+    # Input words as little-endian bytes, the tdata byte order
+    data = Stimulus(input_width, words, log=dut._log)
+    frame_data = list(b"".join(word.to_bytes(input_width // 8, "little") for word in data))
+
+    # Bus monitors on the clock coroutine of the TB, like the other benchmarks
+    bench = Benchmark(input_width, output_width, CLK_PERIOD, CLK_PERIOD)
+    def accepted(word):
+        bench.input()
+    def received(word):
+        bench.output()
+    tb.clk.add(StreamSink(dut.s_axis_tdata, dut.s_axis_tvalid, accepted, ready=dut.s_axis_tready))
+    tb.clk.add(StreamSink(dut.m_axis_tdata, dut.m_axis_tvalid, received, ready=dut.m_axis_tready))
+
+    cocotb.start_soon(send_data(tb, [AxiStreamFrame(frame_data, tkeep=[1] * len(frame_data))]))
+    rframe = await tb.axis_sink.recv(compact=False)
+    tb.clk.stop()
+
+    tb.compare(tb.strip_invalid_bytes(rframe.tdata, rframe.tkeep), frame_data)
+    bench.write(log=dut._log, stalls=stalls.results(lengths=False))
@@ -0,0 +1,33 @@
+import pytest
+import os
+import glob
+import sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_benchmark, BENCHMARK_TRAFFIC, SIMULATORS
+
+vhdl_srcs = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
+vhdl_srcs += glob.glob("../node_modules/@curbeloangles-dev/asymmetric_fifo/src/*.vhd")
+
+@pytest.mark.parametrize("source, sink", BENCHMARK_TRAFFIC)
+@pytest.mark.parametrize(
+    "parameters", [
+                    {"g_input_width": "32",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "8"},
+                    {"g_input_width": "32",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "8"},
+                    {"g_input_width": "256",  "g_output_width": "32",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "8"}
+                   ]
+)
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_benchmark_axi_stream_width_converter(parameters, source, sink):
+    run_benchmark(
+        vhdl_sources=vhdl_srcs,                     # vhdl sources
+        toplevel="axi_stream_width_converter",      # top level HDL
+        module="axi_stream_width_converter_tb",     # name of cocotb test module
+        ip="axi_stream_width_converter",
+        parameters=parameters,
+        source=source,
+        sink=sink
+    )
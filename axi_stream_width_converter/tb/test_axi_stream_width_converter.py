@@ -1,73 +1,103 @@
-from cocotb_test.simulator import run
 import pytest
 import os
 import glob
+import sys
 
 current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from runner import run_sim, SIMULATORS
+from param_space import ParameterSpace
+
 vhdl_srcs = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
 vhdl_srcs += glob.glob("../node_modules/@curbeloangles-dev/asymmetric_fifo/src/*.vhd")
 
-@pytest.mark.parametrize(
-    "parameters", [
-                    {"g_input_width": "8",    "g_output_width": "8",    "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "8",    "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "20",  "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "32",   "g_output_width": "8",    "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "128", "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "8",    "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
-                    {"g_input_width": "16",   "g_output_width": "8",    "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "9",   "g_AXIS_TID_WIDTH"  : "15",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "8",    "g_output_width": "64",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "64",   "g_output_width": "8",    "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
-                    {"g_input_width": "8",    "g_output_width": "128",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
-                    {"g_input_width": "128",  "g_output_width": "8",    "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
-                    {"g_input_width": "8",    "g_output_width": "256",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
-                    {"g_input_width": "256",  "g_output_width": "8",    "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
-                    {"g_input_width": "512",  "g_output_width": "8",    "g_DEPTH": "256", "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "8",    "g_output_width": "512",  "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "16",   "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "16",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "20",  "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "32",   "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "128", "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "16",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "64",   "g_output_width": "16",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
-                    {"g_input_width": "16",   "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
-                    {"g_input_width": "128",  "g_output_width": "16",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
-                    {"g_input_width": "16",   "g_output_width": "256",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
-                    {"g_input_width": "256",  "g_output_width": "16",   "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
-                    {"g_input_width": "512",  "g_output_width": "16",   "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "16",   "g_output_width": "512",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "32",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "32",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "64",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
-                    {"g_input_width": "32",   "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
-                    {"g_input_width": "128",  "g_output_width": "32",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
-                    {"g_input_width": "32",   "g_output_width": "256",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
-                    {"g_input_width": "256",  "g_output_width": "32",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
-                    {"g_input_width": "512",  "g_output_width": "32",   "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "32",   "g_output_width": "512",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "64",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "64",   "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
-                    {"g_input_width": "128",  "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
-                    {"g_input_width": "64",   "g_output_width": "256",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
-                    {"g_input_width": "256",  "g_output_width": "64",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
-                    {"g_input_width": "512",  "g_output_width": "64",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "64",   "g_output_width": "512",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "128",  "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "128",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
-                    {"g_input_width": "256",  "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
-                    {"g_input_width": "512",  "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "128",  "g_output_width": "512",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "256",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "512",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
-                    {"g_input_width": "256",  "g_output_width": "512",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
-                    {"g_input_width": "512",  "g_output_width": "512",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
-                    {"g_input_width": "96",   "g_output_width": "32",   "g_DEPTH": "66",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"}
-                    ])
-@pytest.mark.skipif(os.getenv("SIM") != "ghdl", reason="")
+WIDTHS = [8, 16, 32, 64, 128, 256, 512]
+
+def legal(p):
+    # Integer width ratio and g_DEPTH >= 2 * ratio, see the generic accepted values of the entity
+    wide, narrow = max(p["g_input_width"], p["g_output_width"]), min(p["g_input_width"], p["g_output_width"])
+    return wide % narrow == 0 and p["g_DEPTH"] >= 2 * wide // narrow
+
+# Hand-picked sets of the former list, odd sideband widths included, kept in nightly
+NIGHTLY_SETS = [
+    {"g_input_width": "8",    "g_output_width": "8",    "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "8",    "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "20",  "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "32",   "g_output_width": "8",    "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "128", "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "8",    "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
+    {"g_input_width": "16",   "g_output_width": "8",    "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "9",   "g_AXIS_TID_WIDTH"  : "15",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "8",    "g_output_width": "64",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "64",   "g_output_width": "8",    "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
+    {"g_input_width": "8",    "g_output_width": "128",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
+    {"g_input_width": "128",  "g_output_width": "8",    "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
+    {"g_input_width": "8",    "g_output_width": "256",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
+    {"g_input_width": "256",  "g_output_width": "8",    "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
+    {"g_input_width": "512",  "g_output_width": "8",    "g_DEPTH": "256", "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "8",    "g_output_width": "512",  "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "16",   "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "16",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "20",  "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "32",   "g_output_width": "16",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "128", "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "16",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "64",   "g_output_width": "16",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
+    {"g_input_width": "16",   "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
+    {"g_input_width": "128",  "g_output_width": "16",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
+    {"g_input_width": "16",   "g_output_width": "256",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
+    {"g_input_width": "256",  "g_output_width": "16",   "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
+    {"g_input_width": "512",  "g_output_width": "16",   "g_DEPTH": "128", "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "16",   "g_output_width": "512",  "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "32",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "32",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "64",   "g_output_width": "32",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "8",   "g_AXIS_TDEST_WIDTH" : "100"},
+    {"g_input_width": "32",   "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
+    {"g_input_width": "128",  "g_output_width": "32",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
+    {"g_input_width": "32",   "g_output_width": "256",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
+    {"g_input_width": "256",  "g_output_width": "32",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
+    {"g_input_width": "512",  "g_output_width": "32",   "g_DEPTH": "64",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "32",   "g_output_width": "512",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "64",   "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "64",   "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "6",   "g_AXIS_TDEST_WIDTH" : "50"},
+    {"g_input_width": "128",  "g_output_width": "64",   "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "125", "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "10"},
+    {"g_input_width": "64",   "g_output_width": "256",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
+    {"g_input_width": "256",  "g_output_width": "64",   "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
+    {"g_input_width": "512",  "g_output_width": "64",   "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "64",   "g_output_width": "512",  "g_DEPTH": "32",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "128",  "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "128",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "15",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "23"},
+    {"g_input_width": "256",  "g_output_width": "128",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "2",   "g_AXIS_TID_WIDTH"  : "3",   "g_AXIS_TDEST_WIDTH" : "4"},
+    {"g_input_width": "512",  "g_output_width": "128",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "128",  "g_output_width": "512",  "g_DEPTH": "16",  "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "256",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"},
+    {"g_input_width": "512",  "g_output_width": "256",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "5",   "g_AXIS_TDEST_WIDTH" : "90"},
+    {"g_input_width": "256",  "g_output_width": "512",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "16",  "g_AXIS_TID_WIDTH"  : "4",   "g_AXIS_TDEST_WIDTH" : "32"},
+    {"g_input_width": "512",  "g_output_width": "512",  "g_DEPTH": "8",   "g_AXIS_TUSER_WIDTH" : "32",  "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"}
+]
+
+# Every width pair and every pair of depth and sideband widths, plus a non power of 2 ratio
+PARAMETER_SPACE = ParameterSpace(
+    axes={
+        "g_input_width":        WIDTHS,
+        "g_output_width":       WIDTHS,
+        "g_DEPTH":              [8, 16, 32, 64, 128, 256],
+        "g_AXIS_TUSER_WIDTH":   [2, 8, 16, 32, 125],
+        "g_AXIS_TID_WIDTH":     [3, 8, 24, 128],
+        "g_AXIS_TDEST_WIDTH":   [4, 32, 64, 100],
+    },
+    constraint=legal,
+    include=[
+        {"g_input_width": "96",   "g_output_width": "32",   "g_DEPTH": "66",  "g_AXIS_TUSER_WIDTH" : "8",   "g_AXIS_TID_WIDTH"  : "24",  "g_AXIS_TDEST_WIDTH" : "64"}
+    ],
+    # The full product is over 20000 sets
+    tiers={"nightly": "pairwise"},
+    tier_include={"nightly": NIGHTLY_SETS}
+)
+
+@pytest.mark.parametrize("parameters", PARAMETER_SPACE.expand())
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
 def test_axi_stream_width_converter(parameters):
-    run(
+    run_sim(
         vhdl_sources=vhdl_srcs,                     # vhdl sources
         toplevel="axi_stream_width_converter",      # top level HDL
         module="axi_stream_width_converter_tb",     # name of cocotb test module
-        toplevel_lang="vhdl",
-        parameters=parameters,
-        extra_env=parameters, 
-        sim_build="sim_build"
+        parameters=parameters
     )
\ No newline at end of file
@@ -0,0 +1,108 @@
+-------------------------------------------------------------------------------
+-- NAME:        soak_pkg.vhd
+-- DESCRPTION:  File access of the file-driven soak harnesses (common/tb/soak.py)
+-------------------------------------------------------------------------------
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use std.textio.all;
+
+--! Files are std.textio lines of hex digits, so every simulator reads them
+--! the same way. Stimulus files hold one word per line, ceil(width/4) digits,
+--! most significant first. Pattern files hold four clock cycles per digit,
+--! least significant bit first, digits and lines in order, and are read again
+--! from the start at their end.
+package soak_pkg is
+
+  --! Hex digits of one word of width bits in a stimulus file
+  function word_digits(width : positive) return positive;
+
+  --! Value of a hex digit
+  function hex_value(c : character) return natural;
+
+  --! Next word of a stimulus file
+  procedure read_word(file f : text; word : out std_logic_vector);
+
+  --! Next cycle of a pattern file, l, digit and index hold the current line and digit
+  procedure next_bit(file f : text; name : in string; l : inout line; digit : inout natural; index : inout natural; active : out std_logic);
+
+  --! '0'/'1' string of a vector, most significant bit first
+  function bits(v : std_logic_vector) return string;
+
+end package;
+
+package body soak_pkg is
+
+  function word_digits(width : positive) return positive is
+  begin
+    return (width + 3) / 4;
+  end function;
+
+  function hex_value(c : character) return natural is
+  begin
+    case c is
+      when '0' to '9' => return character'pos(c) - character'pos('0');
+      when 'a' to 'f' => return character'pos(c) - character'pos('a') + 10;
+      when 'A' to 'F' => return character'pos(c) - character'pos('A') + 10;
+      when others =>
+        report "soak_pkg: '" & c & "' is not a hex digit" severity failure;
+        return 0;
+    end case;
+  end function;
+
+  procedure read_word(file f : text; word : out std_logic_vector) is
+    variable l      : line;
+    variable c      : character;
+    variable digits : std_logic_vector(4 * word_digits(word'length) - 1 downto 0);
+  begin
+    readline(f, l);
+    for i in word_digits(word'length) - 1 downto 0 loop
+      read(l, c);
+      digits(4 * i + 3 downto 4 * i) := std_logic_vector(to_unsigned(hex_value(c), 4));
+    end loop;
+    deallocate(l);
+    word := digits(word'length - 1 downto 0);
+  end procedure;
+
+  procedure next_bit(file f : text; name : in string; l : inout line; digit : inout natural; index : inout natural; active : out std_logic) is
+    variable c : character;
+  begin
+    if index = 4 then
+      if l = null or l'length = 0 then
+        if endfile(f) then
+          file_close(f);
+          file_open(f, name, read_mode);
+        end if;
+        readline(f, l);
+      end if;
+      read(l, c);
+      digit := hex_value(c);
+      index := 0;
+    end if;
+    if (digit / 2 ** index) mod 2 = 1 then
+      active := '1';
+    else
+      active := '0';
+    end if;
+    index := index + 1;
+  end procedure;
+
+  function bits(v : std_logic_vector) return string is
+    variable s : string(1 to v'length);
+    variable n : positive := 1;
+  begin
+    for i in v'range loop
+      if v(i) = '1' then
+        s(n) := '1';
+      elsif v(i) = '0' then
+        s(n) := '0';
+      else
+        s(n) := 'X';
+      end if;
+      n := n + 1;
+    end loop;
+    return s;
+  end function;
+
+end package body;
@@ -0,0 +1,101 @@
+-------------------------------------------------------------------------------
+-- NAME:        soak_sink.vhd
+-- DESCRPTION:  Read side and checker of the file-driven soak harnesses
+-------------------------------------------------------------------------------
+
+library ieee;
+use ieee.std_logic_1164.all;
+use std.textio.all;
+use work.soak_pkg.all;
+
+--! Reads the output of a first-word-fall-through FIFO: ready follows the
+--! bits of g_PATTERN_FILE and a word is taken on an edge where valid and
+--! ready are high. Every word is compared with the next one of
+--! g_EXPECTED_FILE. After g_WORDS words, or g_STALL_CYCLES cycles without
+--! one, the counts are written to g_RESULT_FILE and done is set.
+entity soak_sink is
+  generic (
+    g_WIDTH         : positive;
+    g_WORDS         : natural;
+    g_EXPECTED_FILE : string;
+    g_PATTERN_FILE  : string;
+    g_RESULT_FILE   : string;
+    g_STALL_CYCLES  : positive := 100000
+  );
+  port (
+    clk   : in  std_logic;
+    rst   : in  std_logic;
+    data  : in  std_logic_vector(g_WIDTH - 1 downto 0);
+    valid : in  std_logic;
+    ready : out std_logic;
+    done  : out std_logic
+  );
+end entity;
+
+architecture behavioral of soak_sink is
+begin
+
+  process
+    file expected_file  : text;
+    file pattern_file   : text;
+    file result_file    : text;
+    variable l          : line;
+    variable word       : std_logic_vector(g_WIDTH - 1 downto 0);
+    variable first_exp  : std_logic_vector(g_WIDTH - 1 downto 0) := (others => '0');
+    variable first_got  : std_logic_vector(g_WIDTH - 1 downto 0) := (others => '0');
+    variable received   : natural   := 0;
+    variable errors     : natural   := 0;
+    variable first      : integer   := -1;
+    variable cycles     : natural   := 0;
+    variable idle       : natural   := 0;
+    variable taking     : std_logic := '0';
+    variable pattern    : line;
+    variable digit      : natural   := 0;
+    variable index      : natural   := 4;
+  begin
+    file_open(expected_file, g_EXPECTED_FILE, read_mode);
+    file_open(pattern_file, g_PATTERN_FILE, read_mode);
+    ready <= '0';
+    done  <= '0';
+    wait until rising_edge(clk) and rst = '0';
+
+    while received < g_WORDS and idle < g_STALL_CYCLES loop
+      if taking = '1' and valid = '1' then
+        read_word(expected_file, word);
+        if data /= word then
+          if errors = 0 then
+            first     := received;
+            first_exp := word;
+            first_got := data;
+          end if;
+          errors := errors + 1;
+        end if;
+        received := received + 1;
+        idle     := 0;
+      else
+        idle := idle + 1;
+      end if;
+
+      next_bit(pattern_file, g_PATTERN_FILE, pattern, digit, index, taking);
+      ready <= taking;
+      wait until rising_edge(clk);
+      cycles := cycles + 1;
+    end loop;
+    ready <= '0';
+
+    file_open(result_file, g_RESULT_FILE, write_mode);
+    write(l, string'("words "));    write(l, g_WORDS);    writeline(result_file, l);
+    write(l, string'("received ")); write(l, received);   writeline(result_file, l);
+    write(l, string'("errors "));   write(l, errors);     writeline(result_file, l);
+    write(l, string'("cycles "));   write(l, cycles);     writeline(result_file, l);
+    write(l, string'("first_error ")); write(l, first);  writeline(result_file, l);
+    if errors > 0 then
+      write(l, string'("first_expected ")); write(l, bits(first_exp)); writeline(result_file, l);
+      write(l, string'("first_received ")); write(l, bits(first_got)); writeline(result_file, l);
+    end if;
+    file_close(result_file);
+    done <= '1';
+    wait;
+  end process;
+
+end architecture;
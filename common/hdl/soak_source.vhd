@@ -0,0 +1,76 @@
+-------------------------------------------------------------------------------
+-- NAME:        soak_source.vhd
+-- DESCRPTION:  Write side of the file-driven soak harnesses
+-------------------------------------------------------------------------------
+
+library ieee;
+use ieee.std_logic_1164.all;
+use std.textio.all;
+use work.soak_pkg.all;
+
+--! Writes the g_WORDS words of g_DATA_FILE. On every clock, valid follows
+--! the next bit of g_PATTERN_FILE while words are left, and the word is
+--! accepted on an edge where valid is high and full is low.
+entity soak_source is
+  generic (
+    g_WIDTH        : positive;
+    g_WORDS        : natural;
+    g_DATA_FILE    : string;
+    g_PATTERN_FILE : string
+  );
+  port (
+    clk   : in  std_logic;
+    rst   : in  std_logic;
+    full  : in  std_logic;
+    data  : out std_logic_vector(g_WIDTH - 1 downto 0);
+    valid : out std_logic;
+    count : out natural   --! Words accepted
+  );
+end entity;
+
+architecture behavioral of soak_source is
+begin
+
+  process
+    file data_file      : text;
+    file pattern_file   : text;
+    variable word       : std_logic_vector(g_WIDTH - 1 downto 0) := (others => '0');
+    variable loaded     : boolean   := false;
+    variable accepted   : natural   := 0;
+    variable offered    : std_logic := '0';
+    variable active     : std_logic;
+    variable pattern    : line;
+    variable digit      : natural   := 0;
+    variable index      : natural   := 4;
+  begin
+    file_open(data_file, g_DATA_FILE, read_mode);
+    file_open(pattern_file, g_PATTERN_FILE, read_mode);
+    data  <= (others => '0');
+    valid <= '0';
+    count <= 0;
+    wait until rising_edge(clk) and rst = '0';
+
+    loop
+      if offered = '1' and full = '0' then
+        accepted := accepted + 1;
+        loaded   := false;
+      end if;
+      if not loaded and accepted < g_WORDS then
+        read_word(data_file, word);
+        loaded := true;
+      end if;
+
+      next_bit(pattern_file, g_PATTERN_FILE, pattern, digit, index, active);
+      if loaded then
+        offered := active;
+      else
+        offered := '0';
+      end if;
+      data  <= word;
+      valid <= offered;
+      count <= accepted;
+      wait until rising_edge(clk);
+    end loop;
+  end process;
+
+end architecture;
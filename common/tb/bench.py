@@ -0,0 +1,78 @@
+"""
+Benchmark suite runner.
+
+Runs the benchmark_*.py runners of every IP (each one a grid of parameter
+sets and traffic profiles) in parallel and merges the JSON written by the
+testbenches into <results>/results.json.
+
+    python common/tb/bench.py                         # every IP
+    python common/tb/bench.py fifo_bram -j 8
+    python common/tb/bench.py --force                 # rerun unchanged configurations
+    python common/tb/bench.py --stalls                # add the stall attribution to the records
+"""
+import  argparse
+import  glob
+import  json
+import  os
+import  sys
+import  regress
+
+# ==============================================================================
+def merge(results_dir):
+    """Return the records of every <results_dir>/<ip>/*.json file."""
+    records = []
+    for path in sorted(glob.glob(os.path.join(results_dir, "*", "*.json"))):
+        with open(path) as f:
+            records.append(json.load(f))
+    return records
+
+def _fmt(value):
+    return "-" if value is None else "%.3f" % value
+
+# ==============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Run the FIFO benchmarks in parallel")
+    parser.add_argument("ips", nargs="*", help="IP folders to run (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel simulations (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="rerun configurations that already passed unchanged")
+    parser.add_argument("-s", "--sim", choices=regress.SIMULATORS, help="simulator (default: SIM or ghdl)")
+    parser.add_argument("--stalls", action="store_true", help="add the valid/ready stall attribution to the records (STALL_MONITOR=1)")
+    parser.add_argument("-o", "--results", default=os.path.join(regress.REPO_DIR, "benchmark"), help="results folder")
+    args = parser.parse_args()
+    results_dir = os.path.abspath(args.results)
+
+    env = dict(os.environ)
+    if args.sim:
+        env["SIM"] = args.sim
+    env.setdefault("SIM", "ghdl")
+    env["BENCHMARK_DIR"] = results_dir
+    # The traffic of every run is set by the benchmark grid
+    env.pop("SOURCE_TRAFFIC", None)
+    env.pop("SINK_TRAFFIC", None)
+    if args.force:
+        env["FORCE_RUN"] = "1"
+    if args.stalls:
+        env["STALL_MONITOR"] = "1"
+
+    runs = regress.run_all(regress.find_test_files(args.ips, "benchmark_*.py"), os.path.join(results_dir, "logs"), env, args.jobs)
+    records = merge(results_dir)
+    with open(os.path.join(results_dir, "results.json"), "w") as f:
+        json.dump(records, f, indent=2, sort_keys=True)
+
+    print("=" * 120)
+    print("%-28s %-5s %-44s %-28s %9s %9s %9s %9s" % ("ip", "sim", "parameters", "source / sink", "in w/clk", "out w/clk", "lat p50", "lat p99"))
+    for r in records:
+        parameters = ",".join("%s=%s" % item for item in sorted(r["parameters"].items()) + sorted(r["env"].items()))
+        print("%-28s %-5s %-44s %-28s %9s %9s %9s %9s" % (
+            r["ip"], r.get("simulator", "-"), parameters, "%s / %s" % (r["source"], r["sink"]),
+            _fmt(r.get("in_words_per_cycle")), _fmt(r.get("out_words_per_cycle")),
+            _fmt(r.get("latency_p50_cycles")), _fmt(r.get("latency_p99_cycles")),
+        ))
+    failed = [r for r in runs if r["status"] == "failed"]
+    for r in failed:
+        print("FAILED %s::%s (see %s)" % (r["ip"], r["test"], r["log"]))
+    print("%d benchmark records, %d failed runs" % (len(records), len(failed)))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
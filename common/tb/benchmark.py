@@ -0,0 +1,72 @@
+"""
+Throughput and latency measurement of a FIFO under test.
+
+input() is called for every word accepted by the DUT and output() for every
+word it delivers, both at the clock edge of the transfer. Words are matched
+by bit position, so width converting FIFOs are measured too: the latency of
+an output word is counted from the input word that carried its last bit.
+Results are written as JSON to BENCHMARK_FILE, together with the run
+description in BENCHMARK_INFO (see runner.run_benchmark).
+"""
+import  json
+import  os
+import  numpy           as np
+from    cocotb.utils    import get_sim_time
+
+# ==============================================================================
+class Benchmark(object):
+    def __init__(self, in_width, out_width, in_period, out_period):
+        self.in_width = in_width
+        self.out_width = out_width
+        self.in_period = in_period
+        self.out_period = out_period
+        self.in_times = []
+        self.out_times = []
+
+    def input(self, word=None):
+        self.in_times.append(get_sim_time("ns"))
+
+    def output(self, word=None):
+        self.out_times.append(get_sim_time("ns"))
+
+    def result(self):
+        t_in = np.asarray(self.in_times, dtype=float)
+        t_out = np.asarray(self.out_times, dtype=float)
+        result = {
+            "words_in": len(t_in),
+            "words_out": len(t_out),
+            "in_words_per_cycle": _words_per_cycle(t_in, self.in_period),
+            "out_words_per_cycle": _words_per_cycle(t_out, self.out_period),
+        }
+        # Input word holding the last bit of every output word
+        last_bit = (np.arange(1, len(t_out) + 1) * self.out_width) - 1
+        source = last_bit // self.in_width
+        matched = source < len(t_in)
+        latency = t_out[matched] - t_in[source[matched]]
+        if len(latency):
+            result["first_word_latency_ns"] = float(t_out[0] - t_in[0])
+            result["first_word_latency_cycles"] = float(t_out[0] - t_in[0]) / self.out_period
+            for name, value in (("p50", np.percentile(latency, 50)), ("p99", np.percentile(latency, 99)), ("max", latency.max())):
+                result["latency_%s_ns" % name] = float(value)
+                result["latency_%s_cycles" % name] = float(value) / self.out_period
+        return result
+
+    def write(self, log=None, path=None, **info):
+        """Write info plus result() to path (BENCHMARK_FILE by default)."""
+        path = path or os.getenv("BENCHMARK_FILE")
+        record = json.loads(os.getenv("BENCHMARK_INFO", "{}"))
+        record.update(info)
+        record.update(self.result())
+        if log is not None:
+            log.info("Benchmark: %s" % json.dumps(record, sort_keys=True))
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(record, f, indent=2, sort_keys=True)
+        return record
+
+def _words_per_cycle(times, period):
+    """Sustained rate between the first and the last transfer."""
+    if len(times) < 2:
+        return None
+    return (len(times) - 1) / ((times[-1] - times[0]) / period)
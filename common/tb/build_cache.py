@@ -0,0 +1,73 @@
+"""
+Content-addressed cache of compiled designs.
+
+The VHDL sources are analyzed once per (sources, simulator version, compile
+arguments) tuple into sim_build/cache/<toplevel>-<hash>/. Every parameter set
+whose generics are applied at run time reuses that build.
+"""
+import  fcntl
+import  functools
+import  hashlib
+import  os
+import  shutil
+import  subprocess
+from    cocotb_test.simulator   import run
+
+# ==============================================================================
+@functools.lru_cache(maxsize=None)
+def simulator_version(sim):
+    """First line of '<sim> --version', or the simulator name if it is not installed."""
+    if shutil.which(sim) is None:
+        return sim
+    out = subprocess.run([sim, "--version"], capture_output=True, text=True)
+    return (out.stdout.splitlines() or [sim])[0].strip()
+
+def build_key(sources, sim, compile_args=None, parameters=None):
+    """Hash of everything that changes the compiled design."""
+    h = hashlib.sha256()
+    h.update(simulator_version(sim).encode())
+    for arg in compile_args or []:
+        h.update(arg.encode())
+    for name, value in sorted((parameters or {}).items()):
+        h.update(("%s=%s" % (name, value)).encode())
+    for src in sorted(os.path.abspath(s) for s in sources):
+        h.update(os.path.basename(src).encode())
+        with open(src, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+# ==============================================================================
+def cached_build(vhdl_sources, toplevel, module, sim, root="sim_build", parameters=None, **kwargs):
+    """
+    Return the cache folder holding the compiled design, compiling it first
+    if no previous run has. Concurrent runs wait on a lock instead of
+    analyzing the same sources twice.
+    """
+    key = build_key(vhdl_sources, sim, kwargs.get("compile_args"), parameters)
+    build_dir = os.path.abspath(os.path.join(root, "cache", "%s-%s" % (toplevel, key)))
+    os.makedirs(build_dir, exist_ok=True)
+
+    with open(build_dir + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        stamp = os.path.join(build_dir, ".complete")
+        if not os.path.isfile(stamp):
+            run(
+                vhdl_sources=vhdl_sources,
+                toplevel=toplevel,
+                module=module,
+                toplevel_lang="vhdl",
+                parameters=parameters,
+                sim_build=build_dir,
+                compile_only=True,
+                force_compile=True,
+                **kwargs
+            )
+            open(stamp, "w").close()
+        # cocotb_test rebuilds when a source is newer than <build>/<toplevel>.
+        # The folder is keyed by content, so mark the build as up to date
+        # (mcode GHDL leaves no executable there, the file is only a stamp).
+        out_file = os.path.join(build_dir, toplevel)
+        if not os.path.exists(out_file):
+            open(out_file, "w").close()
+        os.utime(out_file)
+    return build_dir
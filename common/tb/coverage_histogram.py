@@ -0,0 +1,100 @@
+"""
+Batched functional coverage sampling.
+
+A CoverPoint decorated sample() walks every bin of the point on each call,
+which over hundreds of bins and one call per clock is a large share of the
+simulation wall time. A CoverageHistogram takes plain integers instead:
+they are buffered in a list, folded into a NumPy histogram every `chunk`
+samples, and only added to the cocotb_coverage CoverPoint on flush() (or
+every flush_every samples), with the same hits, parent coverage and
+callbacks as sampling it value by value.
+
+    fill_count = histogram("bram.fill_count.all_counts")
+    read_fill_count = signals.reader(dut.fill_count)
+    clk.on_edge(lambda: fill_count.sample(read_fill_count()))
+    ...
+    flush_all()
+    coverage_db.export_to_yaml(...)
+
+Only CoverPoints whose bins are integers matched by equality (no xf/rel)
+can be sampled this way.
+"""
+import  numpy                       as np
+from    cocotb_coverage.coverage    import coverage_db
+
+# Samples buffered before being folded into the histogram
+CHUNK = 4096
+
+_histograms = {}
+
+# ==============================================================================
+class CoverageHistogram(object):
+    def __init__(self, name, flush_every=None):
+        self.point = coverage_db[name]
+        self.bins = list(self.point._hits)
+        self.low = min(self.bins)
+        self.histogram = np.zeros(max(self.bins) - self.low + 1, dtype=np.int64)
+        self.samples = []
+        self.chunk = flush_every or CHUNK
+        self.flush_every = flush_every
+
+    def sample(self, value):
+        samples = self.samples
+        samples.append(value)
+        if len(samples) >= self.chunk:
+            self._accumulate()
+            if self.flush_every:
+                self.flush()
+
+    def _accumulate(self):
+        if not self.samples:
+            return
+        index = np.asarray(self.samples, dtype=np.int64) - self.low
+        self.samples = []
+        # Values outside the bins are not counted, as in CoverPoint
+        index = index[(index >= 0) & (index < len(self.histogram))]
+        self.histogram += np.bincount(index, minlength=len(self.histogram))
+
+    def hits(self):
+        """Hits of every bin (in self.bins order), flushed or not."""
+        self._accumulate()
+        pending = self.histogram[np.asarray(self.bins) - self.low]
+        return np.array([self.point._hits[b] for b in self.bins], dtype=np.int64) + pending
+
+    def unhit(self):
+        """Bins with fewer hits than the at_least of the CoverPoint."""
+        return [b for b, h in zip(self.bins, self.hits()) if h < self.point.at_least]
+
+    def flush(self):
+        """Add the hits gathered so far to coverage_db."""
+        self._accumulate()
+        point = self.point
+        current_coverage = point.coverage
+        new_hits = []
+        for bin in self.bins:
+            hits = int(self.histogram[bin - self.low])
+            if hits:
+                point._hits[bin] += hits
+                new_hits.append(bin)
+                if bin in point._bins_callbacks:
+                    point._bins_callbacks[bin]()
+        self.histogram[:] = 0
+        if not new_hits:
+            return
+        point._new_hits = [point._labels_bins[b] for b in new_hits] if point._bins_labels is not None else new_hits
+        point._parent._update_coverage(point.coverage - current_coverage)
+        for threshold in point._threshold_callbacks:
+            if 100 * current_coverage / point.size < threshold <= 100 * point.coverage / point.size:
+                point._threshold_callbacks[threshold]()
+
+# ==============================================================================
+def histogram(name, flush_every=None):
+    """CoverageHistogram of the CoverPoint name, shared by every test of the module."""
+    if name not in _histograms:
+        _histograms[name] = CoverageHistogram(name, flush_every)
+    return _histograms[name]
+
+def flush_all():
+    """Flush every histogram, call it before reading or exporting coverage_db."""
+    for h in _histograms.values():
+        h.flush()
@@ -0,0 +1,148 @@
+"""
+Per run functional coverage files and their merge.
+
+In simulation, export(log, group) flushes the batched histograms, logs the
+coverage of group and writes coverage_db to the run folder (RESULT_PATH,
+one per parameter set): functional_coverage.yml for reading and
+functional_coverage.npz for merging. The .npz file holds one hits array per
+cover item plus its bins, and the run description (RUN_INFO, set by
+runner.run_sim), so hundreds of runs with 500 bin cover points load in a
+fraction of a second.
+
+The same module merges the .npz files of every run:
+
+    python common/tb/coverage_report.py                 # all IPs
+    python common/tb/coverage_report.py fifo_bram -o regression/coverage.json
+
+Hits are summed per cover item over all runs of a toplevel, and the report
+also lists the coverage of every item for each parameter set.
+"""
+import  argparse
+import  glob
+import  json
+import  os
+import  sys
+import  numpy   as np
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+# File names inside the run folder
+YAML_FILE = "functional_coverage.yml"
+NPZ_FILE = "functional_coverage.npz"
+
+# ==============================================================================
+# In simulation
+# ==============================================================================
+def export(log, group, path=None):
+    """Log the coverage of group and write the .yml and .npz files of this run."""
+    from cocotb_coverage.coverage import coverage_db, CoverCheck
+    from coverage_histogram import flush_all
+    flush_all()
+    log.info("Functional coverage percentage: %.2f%%" % coverage_db[group].cover_percentage)
+
+    path = path or os.getenv("RESULT_PATH", "../../doc/")
+    coverage_db.export_to_yaml(filename=os.path.join(path, YAML_FILE))
+
+    arrays = {}
+    items = {}
+    for name, item in coverage_db.items():
+        # Leaves only, groups are recomputed from them
+        if not hasattr(item, "_hits"):
+            continue
+        hits = item.detailed_coverage
+        arrays[name + ":bins"] = np.array([str(b) for b in hits])
+        arrays[name + ":hits"] = np.array(list(hits.values()), dtype=np.int64)
+        items[name] = {"check": isinstance(item, CoverCheck), "at_least": item.at_least, "weight": item.weight}
+    info = json.loads(os.getenv("RUN_INFO", "{}"))
+    info["items"] = items
+    np.savez_compressed(os.path.join(path, NPZ_FILE), info=np.array(json.dumps(info)), **arrays)
+
+# ==============================================================================
+# Merge
+# ==============================================================================
+def load(path):
+    """Return (info, {item: (bins, hits)}) of one .npz file."""
+    with np.load(path, allow_pickle=False) as f:
+        info = json.loads(str(f["info"]))
+        items = {name: (f[name + ":bins"].tolist(), f[name + ":hits"]) for name in info["items"]}
+    return info, items
+
+def item_coverage(meta, bins, hits):
+    """(covered, size) of one cover item, weighted as in cocotb_coverage."""
+    if meta["check"]:
+        hits = dict(zip(bins, hits))
+        covered = hits.get("FAIL", 0) == 0 and hits.get("PASS", 0) >= meta["at_least"]
+        return (meta["weight"] if covered else 0), meta["weight"]
+    return int(np.count_nonzero(hits >= meta["at_least"])) * meta["weight"], len(hits) * meta["weight"]
+
+def _percentage(covered, size):
+    return round(100.0 * covered / size, 2) if size else None
+
+def _summary(items, metas):
+    """Total and per item coverage percentages."""
+    total = [0, 0]
+    per_item = {}
+    for name, (bins, hits) in items.items():
+        covered, size = item_coverage(metas[name], bins, hits)
+        total[0] += covered
+        total[1] += size
+        per_item[name] = _percentage(covered, size)
+    return _percentage(*total), per_item
+
+def merge(paths):
+    """Merged report of the given .npz files, grouped by toplevel."""
+    toplevels = {}
+    for path in sorted(paths):
+        info, items = load(path)
+        top = toplevels.setdefault(info.get("toplevel", "unknown"), {"bins": {}, "meta": {}, "runs": []})
+        for name, (bins, hits) in items.items():
+            top["meta"][name] = info["items"][name]
+            merged = top["bins"].setdefault(name, {})
+            for b, h in zip(bins, hits.tolist()):
+                merged[b] = merged.get(b, 0) + h
+        coverage, per_item = _summary(items, info["items"])
+        top["runs"].append({"file": path, "parameters": info.get("parameters", {}), "coverage": coverage, "items": per_item})
+
+    report = {}
+    for toplevel, top in toplevels.items():
+        items = {name: (list(bins), np.array(list(bins.values()), dtype=np.int64)) for name, bins in top["bins"].items()}
+        coverage, per_item = _summary(items, top["meta"])
+        report[toplevel] = {
+            "coverage": coverage,
+            "items": {name: {"coverage": per_item[name], "bins": top["bins"][name]} for name in items},
+            "runs": top["runs"],
+        }
+    return report
+
+def find_files(ips):
+    """functional_coverage.npz of every run of the selected IPs (all of them if empty)."""
+    ips = ips or ["*"]
+    paths = []
+    for ip in ips:
+        paths += glob.glob(os.path.join(REPO_DIR, ip, "tb", "sim_build", "**", NPZ_FILE), recursive=True)
+    # Wave reruns of failures (runner.rerun_with_waves) repeat their run
+    return [p for p in paths if os.sep + "waves" + os.sep not in p]
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the functional coverage of every run")
+    parser.add_argument("ips", nargs="*", help="IP folders to merge (default: all)")
+    parser.add_argument("-o", "--output", default=os.path.join(REPO_DIR, "regression", "coverage.json"), help="merged report")
+    args = parser.parse_args()
+
+    report = merge(find_files(args.ips))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for toplevel, top in sorted(report.items()):
+        print("%s: %.2f%% merged over %d runs" % (toplevel, top["coverage"], len(top["runs"])))
+        for name, item in sorted(top["items"].items()):
+            print("    %-50s %6.2f%%" % (name, item["coverage"]))
+        for run in top["runs"]:
+            parameters = ",".join("%s=%s" % p for p in sorted(run["parameters"].items())) or "-"
+            print("    run %-70s %6.2f%%" % (parameters, run["coverage"]))
+    print("Merged report written to %s" % args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Coverage-directed stimulus.
+
+An OccupancyDirector steers the fill level of a FIFO towards the occupancy
+bins that are still unhit instead of waiting for random write/read gaps to
+reach them. Its write() and read() methods are given as the pattern of the
+StreamSource and StreamSink of the FIFO: on every clock it writes only when
+the level is below the nearest unhit bin and reads only when it is above.
+Since the level moves by one word per cycle, every level on the way is hit,
+so a sweep of the whole range closes occupancy coverage in about two
+depths of cycles.
+
+    director = clk.add(OccupancyDirector(dut.fill_count, histogram("bram.fill_count.all_counts")))
+    clk.add(StreamSource(..., pattern=director.write))
+    clk.add(StreamSink(..., pattern=director.read))
+    await director.wait()
+
+Once target percent of the bins is hit, done is set and the director only
+reads, draining the FIFO.
+"""
+from    cocotb.triggers     import Event
+from    signals             import reader
+
+# ==============================================================================
+class OccupancyDirector(object):
+    def __init__(self, level, coverage, target=100.0, log=None):
+        self.level = level
+        self.read_level = reader(level)
+        self.coverage = coverage
+        self.remaining = set(coverage.unhit())
+        self.allowed = int(len(coverage.bins) * (1 - target / 100.0))
+        self.log = log
+        self.fill = 0
+        self.goal = None
+        self.cycles = 0
+        self.done = Event()
+        if log is not None:
+            log.info("Occupancy director: %d of %d bins unhit, target %.1f%%" % (len(self.remaining), len(coverage.bins), target))
+        self._plan()
+
+    def wait(self):
+        """Trigger fired once the target coverage is reached."""
+        return self.done.wait()
+
+    def sample(self):
+        self.cycles += 1
+        try:
+            self.fill = self.read_level()
+        except ValueError:
+            return
+        self.remaining.discard(self.fill)
+        if self.fill == self.goal or self.goal not in self.remaining:
+            self._plan()
+
+    def _plan(self):
+        if len(self.remaining) <= self.allowed:
+            self.goal = None
+            if not self.done.is_set():
+                if self.log is not None:
+                    self.log.info("Occupancy director: target reached after %d cycles" % self.cycles)
+                self.done.set()
+            return
+        self.goal = min(self.remaining, key=lambda b: abs(b - self.fill))
+
+    # Patterns of the write and read sides
+    def write(self):
+        return int(self.goal is not None and self.fill < self.goal)
+
+    def read(self):
+        return int(self.goal is None or self.fill > self.goal)
@@ -0,0 +1,42 @@
+"""
+Drain detection.
+
+drain() ends a test phase as soon as the DUT has delivered everything it was
+given, instead of a fixed settle Timer: the output count has reached the
+input count and the idle flags (e.g. empty high, valid low) have held for
+`settle` consecutive cycles of the output clock. It fails after `timeout`
+cycles, so a stuck FIFO never hangs the run and a deep FIFO or slow read
+clock is never cut short, and as soon as more words are out than expected.
+
+    yield drain(dut.m_axis_aclk, lambda: source.count, lambda: sink.count,
+                idle=[(dut.m_axis_tvalid, 0)], log=dut._log)
+
+Counts are functions so that they are read on every cycle; width converting
+FIFOs pass the number of output words the input can fill.
+"""
+from    cocotb.triggers     import RisingEdge
+from    signals             import flag
+
+# Default bound of a drain, in cycles of the output clock
+TIMEOUT = 100000
+
+# ==============================================================================
+async def drain(clk, expected, received, idle=(), settle=2, timeout=TIMEOUT, log=None, name="drain"):
+    """Wait until received() == expected() and every (signal, level) of idle holds for settle cycles."""
+    edge = RisingEdge(clk)
+    idle = [flag(signal, level) for signal, level in idle]
+    quiet = 0
+    for cycle in range(1, timeout + 1):
+        await edge
+        out, words = received(), expected()
+        if out > words:
+            raise AssertionError("%s: %d words out, only %d expected, after %d cycles" % (name, out, words, cycle))
+        if out == words and all(is_idle() for is_idle in idle):
+            quiet += 1
+            if quiet >= settle:
+                if log is not None:
+                    log.info("%s: %d words out, idle after %d cycles" % (name, received(), cycle))
+                return cycle
+        else:
+            quiet = 0
+    raise AssertionError("%s: %d of %d words out after %d cycles" % (name, received(), expected(), timeout))
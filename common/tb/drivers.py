@@ -0,0 +1,238 @@
+"""
+Bulk drivers and monitors.
+
+Handshake patterns (valid, ready, enable) are precomputed as NumPy arrays
+or traffic.Profile objects instead of calling randint() every clock, and
+every driver and monitor of a clock is run by a single ClockDomain
+coroutine: one trigger per cycle no matter how many signals are driven or
+sampled. A pattern may also be a function called once per cycle (e.g.
+directed.OccupancyDirector.write) when the activity depends on the DUT
+state.
+
+On every rising edge the agents first sample the DUT (values before the
+edge, as seen by the DUT registers) and then drive their next values.
+Handles are sampled through signals.reader()/flag(), resolved once per agent.
+"""
+import  cocotb
+import  numpy               as np
+from    cocotb.triggers     import RisingEdge, Event
+from    cocotb.utils        import get_sim_time
+from    signals             import reader, flag
+
+# ==============================================================================
+def _as_list(pattern):
+    if pattern is None or callable(pattern):
+        return pattern
+    # traffic.Profile
+    if hasattr(pattern, "pattern"):
+        pattern = pattern.pattern()
+    # Indexing a list is much cheaper than indexing a NumPy array per cycle
+    return np.asarray(pattern, dtype=np.uint8).tolist()
+
+# ==============================================================================
+class ClockDomain(object):
+    def __init__(self, clk):
+        self.clk = clk
+        self.edge = RisingEdge(clk)
+        self.cycle = 0
+        self.samplers = []
+        self.drivers = []
+        self.task = None
+
+    def add(self, agent):
+        """Register an object with sample() and/or drive() methods."""
+        if hasattr(agent, "sample"):
+            self.samplers.append(agent.sample)
+        if hasattr(agent, "drive"):
+            self.drivers.append(agent.drive)
+        self.start()
+        return agent
+
+    def on_edge(self, function):
+        """Call function() on every rising edge, together with the monitors."""
+        self.samplers.append(function)
+        self.start()
+        return function
+
+    def start(self):
+        if self.task is None:
+            self.task = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.kill()
+            self.task = None
+
+    async def _run(self):
+        edge = self.edge
+        samplers = self.samplers
+        drivers = self.drivers
+        while True:
+            await edge
+            self.cycle += 1
+            for sample in samplers:
+                sample()
+            for drive in drivers:
+                drive()
+
+# ==============================================================================
+class PatternDriver(object):
+    """Drive a one bit signal from a pattern repeated forever."""
+    def __init__(self, signal, pattern):
+        self.signal = signal
+        self.pattern = _as_list(pattern)
+        self.index = 0
+        self.value = None
+
+    def drive(self):
+        if callable(self.pattern):
+            value = self.pattern()
+        else:
+            value = self.pattern[self.index]
+            self.index = (self.index + 1) % len(self.pattern)
+        if value != self.value:
+            self.signal.value = value
+            self.value = value
+
+# ==============================================================================
+class StreamSource(object):
+    """
+    Drive data/valid with the words of an iterable.
+    A word is offered when the pattern says so (always without pattern) and is
+    held until it is accepted: ready sampled at ready_level on the edge, or at
+    once when there is no ready. With a gate, valid is only asserted while the
+    gate was sampled at gate_level (e.g. full_next low) and the pattern only
+    advances on those cycles.
+    """
+    def __init__(self, data, valid, words, ready=None, ready_level=1, gate=None, gate_level=1, pattern=None, on_accept=None):
+        self.data = data
+        self.valid = valid
+        self.words = iter(words)
+        self.ready = ready
+        self.ready_level = ready_level
+        self.gate = gate
+        self.gate_level = gate_level
+        self.is_ready = flag(ready, ready_level) if ready is not None else None
+        self.is_open = flag(gate, gate_level) if gate is not None else None
+        self.pattern = _as_list(pattern)
+        self.index = 0
+        self.on_accept = on_accept
+        self.word = next(self.words, None)
+        self.offered = False
+        self.gate_open = True
+        self.valid_value = None
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+        self.done = Event()
+
+    def wait(self):
+        """Trigger fired once every word has been accepted."""
+        return self.done.wait()
+
+    def sample(self):
+        if self.offered and (self.is_ready is None or self.is_ready()):
+            self.last_time = get_sim_time("ns")
+            if self.first_time is None:
+                self.first_time = self.last_time
+            self.count += 1
+            if self.on_accept is not None:
+                self.on_accept(self.word)
+            self.word = next(self.words, None)
+            self.offered = False
+        if self.is_open is not None:
+            self.gate_open = self.is_open()
+
+    def drive(self):
+        if self.word is None:
+            self._set_valid(0)
+            if not self.done.is_set():
+                self.done.set()
+        elif not self.gate_open:
+            self._set_valid(0)
+        elif self.offered:
+            self._set_valid(1)
+        elif self._next_pattern():
+            self.data.value = self.word
+            self.offered = True
+            self._set_valid(1)
+        else:
+            self._set_valid(0)
+
+    def _next_pattern(self):
+        if self.pattern is None:
+            return 1
+        if callable(self.pattern):
+            return self.pattern()
+        value = self.pattern[self.index]
+        self.index = (self.index + 1) % len(self.pattern)
+        return value
+
+    def _set_valid(self, value):
+        if not value:
+            self.offered = False
+        if value != self.valid_value:
+            self.valid.value = value
+            self.valid_value = value
+
+# ==============================================================================
+class StreamSink(object):
+    """
+    Monitor of a valid/ready interface: on_beat(int(data)) is called for every
+    transfer (valid at valid_level and ready high on the edge, ready is taken
+    as high when there is none). With a pattern, ready is driven from it too,
+    only while valid is asserted if wait_valid. With count, ready is released
+    and done is set after count beats.
+    """
+    def __init__(self, data, valid, on_beat, ready=None, pattern=None, wait_valid=False, count=None, valid_level=1):
+        self.data = data
+        self.valid = valid
+        self.on_beat = on_beat
+        self.ready = ready
+        self.pattern = _as_list(pattern)
+        self.index = 0
+        self.wait_valid = wait_valid
+        self.limit = count
+        self.valid_level = valid_level
+        self.read_data = reader(data)
+        self.is_valid = flag(valid, valid_level)
+        self.is_ready = flag(ready) if ready is not None else None
+        self.valid_now = False
+        self.ready_value = None
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+        self.done = Event()
+
+    def wait(self):
+        """Trigger fired once count beats have been received."""
+        return self.done.wait()
+
+    def sample(self):
+        self.valid_now = self.is_valid()
+        if self.limit is not None and self.count >= self.limit:
+            return
+        if self.valid_now and (self.is_ready is None or self.is_ready()):
+            self.last_time = get_sim_time("ns")
+            if self.first_time is None:
+                self.first_time = self.last_time
+            self.count += 1
+            self.on_beat(self.read_data())
+            if self.count == self.limit:
+                self.done.set()
+
+    def drive(self):
+        if self.pattern is None:
+            return
+        if self.limit is not None and self.count >= self.limit:
+            value = 0
+        elif self.wait_valid and not self.valid_now:
+            value = 0
+        elif callable(self.pattern):
+            value = self.pattern()
+        else:
+            value = self.pattern[self.index]
+            self.index = (self.index + 1) % len(self.pattern)
+        if value != self.ready_value:
+            self.ready.value = value
+            self.ready_value = value
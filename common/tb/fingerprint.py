@@ -0,0 +1,68 @@
+"""
+Fingerprints of passing runs, used to skip runs whose inputs did not change.
+
+A fingerprint covers the compiled design (see build_cache.build_key), the
+cocotb testbench modules, the pytest runner, the generics, the seed, the
+selected tests and the extra environment given to the run. Only runs with an
+explicit seed are fingerprinted: an unseeded run draws a new seed, so it
+always runs and keeps exploring.
+"""
+import  glob
+import  hashlib
+import  importlib.util
+import  json
+import  os
+
+# Set FORCE_RUN=1 to rerun everything regardless of the stored fingerprints
+FORCE_ENV = "FORCE_RUN"
+
+# ==============================================================================
+def testbench_files(module, python_search, runner=None):
+    """
+    Python files a run depends on: every *_tb.py next to the module, the shared
+    helpers and the test_*.py runner setting the generics and environment.
+    """
+    spec = importlib.util.find_spec(module)
+    tb_dir = os.path.dirname(spec.origin) if spec and spec.origin else os.getcwd()
+    files = glob.glob(os.path.join(tb_dir, "*_tb.py"))
+    for path in python_search:
+        files += glob.glob(os.path.join(path, "*.py"))
+    if runner is not None:
+        files.append(runner)
+    return sorted(set(os.path.abspath(f) for f in files))
+
+def fingerprint(build_key, tb_files, parameters, seed=None, testcase=None, extra_env=None):
+    h = hashlib.sha256(build_key.encode())
+    for path in tb_files:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    h.update(json.dumps({
+        "parameters": {k: str(v) for k, v in parameters.items()},
+        "seed": seed,
+        "testcase": testcase,
+        "test_name": os.getenv("TEST_NAME"),
+        "env": {k: str(v) for k, v in (extra_env or {}).items()},
+    }, sort_keys=True).encode())
+    return h.hexdigest()
+
+# ==============================================================================
+def forced():
+    return os.getenv(FORCE_ENV, "0") not in ("", "0")
+
+def is_unchanged(results_dir, value):
+    """True when the last run in results_dir passed with the same fingerprint."""
+    path = os.path.join(results_dir, "fingerprint")
+    if forced() or not os.path.isfile(path):
+        return False
+    with open(path) as f:
+        return f.read().strip() == value
+
+def clear(results_dir):
+    path = os.path.join(results_dir, "fingerprint")
+    if os.path.isfile(path):
+        os.remove(path)
+
+def record(results_dir, value):
+    with open(os.path.join(results_dir, "fingerprint"), "w") as f:
+        f.write(value + "\n")
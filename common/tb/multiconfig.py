@@ -0,0 +1,164 @@
+"""
+Multi-configuration wrapper.
+
+Starting the simulator and elaborating the design costs more than many of
+the tests themselves, and it is paid once per parameter set. wrapper()
+generates a VHDL top that instantiates the same entity once per generic
+set, each port of instance i brought out as c<i>_<port>, so a single
+simulation checks the whole matrix (see runner.run_multi). Shared input
+ports (clocks, resets) are brought out once and drive every instance, so
+the testbench starts one clock coroutine per clock whatever the number of
+configurations.
+
+In the cocotb module, instances(dut) returns one Instance per generic set.
+An Instance looks like the dut of a single configuration: its attributes
+are the c<i>_ ports of the wrapper (the shared ports themselves) and the
+generics of that configuration, so the existing testbench helpers drive and
+check it unchanged.
+"""
+import  json
+import  os
+import  re
+
+# ==============================================================================
+# Wrapper generation
+# ==============================================================================
+def _strip_comments(text):
+    return re.sub(r"--[^\n]*", "", text)
+
+def _clause(text, start):
+    """Body of the parenthesized clause opened at text[start] == '('."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:i]
+    raise ValueError("unbalanced parentheses")
+
+def _declarations(body):
+    """Split a generic/port clause on the ';' outside parentheses."""
+    decls, depth, current = [], 0, ""
+    for char in body:
+        depth += (char == "(") - (char == ")")
+        if char == ";" and depth == 0:
+            decls.append(current)
+            current = ""
+        else:
+            current += char
+    decls.append(current)
+    return [d.strip() for d in decls if d.strip()]
+
+def find_entity(sources, entity):
+    """Source file declaring entity."""
+    for path in sources:
+        if re.search(r"\bentity\s+%s\s+is\b" % entity, _strip_comments(open(path).read()), re.IGNORECASE):
+            return path
+    raise ValueError("entity %s not found in the sources" % entity)
+
+def parse_entity(path, entity):
+    """Return (context clause, generics, ports) of entity in the VHDL file path."""
+    text = _strip_comments(open(path).read())
+    match = re.search(r"\bentity\s+%s\s+is\b" % entity, text, re.IGNORECASE)
+    if match is None:
+        raise ValueError("entity %s not found in %s" % (entity, path))
+    context = "\n".join(l.strip() for l in text[:match.start()].splitlines() if re.match(r"\s*(library|use)\b", l, re.IGNORECASE))
+    header = text[match.end():re.search(r"\bend\b", text[match.end():], re.IGNORECASE).start() + match.end()]
+
+    generics, ports = [], []
+    for keyword, target in (("generic", generics), ("port", ports)):
+        clause = re.search(r"\b%s\s*\(" % keyword, header, re.IGNORECASE)
+        if clause is None:
+            continue
+        for decl in _declarations(_clause(header, clause.end() - 1)):
+            names, _, rest = decl.partition(":")
+            rest, _, default = rest.partition(":=")
+            for name in names.split(","):
+                target.append((name.strip(), " ".join(rest.split()), default.strip() or None))
+    return context, generics, ports
+
+def _substitute(text, values):
+    """Replace the generic names in a type or default by their values."""
+    for name, value in values.items():
+        text = re.sub(r"\b%s\b" % re.escape(name), "(%s)" % value, text, flags=re.IGNORECASE)
+    return text
+
+def configurations(path, entity, configs):
+    """Full generic values (defaults plus overrides) of every configuration."""
+    _, generics, _ = parse_entity(path, entity)
+    defaults = {name: default for name, _, default in generics}
+    return [dict(defaults, **{k: str(v) for k, v in config.items()}) for config in configs]
+
+def wrapper(path, entity, configs, name=None, shared=()):
+    """VHDL source of a top instantiating entity once per generic set of configs, the input ports in shared driven once."""
+    name = name or entity + "_multi"
+    context, generics, ports = parse_entity(path, entity)
+    values = configurations(path, entity, configs)
+    shared = set(shared)
+
+    port_lines, instances = [], []
+    for port, kind, default in ports:
+        if port in shared:
+            mode, _, vtype = kind.partition(" ")
+            if mode.lower() != "in":
+                raise ValueError("shared port %s of %s is not an input" % (port, entity))
+            port_lines.append("    %s : %s %s" % (port, mode, _substitute(vtype, values[0])))
+    for i, config in enumerate(values):
+        for port, kind, default in ports:
+            if port in shared:
+                continue
+            mode, _, vtype = kind.partition(" ")
+            line = "    c%d_%s : %s %s" % (i, port, mode, _substitute(vtype, config))
+            if default is not None:
+                line += " := " + _substitute(default, config)
+            port_lines.append(line)
+        instances.append(
+            "  u%d : entity work.%s\n" % (i, entity)
+            + "    generic map (\n" + ",\n".join("      %s => %s" % (g, config[g]) for g, _, _ in generics) + "\n    )\n"
+            + "    port map (\n" + ",\n".join("      %s => %s" % (p, p if p in shared else "c%d_%s" % (i, p)) for p, _, _ in ports) + "\n    );\n"
+        )
+    return (
+        "-- Generated by common/tb/multiconfig.py from %s, do not edit\n" % os.path.basename(path)
+        + context + "\n\n"
+        + "entity %s is\n  port (\n%s\n  );\nend entity;\n\n" % (name, ";\n".join(port_lines))
+        + "architecture wrapper of %s is\nbegin\n%s\nend architecture;\n" % (name, "\n".join(instances))
+    )
+
+# ==============================================================================
+# Harness
+# ==============================================================================
+class _Generic(int):
+    """Integer generic that also answers .value, like a generic handle."""
+    @property
+    def value(self):
+        return self
+
+class Instance(object):
+    def __init__(self, dut, index, generics, shared=()):
+        self._dut = dut
+        self._index = index
+        self._prefix = "c%d_" % index
+        self._shared = set(shared)
+        self._log = dut._log.getChild("c%d" % index)
+        self.generics = generics
+        for name, value in generics.items():
+            try:
+                setattr(self, name, _Generic(value))
+            except ValueError:
+                setattr(self, name, value)
+
+    def __getattr__(self, name):
+        handle = getattr(self._dut, name if name in self._shared else self._prefix + name)
+        setattr(self, name, handle)
+        return handle
+
+    def __repr__(self):
+        return "Instance(%d, %s)" % (self._index, self.generics)
+
+def instances(dut):
+    """One Instance per configuration of the wrapper (MULTI_CONFIGS and MULTI_SHARED, set by runner.run_multi)."""
+    configs = json.loads(os.environ["MULTI_CONFIGS"])
+    shared = json.loads(os.getenv("MULTI_SHARED", "[]"))
+    return [Instance(dut, i, config, shared) for i, config in enumerate(configs)]
@@ -0,0 +1,155 @@
+"""
+Declarative generic parameter spaces.
+
+A ParameterSpace lists the values of every generic of an IP, the rule that
+makes a combination legal for the DUT and the hand-picked corner cases that
+are always run. The parameter sets of a test_*.py runner are expanded from
+it at collection time with one of these strategies:
+
+    full        every legal combination of the axes
+    pairwise    every legal pair of values of any two generics, in a few runs
+    boundary    pairwise over the smallest and largest value of each axis
+
+    SPACE = ParameterSpace(
+        axes={"g_input_width": [8, 16, 32], "g_output_width": [8, 16, 32], "g_DEPTH": [8, 64]},
+        constraint=lambda p: p["g_DEPTH"] >= 2 * p["g_input_width"] // p["g_output_width"],
+        include=[{"g_input_width": "96", "g_output_width": "32", "g_DEPTH": "66"}],
+    )
+
+    @pytest.mark.parametrize("parameters", SPACE.expand())
+
+TEST_TIER picks the strategy of the space for that tier, "quick" for a
+covering subset before merging and "nightly" (the default) for the full
+sweep. PARAMETER_STRATEGY overrides it with a strategy name. tier_include
+adds sets to one tier only, e.g. the hand-picked list a space replaced, so
+that nightly keeps running everything it ran before.
+
+Expansion is deterministic, so the same tier always runs the same sets and
+the fingerprints of passing runs stay valid. Covering arrays take up to a
+second to build and are collected once per pytest process, so they are
+cached in sim_build/param_space/ (PARAM_SPACE_CACHE), keyed by the axes,
+the source of the constraint and of this module.
+"""
+import  hashlib
+import  inspect
+import  itertools
+import  json
+import  os
+
+# Strategy of each tier unless the space sets its own
+TIERS = {"quick": "boundary", "nightly": "full"}
+
+# Folder of the cached covering arrays, relative to the runner folder like sim_build
+CACHE_DIR = os.getenv("PARAM_SPACE_CACHE", os.path.join("sim_build", "param_space"))
+
+# ==============================================================================
+def covering(axes, strength=2, valid=lambda values: True):
+    """
+    Rows (tuples of values in the axes order) covering every combination of
+    `strength` values of any `strength` axes that appears in a valid row.
+    Greedy: the first uncovered tuple is completed with the valid row that
+    covers the most uncovered tuples.
+    """
+    strength = min(strength, len(axes))
+    positions = list(itertools.combinations(range(len(axes)), strength))
+    rows = [row for row in itertools.product(*axes) if valid(row)]
+
+    def tuples(row):
+        return [(pos, tuple(row[i] for i in pos)) for pos in positions]
+
+    candidates = {}
+    for row in rows:
+        for t in tuples(row):
+            candidates.setdefault(t, []).append(row)
+
+    uncovered = set(candidates)
+    order = sorted(candidates, key=lambda t: (t[0], [str(v) for v in t[1]]))
+    chosen = []
+    for t in order:
+        if t not in uncovered:
+            continue
+        best = max(candidates[t], key=lambda row: sum(u in uncovered for u in tuples(row)))
+        chosen.append(best)
+        uncovered.difference_update(tuples(best))
+    return chosen
+
+def _source(function):
+    """Source of a constraint, its bytecode when the source is not available."""
+    if function is None:
+        return ""
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return repr((function.__code__.co_code, function.__code__.co_consts))
+
+def cached_covering(axes, strength, valid, constraint=None):
+    """covering(), read from CACHE_DIR when the same axes and constraint were expanded before."""
+    with open(__file__, "rb") as f:
+        h = hashlib.sha256(f.read())
+    h.update(json.dumps([[[str(v) for v in values] for values in axes], strength]).encode())
+    h.update(_source(constraint).encode())
+    path = os.path.join(CACHE_DIR, h.hexdigest()[:16] + ".json")
+    lookup = {str(v): v for values in axes for v in values}
+    if os.path.isfile(path):
+        with open(path) as f:
+            return [tuple(lookup[v] for v in row) for row in json.load(f)]
+    rows = covering(axes, strength, valid)
+    # Written under a temporary name, so concurrent collections never read half a file
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path + ".%d" % os.getpid(), "w") as f:
+        json.dump([[str(v) for v in row] for row in rows], f)
+    os.replace(path + ".%d" % os.getpid(), path)
+    return rows
+
+# ==============================================================================
+class ParameterSpace(object):
+    def __init__(self, axes, constraint=None, include=(), tiers=None, tier_include=None):
+        self.names = list(axes)
+        self.axes = [list(axes[name]) for name in self.names]
+        self.constraint = constraint
+        self.include = [{k: str(v) for k, v in p.items()} for p in include]
+        self.tiers = dict(TIERS, **(tiers or {}))
+        self.tier_include = {tier: [{k: str(v) for k, v in p.items()} for p in sets] for tier, sets in (tier_include or {}).items()}
+        self._expanded = {}
+
+    def _valid(self, row):
+        if self.constraint is None:
+            return True
+        return self.constraint(dict(zip(self.names, row)))
+
+    def _sets(self, rows):
+        """Parameter dicts of rows followed by the corner cases not already in them."""
+        sets = [{name: str(value) for name, value in zip(self.names, row)} for row in rows]
+        return sets + [p for p in self.include if p not in sets]
+
+    def full(self):
+        return self._sets(row for row in itertools.product(*self.axes) if self._valid(row))
+
+    def pairwise(self, strength=2):
+        return self._sets(cached_covering(self.axes, strength, self._valid, self.constraint))
+
+    def boundary(self):
+        extremes = [sorted({min(values), max(values)}) for values in self.axes]
+        return self._sets(cached_covering(extremes, 2, self._valid, self.constraint))
+
+    def tier(self):
+        """Tier selected by TEST_TIER."""
+        tier = os.getenv("TEST_TIER", "nightly")
+        if tier not in self.tiers:
+            raise ValueError("unknown TEST_TIER %r, expected one of %s" % (tier, ", ".join(sorted(self.tiers))))
+        return tier
+
+    def strategy(self):
+        """Strategy selected by PARAMETER_STRATEGY or TEST_TIER."""
+        return os.getenv("PARAMETER_STRATEGY") or self.tiers[self.tier()]
+
+    def expand(self, strategy=None):
+        """Parameter sets (generic name -> string value) of strategy, the selected one by default, plus the sets of the tier."""
+        strategy = strategy or self.strategy()
+        if strategy not in ("full", "pairwise", "boundary"):
+            raise ValueError("unknown parameter strategy %r" % strategy)
+        tier = self.tier()
+        if (strategy, tier) not in self._expanded:
+            sets = getattr(self, strategy)()
+            self._expanded[strategy, tier] = sets + [p for p in self.tier_include.get(tier, []) if p not in sets]
+        return self._expanded[strategy, tier]
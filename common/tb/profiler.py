@@ -0,0 +1,180 @@
+"""
+Per coroutine profiling of cocotb testbenches.
+
+A testbench module calls install() once at import time. With
+PROFILE_COROUTINES=1 every resumption of a cocotb task is timed: Python CPU
+time and the triggers that woke it are attributed to the coroutine the task
+was started with (TB.read_dut, ClockDomain._run, Clock.start...). Since one
+ClockDomain task runs every driver and monitor of its clock, each sampler
+and driver it calls is timed as well, under its own qualified name
+(StallMonitor.sample, TB.run_ring_buffer_golden_model.<locals>.on_edge...),
+and that time is left out of ClockDomain._run. CPU time of the test spent
+outside any task (scheduler, GPI callbacks) is reported as <scheduler>. At
+the end of each test two files are appended in RESULT_PATH:
+
+    profile.txt      tasks sorted by CPU time, with resumes per trigger type
+    profile.folded   "test;task;trigger microseconds" lines, for flamegraph.pl
+                     or speedscope
+
+cocotb's own COCOTB_ENABLE_PROFILING profiles functions over the whole run;
+this one answers which started coroutine the time goes to.
+"""
+import  os
+import  time
+from    collections import defaultdict
+
+REPORT_FILE = "profile.txt"
+FOLDED_FILE = "profile.folded"
+
+# Tasks listed in the report of each test, the rest are summed in one line
+REPORT_TASKS = 30
+
+# ==============================================================================
+# In simulation
+# ==============================================================================
+_installed = False
+
+# task name -> [resumes, CPU seconds, {trigger type: [resumes, CPU seconds]}]
+_stats = {}
+
+# CPU seconds of the ClockDomain callables, subtracted from the task calling them
+_nested = [0.0]
+
+# callable -> qualified name
+_names = {}
+
+def install():
+    """Profile every test of this run when PROFILE_COROUTINES=1."""
+    global _installed
+    if _installed or os.getenv("PROFILE_COROUTINES") != "1":
+        return
+    _installed = True
+    for name in (REPORT_FILE, FOLDED_FILE):
+        path = _path(name)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    import drivers
+    from cocotb.scheduler import Scheduler
+    from cocotb.regression import RegressionManager
+    schedule = Scheduler._schedule
+    start_test = RegressionManager._start_test
+    record_result = RegressionManager._record_result
+
+    def _schedule(self, coroutine, trigger=None):
+        nested = _nested[0]
+        start = time.process_time()
+        try:
+            return schedule(self, coroutine, trigger)
+        finally:
+            cpu = time.process_time() - start - (_nested[0] - nested)
+            _add(task_name(coroutine), trigger_name(trigger), cpu)
+
+    def _start_test(self):
+        _stats.clear()
+        _names.clear()
+        self._profiler_cpu = time.process_time()
+        return start_test(self)
+
+    def _record_result(self, test, outcome, wall_time_s, sim_time_ns):
+        cpu = getattr(self, "_profiler_cpu", None)
+        self._profiler_cpu = None
+        if outcome is not None and cpu is not None:
+            _write(test.__qualname__, time.process_time() - cpu, wall_time_s, sim_time_ns)
+        return record_result(self, test, outcome, wall_time_s, sim_time_ns)
+
+    _clock_domain_run.__qualname__ = drivers.ClockDomain._run.__qualname__
+    drivers.ClockDomain._run = _clock_domain_run
+    Scheduler._schedule = _schedule
+    RegressionManager._start_test = _start_test
+    RegressionManager._record_result = _record_result
+
+async def _clock_domain_run(self):
+    """ClockDomain._run timing each sampler and driver."""
+    edge = self.edge
+    samplers = self.samplers
+    drivers = self.drivers
+    trigger = trigger_name(edge)
+    while True:
+        await edge
+        self.cycle += 1
+        for sample in samplers:
+            _call(sample, trigger)
+        for drive in drivers:
+            _call(drive, trigger)
+
+def _call(function, trigger):
+    start = time.process_time()
+    function()
+    cpu = time.process_time() - start
+    _nested[0] += cpu
+    name = _names.get(function)
+    if name is None:
+        name = _names[function] = callable_name(function)
+    _add(name, trigger, cpu)
+
+def callable_name(function):
+    """Qualified name of a sampler or driver, with the class of the agent for methods."""
+    agent = getattr(function, "__self__", None)
+    if agent is not None:
+        return "%s.%s" % (type(agent).__qualname__, function.__name__)
+    return getattr(function, "__qualname__", type(function).__name__)
+
+def task_name(task):
+    """Qualified name of the coroutine a task runs."""
+    coro = getattr(task, "_coro", task)
+    return getattr(coro, "__qualname__", type(coro).__name__)
+
+def trigger_name(trigger):
+    """Class of a trigger without the leading underscore of cocotb's private ones (_Event, _Join)."""
+    return "start" if trigger is None else type(trigger).__name__.lstrip("_")
+
+def _add(task, trigger, cpu):
+    stats = _stats.get(task)
+    if stats is None:
+        stats = _stats[task] = [0, 0.0, defaultdict(lambda: [0, 0.0])]
+    stats[0] += 1
+    stats[1] += cpu
+    by_trigger = stats[2][trigger]
+    by_trigger[0] += 1
+    by_trigger[1] += cpu
+
+def _path(name):
+    return os.path.join(os.getenv("RESULT_PATH", "."), name)
+
+# ==============================================================================
+# Reports
+# ==============================================================================
+def report(test, cpu_s, wall_s, sim_ns, stats):
+    """Text report of one test, tasks sorted by CPU time."""
+    tasks = sorted(stats.items(), key=lambda item: item[1][1], reverse=True)
+    in_tasks = sum(s[1] for _, s in tasks)
+    lines = ["%s: %.3f s CPU, %.3f s wall, %.0f ns simulated" % (test, cpu_s, wall_s, sim_ns),
+             "  %-48s %9s %7s %10s  %s" % ("task / callable", "CPU s", "%", "resumes", "triggers")]
+    for name, (resumes, cpu, by_trigger) in tasks[:REPORT_TASKS]:
+        triggers = ", ".join("%s %d" % (t, n) for t, (n, _) in sorted(by_trigger.items(), key=lambda item: -item[1][0]))
+        lines.append("  %-48s %9.3f %6.1f%% %10d  %s" % (name, cpu, 100 * cpu / cpu_s if cpu_s else 0, resumes, triggers))
+    rest = tasks[REPORT_TASKS:]
+    if rest:
+        cpu = sum(s[1] for _, s in rest)
+        lines.append("  %-48s %9.3f %6.1f%% %10d" % ("(%d more tasks)" % len(rest), cpu, 100 * cpu / cpu_s if cpu_s else 0, sum(s[0] for _, s in rest)))
+    outside = max(cpu_s - in_tasks, 0.0)
+    lines.append("  %-48s %9.3f %6.1f%%" % ("<scheduler>", outside, 100 * outside / cpu_s if cpu_s else 0))
+    return "\n".join(lines) + "\n\n"
+
+def folded(test, cpu_s, stats):
+    """Folded stacks of one test (microseconds of CPU), one line per task and trigger."""
+    lines = []
+    for name, (_, _, by_trigger) in sorted(stats.items()):
+        for trigger, (_, cpu) in sorted(by_trigger.items()):
+            lines.append("%s;%s;%s %d" % (test, name, trigger, round(cpu * 1e6)))
+    outside = cpu_s - sum(s[1] for s in stats.values())
+    if outside > 0:
+        lines.append("%s;<scheduler> %d" % (test, round(outside * 1e6)))
+    return "".join(line + "\n" for line in lines)
+
+def _write(test, cpu_s, wall_s, sim_ns):
+    with open(_path(REPORT_FILE), "a") as f:
+        f.write(report(test, cpu_s, wall_s, sim_ns, _stats))
+    with open(_path(FOLDED_FILE), "a") as f:
+        f.write(folded(test, cpu_s, _stats))
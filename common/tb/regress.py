@@ -0,0 +1,147 @@
+"""
+Parallel regression runner.
+
+Collects every parametrization of the test_*.py runners and executes each one
+in its own pytest process, spreading the matrix over all local cores.
+
+    python common/tb/regress.py                       # every IP
+    python common/tb/regress.py fifo_bram asymmetric_fifo -j 16
+    python common/tb/regress.py --force               # ignore previous passing runs
+    python common/tb/regress.py --tier quick          # covering subset of the generics
+    python common/tb/regress.py --sim nvc             # same matrix on nvc
+    python common/tb/regress.py --waves               # rerun failures dumping waves
+    python common/tb/regress.py --profile             # CPU time per coroutine, see profiler.py
+    python common/tb/regress.py --stalls              # valid/ready stall attribution, see stalls.py
+"""
+import  argparse
+import  glob
+import  json
+import  os
+import  subprocess
+import  sys
+import  time
+import  simspeed
+import  coverage_report
+from    runner              import SIMULATORS
+from    concurrent.futures  import ThreadPoolExecutor, as_completed
+from    xml.etree           import ElementTree as ET
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+# ==============================================================================
+def find_test_files(ips, pattern="test_*.py"):
+    """Return the runners matching pattern of the selected IPs (all of them if empty)."""
+    if not ips:
+        ips = sorted(d for d in os.listdir(REPO_DIR) if glob.glob(os.path.join(REPO_DIR, d, "tb", pattern)))
+    files = []
+    for ip in ips:
+        files += sorted(glob.glob(os.path.join(REPO_DIR, ip, "tb", pattern)))
+    return files
+
+def collect(test_file, env):
+    """Return the pytest node ids of one runner, one per parameter set."""
+    out = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", os.path.basename(test_file)],
+        cwd=os.path.dirname(test_file), env=env, capture_output=True, text=True,
+    )
+    return [line.strip() for line in out.stdout.splitlines() if "::" in line]
+
+# ==============================================================================
+def run_node(test_file, node_id, results_dir, env):
+    """Run a single parameter set and return its result record."""
+    ip = os.path.basename(os.path.dirname(os.path.dirname(test_file)))
+    name = node_id.split("::", 1)[1].replace("/", "_")
+    log_file = os.path.join(results_dir, ip, name + ".log")
+    xml_file = os.path.join(results_dir, ip, name + ".xml")
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    start = time.time()
+    with open(log_file, "w") as log:
+        proc = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-o", "log_cli=True", "--junitxml=" + xml_file, node_id],
+            cwd=os.path.dirname(test_file), env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    status = "passed" if proc.returncode == 0 else "failed"
+    if status == "passed" and os.path.isfile(xml_file):
+        suite = ET.parse(xml_file).getroot().find(".//testsuite")
+        if suite is not None and int(suite.get("skipped", 0)) > 0:
+            status = "skipped"
+
+    return {
+        "ip": ip,
+        "test": name,
+        "status": status,
+        "duration": round(time.time() - start, 2),
+        "log": log_file,
+    }
+
+def run_all(test_files, results_dir, env, workers):
+    """Run every parameter set of test_files on workers processes, return the sorted results."""
+    jobs = []
+    for test_file in test_files:
+        jobs += [(test_file, node_id) for node_id in collect(test_file, env)]
+    print("Running %d simulations on %d workers" % (len(jobs), workers))
+
+    os.makedirs(results_dir, exist_ok=True)
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_node, test_file, node_id, results_dir, env) for test_file, node_id in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print("[%3d/%d] %-7s %6.1fs  %s::%s" % (len(results), len(jobs), result["status"].upper(), result["duration"], result["ip"], result["test"]))
+    results.sort(key=lambda r: (r["ip"], r["test"]))
+    return results
+
+# ==============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Run the FIFO regression in parallel")
+    parser.add_argument("ips", nargs="*", help="IP folders to run (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel simulations (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="rerun parameter sets that already passed unchanged")
+    parser.add_argument("-s", "--sim", choices=SIMULATORS, help="simulator (default: SIM or ghdl)")
+    parser.add_argument("-w", "--waves", action="store_true", help="rerun failed parameter sets dumping waves (WAVES_ON_FAILURE=1)")
+    parser.add_argument("-p", "--profile", action="store_true", help="write CPU time per coroutine to profile.txt in each run folder (PROFILE_COROUTINES=1)")
+    parser.add_argument("--stalls", action="store_true", help="write the valid/ready stall attribution to stalls.jsonl in each run folder (STALL_MONITOR=1)")
+    parser.add_argument("-t", "--tier", choices=["quick", "nightly"], help="parameter sets to run, see param_space.py (default: TEST_TIER or nightly)")
+    parser.add_argument("-o", "--results", default=os.path.join(REPO_DIR, "regression"), help="results folder")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.sim:
+        env["SIM"] = args.sim
+    env.setdefault("SIM", "ghdl")
+    env.setdefault("TEST_NAME", "test_all")
+    if args.force:
+        env["FORCE_RUN"] = "1"
+    if args.tier:
+        env["TEST_TIER"] = args.tier
+    if args.waves:
+        env["WAVES_ON_FAILURE"] = "1"
+    if args.profile:
+        env["PROFILE_COROUTINES"] = "1"
+    if args.stalls:
+        env["STALL_MONITOR"] = "1"
+
+    results = run_all(find_test_files(args.ips), args.results, env, args.jobs)
+
+    # Merged summary
+    summary = {s: sum(r["status"] == s for r in results) for s in ("passed", "failed", "skipped")}
+    with open(os.path.join(args.results, "summary.json"), "w") as f:
+        json.dump({"summary": summary, "results": results}, f, indent=2)
+    # Speed of every cocotb test, compared with `simspeed.py compare <baseline>`
+    with open(os.path.join(args.results, "simspeed.json"), "w") as f:
+        json.dump(simspeed.collect(), f, indent=2, sort_keys=True)
+    # Functional coverage merged over every parameter set
+    with open(os.path.join(args.results, "coverage.json"), "w") as f:
+        json.dump(coverage_report.merge(coverage_report.find_files(args.ips)), f, indent=2, sort_keys=True)
+
+    print("=" * 80)
+    for r in results:
+        if r["status"] == "failed":
+            print("FAILED %s::%s (see %s)" % (r["ip"], r["test"], r["log"]))
+    print("%(passed)d passed, %(failed)d failed, %(skipped)d skipped" % summary)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Tiered test reporting.
+
+Checks do not log every word by default. TB_VERBOSITY picks the tier:
+
+    summary   one line per checked phase, and each of the first mismatches
+              (TB_MAX_ERRORS, 10) with the TB_CONTEXT (4) words before and
+              after it (default)
+    trace     every word as well
+
+Messages are given as a format and its arguments and only formatted when
+they are printed, so a disabled tier costs a comparison per word:
+
+    report = Reporter(dut._log)
+    if report.tracing:
+        report.trace("beat %d: %s", index, hex(word))
+"""
+import  os
+
+SUMMARY = 0
+TRACE = 1
+TIERS = {"summary": SUMMARY, "trace": TRACE}
+
+# ==============================================================================
+def verbosity():
+    """Tier selected by TB_VERBOSITY."""
+    name = os.getenv("TB_VERBOSITY", "summary")
+    if name not in TIERS:
+        raise ValueError("TB_VERBOSITY=%s, expected one of %s" % (name, ", ".join(TIERS)))
+    return TIERS[name]
+
+def max_errors():
+    """Mismatches reported in full, TB_MAX_ERRORS."""
+    return int(os.getenv("TB_MAX_ERRORS", 10))
+
+def context():
+    """Words shown before and after each reported mismatch, TB_CONTEXT."""
+    return int(os.getenv("TB_CONTEXT", 4))
+
+def fmt(word):
+    return hex(word) if isinstance(word, int) else repr(word)
+
+# ==============================================================================
+class Reporter(object):
+    def __init__(self, log, tier=None):
+        self.log = log
+        self.tier = verbosity() if tier is None else tier
+        self.tracing = self.tier >= TRACE
+
+    def summary(self, msg, *args):
+        self.log.info(msg, *args)
+
+    def trace(self, msg, *args):
+        if self.tracing:
+            self.log.info(msg, *args)
+
+    def error(self, msg, *args):
+        self.log.error(msg, *args)
+
+    def word(self, name, index, expected, received):
+        """Context line of one word around a mismatch."""
+        if expected == received:
+            self.log.info("%s:   word %d %s", name, index, fmt(received))
+        else:
+            self.log.info("%s:   word %d %s, expected %s", name, index, fmt(received), fmt(expected))
@@ -0,0 +1,312 @@
+import  hashlib
+import  json
+import  os
+import  random
+import  sys
+import  pytest
+import  fingerprint
+import  multiconfig
+import  soak
+import  cocotb
+from    cocotb                  import config as cocotb_config
+from    cocotb_test.simulator   import run
+from    build_cache             import cached_build
+from    xml.etree               import ElementTree as ET
+
+# Directory of the shared testbench modules, added to the simulator PYTHONPATH
+COMMON_TB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Simulators accepted in SIM by the test_*.py runners
+SIMULATORS = ("ghdl", "nvc")
+
+# Simulators applying the generics when elaborating, so each parameter set needs its own build
+ELABORATION_GENERICS = ("nvc",)
+
+# run() arguments that change the compiled design
+COMPILE_ARGS = ("compile_args", "vhdl_compile_args", "extra_args")
+
+# Folder of the benchmark JSON files
+BENCHMARK_DIR = os.getenv("BENCHMARK_DIR", os.path.abspath(os.path.join(COMMON_TB_DIR, "../../benchmark")))
+
+# (source, sink) traffic profiles of every benchmark, see traffic.py
+BENCHMARK_TRAFFIC = [
+    ("always",              "always"),
+    ("bernoulli:duty=0.5",  "always"),
+    ("always",              "bernoulli:duty=0.5"),
+    ("bursty:on=16,off=4",  "bursty:on=16,off=4"),
+    ("always",              "stalls:every=1000,stall=200"),
+]
+
+# VHDL of the soak harnesses, in compilation order, see soak.py
+SOAK_SOURCES = [os.path.abspath(os.path.join(COMMON_TB_DIR, "../hdl", f)) for f in ("soak_pkg.vhd", "soak_source.vhd", "soak_sink.vhd")]
+
+# ==============================================================================
+def sim_build_dir(toplevel, parameters=None, root="sim_build"):
+    """
+    Return the results directory of one parameter set.
+    Every parametrization gets its own folder so runs never share files.
+    """
+    if not parameters:
+        return os.path.join(root, toplevel)
+    tag = "__".join("%s_%s" % (name, value) for name, value in sorted(parameters.items()))
+    return os.path.join(root, toplevel, tag)
+
+def results_root(sim):
+    """Root of the results folders, GHDL runs keep the original layout."""
+    return "sim_build" if sim == "ghdl" else os.path.join("sim_build", sim)
+
+def caller_file():
+    """File of the first caller outside common/tb, the test_*.py runner."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = os.path.abspath(frame.f_code.co_filename)
+        if os.path.dirname(path) != COMMON_TB_DIR:
+            return path
+        frame = frame.f_back
+    return None
+
+def check_simulator(sim):
+    """Fail early with a clear message when the cocotb install cannot drive sim."""
+    if sim not in SIMULATORS:
+        raise ValueError("unsupported simulator SIM=%s, expected one of %s" % (sim, ", ".join(SIMULATORS)))
+    if sim == "nvc":
+        try:
+            cocotb_config.lib_name_path("vhpi", "nvc")
+        except ValueError:
+            raise RuntimeError("SIM=nvc needs cocotb >= 1.9 (VHPI library for nvc), this is cocotb %s" % cocotb.__version__)
+
+# ==============================================================================
+# Waves on failure
+# ==============================================================================
+def wave_args(sim, path, stop_ns=None):
+    """Simulation arguments dumping every signal to path, in the format of its extension."""
+    fmt = os.path.splitext(path)[1][1:]
+    if sim == "ghdl":
+        args = ["--%s=%s" % ("wave" if fmt == "ghw" else fmt, path)]
+    else:
+        args = ["--wave=" + path, "--format=" + fmt]
+    if stop_ns is not None:
+        args.append("--stop-time=%dns" % stop_ns)
+    return args
+
+def failure_point(results_file):
+    """(seed, simulated ns at the end of the first failing test) of a cocotb results file."""
+    tree = ET.parse(results_file)
+    seed = None
+    for prop in tree.iter("property"):
+        if prop.get("name") == "random_seed":
+            seed = int(prop.get("value"))
+    elapsed = 0.0
+    for testcase in tree.iter("testcase"):
+        elapsed += float(testcase.get("sim_time_ns", 0))
+        if testcase.find("failure") is not None:
+            return seed, elapsed
+    return seed, None
+
+def _run(results_file, **kwargs):
+    """cocotb_test run() writing the cocotb results to results_file."""
+    # run() only takes the results file from the process environment
+    if os.path.isfile(results_file):
+        os.remove(results_file)
+    previous = os.environ.get("COCOTB_RESULTS_FILE")
+    os.environ["COCOTB_RESULTS_FILE"] = results_file
+    try:
+        return run(**kwargs)
+    finally:
+        if previous is None:
+            del os.environ["COCOTB_RESULTS_FILE"]
+        else:
+            os.environ["COCOTB_RESULTS_FILE"] = previous
+
+def rerun_with_waves(sim, toplevel, results_dir, run_kwargs):
+    """
+    Rerun a failed parameter set with the seed of the failure, dumping waves
+    to <results_dir>/waves/. With WAVES_STOP_AFTER_NS the rerun stops that
+    long after the end of the first failing test. Return the wave file.
+    """
+    results_file = os.path.join(results_dir, "results.xml")
+    seed, failure_ns = failure_point(results_file) if os.path.isfile(results_file) else (None, None)
+
+    waves_dir = os.path.join(results_dir, "waves")
+    os.makedirs(waves_dir, exist_ok=True)
+    wave_file = os.path.join(waves_dir, "%s.%s" % (toplevel, os.getenv("WAVES_FORMAT", "ghw" if sim == "ghdl" else "fst")))
+    stop_after = os.getenv("WAVES_STOP_AFTER_NS")
+    stop_ns = failure_ns + float(stop_after) if stop_after is not None and failure_ns is not None else None
+
+    kwargs = dict(run_kwargs)
+    if kwargs.get("seed") is None and seed is not None:
+        kwargs["seed"] = seed
+    kwargs["sim_args"] = list(kwargs.get("sim_args") or []) + wave_args(sim, wave_file, stop_ns)
+    env = dict(kwargs["extra_env"])
+    env["RESULT_PATH"] = waves_dir
+    env.pop("SIMSPEED_FILE")
+    kwargs["extra_env"] = env
+    try:
+        _run(os.path.join(waves_dir, "results.xml"), **kwargs)
+    except SystemExit:
+        pass
+    return wave_file
+
+# ==============================================================================
+def run_sim(vhdl_sources, toplevel, module, parameters=None, extra_env=None, results_dir=None, **kwargs):
+    """
+    Wrapper of cocotb_test run() used by every test_*.py runner.
+    Generics are passed to the simulator and exported to the cocotb module.
+    The design is compiled once into the shared build cache and each parameter
+    set only writes its results to its own folder.
+    Runs that already passed with the same sources, testbench, generics and
+    explicit seed (RANDOM_SEED or seed=) are skipped unless FORCE_RUN=1;
+    unseeded runs always run, each with a new seed.
+    GHDL applies the generics at run time, so all parameter sets share one
+    build; nvc binds them when elaborating, so each set is built once.
+    With WAVES_ON_FAILURE=1 runs do not trace, and a failed parameter set is
+    run again with the same seed dumping waves (see rerun_with_waves()).
+    """
+    parameters = dict(parameters or {})
+    sim = os.getenv("SIM", "ghdl")
+    check_simulator(sim)
+    results_dir = os.path.abspath(results_dir or sim_build_dir(toplevel, parameters, root=results_root(sim)))
+    os.makedirs(results_dir, exist_ok=True)
+
+    compile_kwargs = {k: kwargs[k] for k in COMPILE_ARGS if k in kwargs}
+    build_parameters = parameters if sim in ELABORATION_GENERICS else None
+    build_dir = cached_build(vhdl_sources, toplevel, module, sim, parameters=build_parameters, **compile_kwargs)
+
+    seed = kwargs.get("seed", os.getenv("RANDOM_SEED"))
+    run_id = None
+    if seed is not None:
+        tb_files = fingerprint.testbench_files(module, [COMMON_TB_DIR], runner=caller_file())
+        run_id = fingerprint.fingerprint(os.path.basename(build_dir), tb_files, parameters, seed, kwargs.get("testcase"), extra_env)
+        if fingerprint.is_unchanged(results_dir, run_id):
+            pytest.skip("unchanged since last passing run (FORCE_RUN=1 to rerun)")
+    fingerprint.clear(results_dir)
+
+    env = dict(parameters)
+    env.update(extra_env or {})
+    # Files written by the testbench (coverage, reports) stay inside the run folder
+    env.setdefault("RESULT_PATH", results_dir)
+    env["RUN_INFO"] = json.dumps({"toplevel": toplevel, "simulator": sim, "parameters": {k: str(v) for k, v in parameters.items()}})
+    # Per test speed records, see simspeed.py
+    env["SIMSPEED_FILE"] = os.path.join(results_dir, "simspeed.jsonl")
+    env["SIMSPEED_RUN"] = os.path.relpath(results_dir, os.path.abspath("sim_build"))
+    if os.path.isfile(env["SIMSPEED_FILE"]):
+        os.remove(env["SIMSPEED_FILE"])
+
+    run_kwargs = dict(
+        vhdl_sources=vhdl_sources,
+        toplevel=toplevel,
+        module=module,
+        toplevel_lang="vhdl",
+        parameters=parameters,
+        extra_env=env,
+        sim_build=build_dir,
+        python_search=[COMMON_TB_DIR],
+        **kwargs
+    )
+    try:
+        results_file = _run(os.path.join(results_dir, "results.xml"), **run_kwargs)
+    except SystemExit as failure:
+        if os.getenv("WAVES_ON_FAILURE") != "1":
+            raise
+        wave_file = rerun_with_waves(sim, toplevel, results_dir, run_kwargs)
+        raise SystemExit("%s Waves of the failure: %s" % (failure, wave_file)) from failure
+    if run_id is not None:
+        fingerprint.record(results_dir, run_id)
+    return results_file
+
+# ==============================================================================
+def run_benchmark(vhdl_sources, toplevel, module, ip, parameters=None, source="always", sink="always", extra_env=None, **kwargs):
+    """
+    Run the `benchmark` cocotb test of module with the given traffic profiles.
+    The testbench writes its measurements to BENCHMARK_DIR/<ip>/<run>.json.
+    """
+    parameters = dict(parameters or {})
+    sim = os.getenv("SIM", "ghdl")
+    tag = os.path.basename(sim_build_dir(toplevel, parameters))
+    name = "%s__%s__%s__%s" % (tag, source, sink, sim)
+    for char in ":,=.":
+        name = name.replace(char, "_")
+    env = dict(extra_env or {})
+    env.update({
+        "SOURCE_TRAFFIC": source,
+        "SINK_TRAFFIC": sink,
+        "BENCHMARK_FILE": os.path.join(BENCHMARK_DIR, ip, name + ".json"),
+        "BENCHMARK_INFO": json.dumps({"ip": ip, "simulator": sim, "toplevel": toplevel, "parameters": parameters, "source": source, "sink": sink, "env": extra_env or {}}),
+    })
+    return run_sim(
+        vhdl_sources, toplevel, module,
+        parameters=parameters,
+        extra_env=env,
+        results_dir=os.path.join(sim_build_dir(toplevel, parameters, root=os.path.join(results_root(sim), "benchmark")), name),
+        testcase="benchmark",
+        **kwargs
+    )
+
+# ==============================================================================
+def run_multi(vhdl_sources, toplevel, module, configs, testcase, shared=(), extra_env=None, **kwargs):
+    """
+    Run the cocotb test `testcase` of module once over every generic set of
+    configs, on a generated wrapper instantiating toplevel once per set (see
+    multiconfig.py): one simulator start and elaboration for the whole matrix.
+    The input ports in shared (clocks, resets) are driven once for all sets.
+    """
+    source = multiconfig.find_entity(vhdl_sources, toplevel)
+    values = multiconfig.configurations(source, toplevel, configs)
+    shared = sorted(shared)
+    h = hashlib.sha256(json.dumps([values, shared], sort_keys=True).encode())
+    with open(source, "rb") as f:
+        h.update(f.read())
+    tag = h.hexdigest()[:12]
+    root = os.path.join(results_root(os.getenv("SIM", "ghdl")), "multi")
+
+    # Named after its configurations and source, so concurrent runs write the same content
+    wrapper_file = os.path.abspath(os.path.join(root, "%s_multi_%s.vhd" % (toplevel, tag)))
+    os.makedirs(os.path.dirname(wrapper_file), exist_ok=True)
+    if not os.path.isfile(wrapper_file):
+        with open(wrapper_file + ".%d" % os.getpid(), "w") as f:
+            f.write(multiconfig.wrapper(source, toplevel, configs, shared=shared))
+        os.replace(wrapper_file + ".%d" % os.getpid(), wrapper_file)
+
+    env = dict(extra_env or {})
+    env["MULTI_CONFIGS"] = json.dumps(values)
+    env["MULTI_SHARED"] = json.dumps(shared)
+    return run_sim(
+        list(vhdl_sources) + [wrapper_file], toplevel + "_multi", module,
+        extra_env=env,
+        results_dir=os.path.join(root, toplevel, tag),
+        testcase=testcase,
+        **kwargs
+    )
+
+# ==============================================================================
+def run_soak(vhdl_sources, toplevel, width, words, parameters=None, source="always", sink="always", clock_ns=10, extra_env=None, **kwargs):
+    """
+    Run the VHDL soak harness toplevel (see soak.py) over `words` random
+    words of `width` bits with the given traffic profiles. Generics of the
+    FIFO go in parameters; the file generics are added here. The data file
+    is deleted after a passing run, as it is regenerated from the seed.
+    """
+    parameters = dict(parameters or {})
+    seed = kwargs.pop("seed", os.getenv("RANDOM_SEED"))
+    seed = int(seed) if seed is not None else random.getrandbits(32)
+    tag = os.path.basename(sim_build_dir(toplevel, parameters))
+    name = "%s__%s__%s__%d" % (tag, source, sink, words)
+    for char in ":,=.":
+        name = name.replace(char, "_")
+    root = os.path.join(results_root(os.getenv("SIM", "ghdl")), "soak")
+    results_dir = os.path.abspath(os.path.join(sim_build_dir(toplevel, parameters, root=root), name))
+
+    parameters.update(soak.prepare(results_dir, width, words, seed, source, sink))
+    env = dict(extra_env or {})
+    env["SOAK_RESULT"] = parameters["g_RESULT_FILE"]
+    env["SOAK_CLOCK_NS"] = str(clock_ns)
+    results_file = run_sim(
+        SOAK_SOURCES + list(vhdl_sources), toplevel, "soak_tb",
+        parameters=parameters,
+        extra_env=env,
+        results_dir=results_dir,
+        seed=seed,
+        **kwargs
+    )
+    os.remove(parameters["g_DATA_FILE"])
+    return results_file
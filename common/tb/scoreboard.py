@@ -0,0 +1,99 @@
+"""
+Streaming scoreboard.
+
+Beats are pushed when they enter the DUT and checked as soon as they leave
+it, so memory is bounded by the DUT occupancy and not by the test length.
+When the expected stream can be regenerated (e.g. Stimulus.replay()) it is
+given as `expected` and nothing is stored at all: push() only counts.
+
+Only the first max_errors mismatches are logged, each with the `context`
+beats before and after it, and every beat only with TB_VERBOSITY=trace
+(see report.py).
+"""
+import  collections
+from    cocotb.utils    import get_sim_time
+import  report
+from    report          import Reporter, fmt as _fmt
+
+# ==============================================================================
+class Scoreboard(object):
+    def __init__(self, log, name="scoreboard", max_errors=None, fail_fast=False, expected=None, context=None):
+        self.log = log
+        self.report = Reporter(log)
+        self.name = name
+        self.max_errors = report.max_errors() if max_errors is None else max_errors
+        self.fail_fast = fail_fast
+        self.source = expected
+        self.expected = collections.deque()
+        context = report.context() if context is None else context
+        # Last checked beats (index, expected, received), beats still to show
+        # after a mismatch and the last beat shown
+        self.history = collections.deque(maxlen=context) if context else None
+        self.after = 0
+        self.shown = -1
+        self.pushed = 0
+        self.checked = 0
+        self.errors = 0
+        self.first_error = None
+
+    @property
+    def pending(self):
+        """Beats sent into the DUT that have not come out yet."""
+        if self.source is not None:
+            return self.pushed - self.checked
+        return len(self.expected)
+
+    # Beat accepted by the DUT
+    def push(self, beat=None):
+        if self.source is None:
+            self.expected.append(beat)
+        self.pushed += 1
+
+    # Beat produced by the DUT
+    def check(self, beat):
+        index = self.checked
+        self.checked += 1
+        if self.source is not None:
+            expected = next(self.source, None)
+        else:
+            expected = self.expected.popleft() if self.expected else None
+        if self.report.tracing:
+            self.report.trace("%s: beat %d %s", self.name, index, _fmt(beat))
+        ok = expected is not None and expected == beat
+        if not ok:
+            self._error(index, expected, beat)
+        elif self.after:
+            self.after -= 1
+            self.shown = index
+            self.report.word(self.name, index, expected, beat)
+        if self.history is not None:
+            self.history.append((index, expected, beat))
+        return ok
+
+    def _error(self, index, expected, beat):
+        self.errors += 1
+        if self.first_error is not None and self.errors > self.max_errors and not self.fail_fast:
+            return
+        if expected is None:
+            msg = "%s: beat %d %s received but nothing was expected" % (self.name, index, _fmt(beat))
+        else:
+            msg = "%s: beat %d expected %s, received %s" % (self.name, index, _fmt(expected), _fmt(beat))
+        msg = "%s at %.1f ns" % (msg, get_sim_time("ns"))
+        if self.first_error is None:
+            self.first_error = msg
+        if self.errors <= self.max_errors:
+            # Beats before the mismatch not shown yet, and the ones after it
+            if self.history is not None:
+                for word in self.history:
+                    if word[0] > self.shown:
+                        self.report.word(self.name, *word)
+                self.after = self.history.maxlen
+            self.shown = index
+            self.report.error(msg)
+        assert not self.fail_fast, msg
+
+    # End of test summary
+    def finish(self, allow_pending=False):
+        self.report.summary("%s: %d beats sent, %d checked, %d errors, %d pending", self.name, self.pushed, self.checked, self.errors, self.pending)
+        assert self.errors == 0, "%s: %d errors, first one: %s" % (self.name, self.errors, self.first_error)
+        assert allow_pending or self.pending == 0, "%s: %d beats never came out of the DUT" % (self.name, self.pending)
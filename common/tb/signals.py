@@ -0,0 +1,62 @@
+"""
+Fast signal access for per cycle code.
+
+handle.value builds a BinaryValue from the simulator's bit string on every
+read, and int(dut.g_x) goes through the handle lookup each time it is
+evaluated. The functions here resolve a handle once and return a closure
+over its GPI object, decoding the bit string straight to an int:
+
+    data = reader(dut.rd_data)          # data() -> int
+    valid = flag(dut.rd_valid)          # valid() -> True when '1'
+    flags = Group(dut.empty, dut.full)  # flags.sample() -> (empty, full)
+    g = Generics(dut)                   # g.g_fifo_depth, read once
+
+Like int(handle.value), a reader raises ValueError on 'X', 'U' or 'Z' bits;
+a flag is simply False then. Writes still go through handle.value, so they
+keep cocotb's write scheduling.
+"""
+from    cocotb.handle   import ModifiableObject, IntegerObject, EnumObject
+
+# ==============================================================================
+def reader(handle):
+    """Function returning the current value of handle as an int."""
+    # Logic and logic vectors; subclasses (integer, enum, real...) have their own value
+    if type(handle) is ModifiableObject:
+        get = handle._handle.get_signal_val_binstr
+        return lambda: int(get(), 2)
+    if isinstance(handle, (IntegerObject, EnumObject)):
+        return handle._handle.get_signal_val_long
+    return lambda: int(handle.value)
+
+def flag(handle, level=1):
+    """Function returning whether a one bit handle is at level (0 or 1)."""
+    if type(handle) is ModifiableObject:
+        get = handle._handle.get_signal_val_binstr
+        bit = "1" if level else "0"
+        return lambda: get() == bit
+    return lambda: handle.value == level
+
+# ==============================================================================
+class Group(object):
+    """
+    Related signals read together, e.g. the data, valid and ready of a port:
+    sample() returns their values as a tuple of ints, in the given order.
+    """
+    def __init__(self, *handles):
+        self.readers = [reader(handle) for handle in handles]
+
+    def sample(self):
+        return tuple([read() for read in self.readers])
+
+# ==============================================================================
+class Generics(object):
+    """Generics of a DUT as ints, each looked up on first use only."""
+    def __init__(self, dut):
+        self._dut = dut
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = int(getattr(self._dut, name))
+        setattr(self, name, value)
+        return value
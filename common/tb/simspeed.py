@@ -0,0 +1,161 @@
+"""
+Simulation speed tracking.
+
+A testbench module calls track(clock) once at import time, with the name of
+its reference clock port. From then on every cocotb test of the run appends
+a record to SIMSPEED_FILE (set by runner.run_sim to <results
+folder>/simspeed.jsonl): wall time, simulated time, simulated cycles of the
+reference clock, Python CPU time and cycles per wall second. Cycles are
+counted from the cocotb Clock the test started on that port, with its own
+period, so tests running the clock at different speeds are measured right.
+Clocks generated in HDL are tracked by their period in ns instead.
+
+The same module is the command line tool to merge and compare the records:
+
+    python common/tb/simspeed.py collect -o regression/simspeed.json
+    python common/tb/simspeed.py compare baseline.json regression/simspeed.json --threshold 0.2
+
+compare exits with 1 when a test's cycles per second dropped by more than
+the threshold (a fraction) against the baseline.
+"""
+import  argparse
+import  glob
+import  json
+import  os
+import  sys
+import  time
+from    numbers import Number
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+# Default relative drop of cycles per second reported by compare
+THRESHOLD = 0.2
+
+# ==============================================================================
+# In simulation
+# ==============================================================================
+_clock = None
+
+# Clock port name -> (period ns, sim time ns it was started at), of the current test
+_clocks = {}
+
+def track(clock):
+    """Record the speed of every test of this run, counting cycles of clock (a port name, or a period in ns)."""
+    global _clock
+    if _clock is None and os.getenv("SIMSPEED_FILE"):
+        _install()
+    _clock = clock
+
+def cycles(sim_ns):
+    """Cycles of the reference clock in the current test, None if it was not started."""
+    if isinstance(_clock, Number):
+        return int(sim_ns // _clock)
+    from cocotb.utils import get_sim_time
+    for name, (period_ns, start_ns) in _clocks.items():
+        # Ports of a multi-configuration wrapper instance carry its prefix
+        if name == _clock or name.endswith("_" + _clock):
+            return int((get_sim_time("ns") - start_ns) // period_ns)
+    return None
+
+def _install():
+    # cocotb times each test in RegressionManager; CPU time is taken around the same points
+    from cocotb.regression import RegressionManager
+    from cocotb.clock import Clock
+    from cocotb.utils import get_sim_time, get_time_from_sim_steps
+    start_test = RegressionManager._start_test
+    record_result = RegressionManager._record_result
+    start_clock = Clock.start
+
+    def _start_clock(self, *args, **kwargs):
+        _clocks[self.signal._name] = (get_time_from_sim_steps(self.period, "ns"), get_sim_time("ns"))
+        return start_clock(self, *args, **kwargs)
+
+    def _start_test(self):
+        _clocks.clear()
+        self._simspeed_cpu = time.process_time()
+        return start_test(self)
+
+    def _record_result(self, test, outcome, wall_time_s, sim_time_ns):
+        cpu = getattr(self, "_simspeed_cpu", None)
+        self._simspeed_cpu = None
+        if outcome is not None and cpu is not None:
+            _write({
+                "run": os.getenv("SIMSPEED_RUN", ""),
+                "test": test.__qualname__,
+                "wall_s": wall_time_s,
+                "sim_ns": sim_time_ns,
+                "cycles": cycles(sim_time_ns),
+                "cpu_s": time.process_time() - cpu,
+            })
+        return record_result(self, test, outcome, wall_time_s, sim_time_ns)
+
+    RegressionManager._start_test = _start_test
+    RegressionManager._record_result = _record_result
+    Clock.start = _start_clock
+
+def _write(record):
+    record["cycles_per_s"] = record["cycles"] / record["wall_s"] if record["cycles"] is not None and record["wall_s"] > 0 else None
+    with open(os.environ["SIMSPEED_FILE"], "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+# ==============================================================================
+# Merge and compare
+# ==============================================================================
+def collect(root=REPO_DIR):
+    """Records of every simspeed.jsonl under the sim_build folders, keyed by "run::test"."""
+    records = {}
+    paths = glob.glob(os.path.join(root, "*", "tb", "sim_build", "**", "simspeed.jsonl"), recursive=True)
+    paths += glob.glob(os.path.join(root, "sim_build", "**", "simspeed.jsonl"), recursive=True)
+    for path in sorted(paths):
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                records["%s::%s" % (record["run"], record["test"])] = record
+    return records
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Return (key, baseline, current, change) of the tests slower than threshold."""
+    slower = []
+    for key in sorted(set(baseline) & set(current)):
+        old = baseline[key].get("cycles_per_s")
+        new = current[key].get("cycles_per_s")
+        if not old or new is None:
+            continue
+        change = new / old - 1
+        if change < -threshold:
+            slower.append((key, old, new, change))
+    return slower
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and compare simulation speed records")
+    commands = parser.add_subparsers(dest="command", required=True)
+    parser_collect = commands.add_parser("collect", help="merge the simspeed.jsonl files of every IP")
+    parser_collect.add_argument("-o", "--output", default=os.path.join(REPO_DIR, "regression", "simspeed.json"), help="merged file")
+    parser_compare = commands.add_parser("compare", help="report tests slower than the baseline")
+    parser_compare.add_argument("baseline", help="merged file of the reference run")
+    parser_compare.add_argument("current", nargs="?", default=os.path.join(REPO_DIR, "regression", "simspeed.json"), help="merged file of the new run")
+    parser_compare.add_argument("-t", "--threshold", type=float, default=THRESHOLD, help="allowed drop of cycles per second (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        records = collect()
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2, sort_keys=True)
+        print("%d test records written to %s" % (len(records), args.output))
+        return 0
+
+    baseline = _load(args.baseline)
+    current = _load(args.current)
+    slower = compare(baseline, current, args.threshold)
+    for key, old, new, change in slower:
+        print("SLOWER %-90s %12.0f -> %12.0f cycles/s (%+.1f%%)" % (key, old, new, 100 * change))
+    print("%d tests compared, %d slower than %.0f%%" % (len(set(baseline) & set(current)), len(slower), 100 * args.threshold))
+    return 1 if slower else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+File-driven soak runs.
+
+cocotb costs a Python round trip per word, which limits the regression to a
+few million beats. For soak runs Python only writes the files and reads the
+result: the words and the write/read activity patterns are generated with
+NumPy, and a VHDL harness (<toplevel>_soak.vhd, built on common/hdl/soak_*.vhd)
+streams them through the FIFO and checks every output word itself.
+
+    data.hex            random words, one per line, ceil(width/4) hex digits
+    write_pattern.hex   write activity, one bit per write clock cycle
+    read_pattern.hex    read activity (ready), one bit per read clock cycle
+    soak.txt            counts written by the harness at the end
+
+The files are hex text read with std.textio readline(), rather than bytes
+read through a file of character, whose format is left to each simulator.
+A FIFO returns its input, so the harness reads data.hex again as the
+expected output. Patterns come from the traffic profiles (traffic.py) and
+are repeated by the harness, so their files stay small however long the run.
+runner.run_soak() prepares the files and runs the harness through the soak
+cocotb test (soak_tb.py), which only waits for it to finish.
+"""
+import  math
+import  os
+import  numpy   as np
+from    traffic import profile
+
+# Minimum cycles of the pattern files, rounded up to whole periods of the profile
+PATTERN_CYCLES = 1 << 20
+
+# Cycles per line of the pattern files, four per hex digit
+PATTERN_LINE = 256
+
+# Words generated per NumPy call
+CHUNK = 1 << 20
+
+# File names inside the run folder
+DATA_FILE = "data.hex"
+WRITE_PATTERN_FILE = "write_pattern.hex"
+READ_PATTERN_FILE = "read_pattern.hex"
+RESULT_FILE = "soak.txt"
+
+# ==============================================================================
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+def word_digits(width):
+    return (width + 3) // 4
+
+def _lines(digits):
+    """Rows of hex digit values as newline terminated text lines."""
+    text = np.empty((len(digits), digits.shape[1] + 1), dtype=np.uint8)
+    text[:, :-1] = HEX_DIGITS[digits]
+    text[:, -1] = ord("\n")
+    return text.tobytes()
+
+def write_words(path, width, count, seed):
+    """count random words of width bits, as read by soak_pkg.read_word()."""
+    rng = np.random.default_rng(seed)
+    ndigits = word_digits(width)
+    top = (1 << (width - 4 * (ndigits - 1))) - 1
+    with open(path, "wb") as f:
+        for start in range(0, count, CHUNK):
+            digits = rng.integers(0, 16, (min(CHUNK, count - start), ndigits), dtype=np.uint8)
+            # Most significant digit first
+            digits[:, 0] &= top
+            f.write(_lines(digits))
+
+def read_words(path, width, start=0, count=None):
+    """Words start..start+count of a data file, as Python integers."""
+    words = []
+    with open(path) as f:
+        for index, line in enumerate(f):
+            if index < start:
+                continue
+            if count is not None and len(words) == count:
+                break
+            words.append(int(line, 16))
+    return words
+
+def write_pattern(path, spec, seed, cycles=PATTERN_CYCLES):
+    """Activity pattern of the traffic profile spec, as read by soak_pkg.next_bit()."""
+    pattern = np.asarray(profile(spec).pattern(cycles, seed), dtype=np.uint8)
+    # Whole periods in whole digits, so that the file repeats seamlessly
+    pattern = np.tile(pattern, 4 // math.gcd(len(pattern), 4))
+    # Four cycles per digit, the first one in the least significant bit
+    digits = pattern.reshape(-1, 4) @ np.array([1, 2, 4, 8], dtype=np.uint8)
+    line = PATTERN_LINE // 4
+    with open(path, "wb") as f:
+        # The last line may be shorter
+        for start in range(0, len(digits), CHUNK):
+            chunk = digits[start:start + CHUNK]
+            whole = len(chunk) // line * line
+            f.write(_lines(chunk[:whole].reshape(-1, line)))
+            if whole < len(chunk):
+                f.write(_lines(chunk[whole:].reshape(1, -1)))
+
+def prepare(folder, width, words, seed, source="always", sink="always"):
+    """Write the files of a soak run to folder and return the harness generics."""
+    os.makedirs(folder, exist_ok=True)
+    generics = {
+        "g_WORDS":              str(words),
+        "g_DATA_FILE":          os.path.join(folder, DATA_FILE),
+        "g_WRITE_PATTERN_FILE": os.path.join(folder, WRITE_PATTERN_FILE),
+        "g_READ_PATTERN_FILE":  os.path.join(folder, READ_PATTERN_FILE),
+        "g_RESULT_FILE":        os.path.join(folder, RESULT_FILE),
+    }
+    write_words(generics["g_DATA_FILE"], width, words, seed)
+    write_pattern(generics["g_WRITE_PATTERN_FILE"], source, seed + 1)
+    write_pattern(generics["g_READ_PATTERN_FILE"], sink, seed + 2)
+    if os.path.isfile(generics["g_RESULT_FILE"]):
+        os.remove(generics["g_RESULT_FILE"])
+    return generics
+
+# ==============================================================================
+def read_summary(path):
+    """Result file of the harness as a dict, the first mismatching words as integers."""
+    summary = {}
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.strip().partition(" ")
+            if key in ("first_expected", "first_received"):
+                # Bit strings, 'X' where the FIFO output was not 0 or 1
+                summary[key] = int(value, 2) if set(value) <= set("01") else value
+            elif key:
+                summary[key] = int(value)
+    return summary
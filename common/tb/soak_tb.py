@@ -0,0 +1,35 @@
+"""
+cocotb side of the soak runs (see soak.py). The VHDL harness streams and
+checks every word on its own; this test only waits for its done output and
+reports the result file, so Python is out of the loop for the whole run.
+"""
+import  os
+import  time
+import  cocotb
+from    cocotb.triggers import RisingEdge
+from    cocotb.utils    import get_sim_time
+import  simspeed
+from    soak            import read_summary
+
+# Cycles counted on the read clock of the harness
+simspeed.track(float(os.getenv("SOAK_CLOCK_NS", 10)))
+
+# ==============================================================================
+@cocotb.test()
+async def soak(dut):
+    start = time.time()
+    if str(dut.done.value) != "1":
+        await RisingEdge(dut.done)
+    wall = time.time() - start
+
+    summary = read_summary(os.environ["SOAK_RESULT"])
+    dut._log.info("Soak: %d of %d words in %d read cycles, %.3f ms simulated, %.1f s, %.0f words/s" % (
+        summary["received"], summary["words"], summary["cycles"], get_sim_time("ns") / 1e6, wall, summary["received"] / wall if wall > 0 else 0))
+    if summary["errors"]:
+        expected, received = summary["first_expected"], summary["first_received"]
+        dut._log.error("Soak: %d mismatches, first at word %d: expected %s, received %s" % (
+            summary["errors"], summary["first_error"],
+            hex(expected) if isinstance(expected, int) else expected,
+            hex(received) if isinstance(received, int) else received))
+    assert summary["errors"] == 0, "%d words differ from the input" % summary["errors"]
+    assert summary["received"] == summary["words"], "only %d of %d words out, the FIFO stalled" % (summary["received"], summary["words"])
@@ -0,0 +1,158 @@
+"""
+Stall attribution of valid/ready interfaces.
+
+A StallMonitor classifies every cycle of its ClockDomain by the valid and
+ready levels sampled on the edge:
+
+    transfer        valid and ready
+    backpressure    valid, ready low: the receiver holds the data
+    starved         ready, valid low: the sender has nothing to give
+    idle            neither
+
+On an input port (s_axis) backpressure is the DUT deasserting tready and
+starvation is the upstream traffic; on an output port (m_axis) backpressure
+is the downstream traffic and starvation is the DUT running dry. Besides
+the totals, the length of every run of consecutive cycles in the same class
+is counted, so a few long stalls are told apart from many single cycle ones.
+
+At the end of each test every monitor logs its totals and run lengths, and
+the results are appended to RESULT_PATH/stalls.jsonl. The monitors are
+opt-in, like the coroutine profiler: STALL_MONITOR=1 turns them on.
+"""
+import  json
+import  os
+import  numpy       as np
+from    signals     import flag
+
+IDLE, STARVED, BACKPRESSURE, TRANSFER = range(4)
+CLASSES = ("idle", "starved", "backpressure", "transfer")
+
+STALLS_FILE = "stalls.jsonl"
+
+# Monitors of the current test, by name
+_monitors = {}
+_installed = False
+
+# ==============================================================================
+def enabled():
+    return os.getenv("STALL_MONITOR") == "1"
+
+class StallMonitor(object):
+    """Cycle classes of one interface; without handles, a total to merge() monitors into."""
+    def __init__(self, name, valid=None, ready=None):
+        self.name = name
+        if valid is not None:
+            self.is_valid = flag(valid)
+            self.is_ready = flag(ready)
+        self.counts = [0, 0, 0, 0]
+        # Run length -> number of runs, per class
+        self.runs = [{}, {}, {}, {}]
+        self.state = None
+        self.run = 0
+
+    def sample(self):
+        state = (BACKPRESSURE if self.is_valid() else IDLE) | (STARVED if self.is_ready() else IDLE)
+        self.counts[state] += 1
+        if state == self.state:
+            self.run += 1
+        else:
+            self._close()
+            self.state = state
+            self.run = 1
+
+    def _close(self):
+        if self.run:
+            runs = self.runs[self.state]
+            runs[self.run] = runs.get(self.run, 0) + 1
+            self.run = 0
+
+    def merge(self, other):
+        """Add the cycles of another monitor of the same interface (e.g. a later test phase)."""
+        for state in range(4):
+            self.counts[state] += other.counts[state]
+            for length, number in other.runs[state].items():
+                self.runs[state][length] = self.runs[state].get(length, 0) + number
+        # The run still open in other counts as ended here, other keeps sampling it
+        if other.run:
+            runs = self.runs[other.state]
+            runs[other.run] = runs.get(other.run, 0) + 1
+
+    def result(self, lengths=True):
+        """Totals and run lengths per class; lengths=False leaves out the full histograms."""
+        self._close()
+        cycles = sum(self.counts)
+        result = {"cycles": cycles}
+        for state, name in enumerate(CLASSES):
+            runs = np.array(sorted(self.runs[state]), dtype=np.int64)
+            numbers = np.array([self.runs[state][l] for l in runs], dtype=np.int64)
+            result[name] = {
+                "cycles": self.counts[state],
+                "fraction": self.counts[state] / cycles if cycles else 0.0,
+                "runs": int(numbers.sum()),
+                "run_p50": _percentile(runs, numbers, 50),
+                "run_p99": _percentile(runs, numbers, 99),
+                "run_max": int(runs[-1]) if len(runs) else 0,
+            }
+            if lengths:
+                result[name]["run_lengths"] = {str(l): int(n) for l, n in zip(runs, numbers)}
+        return result
+
+def _percentile(lengths, numbers, q):
+    """Percentile of the run lengths given as a histogram."""
+    if not len(lengths):
+        return 0
+    cumulative = np.cumsum(numbers)
+    return int(lengths[np.searchsorted(cumulative, cumulative[-1] * q / 100.0)])
+
+def summary(name, result):
+    """One log line per monitor."""
+    parts = []
+    for cls in CLASSES:
+        r = result[cls]
+        parts.append("%s %.1f%% (%d runs, p50 %d, max %d)" % (cls, 100 * r["fraction"], r["runs"], r["run_p50"], r["run_max"]))
+    return "%s: %d cycles, %s" % (name, result["cycles"], ", ".join(parts))
+
+# ==============================================================================
+def monitor(domain, name, valid, ready):
+    """Classify every cycle of a valid/ready interface on domain (a ClockDomain). None unless STALL_MONITOR=1."""
+    if not enabled():
+        return None
+    _install()
+    stall_monitor = StallMonitor(name, valid, ready)
+    _monitors.setdefault(name, []).append(stall_monitor)
+    return domain.add(stall_monitor)
+
+def results(lengths=True):
+    """Results of the monitors of the current test, by name (phases of the same interface merged)."""
+    merged = {}
+    for name, monitors in _monitors.items():
+        total = StallMonitor(name)
+        for stall_monitor in monitors:
+            total.merge(stall_monitor)
+        merged[name] = total.result(lengths)
+    return merged
+
+def _write(test, log):
+    if not _monitors:
+        return
+    merged = results()
+    _monitors.clear()
+    for name, result in merged.items():
+        log.info("Stalls of %s" % summary(name, result))
+    with open(os.path.join(os.getenv("RESULT_PATH", "."), STALLS_FILE), "a") as f:
+        f.write(json.dumps({"test": test, "interfaces": merged}, sort_keys=True) + "\n")
+
+def _install():
+    # Reported at the end of every test, like simspeed records
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    from cocotb.regression import RegressionManager
+    record_result = RegressionManager._record_result
+
+    def _record_result(self, test, outcome, wall_time_s, sim_time_ns):
+        _write(test.__qualname__, self.log)
+        return record_result(self, test, outcome, wall_time_s, sim_time_ns)
+
+    RegressionManager._record_result = _record_result
@@ -0,0 +1,38 @@
+"""
+Seed-reproducible lazy stimulus.
+
+A Stimulus produces random words on demand from its own seed instead of
+building the whole list up front. Iterating it again (or calling replay())
+yields exactly the same words, so a checker can regenerate the expected
+stream instead of storing it.
+
+When no seed is given it is drawn from Python's random module, which cocotb
+seeds with RANDOM_SEED: a failing run is replayed by rerunning with the
+RANDOM_SEED printed in its log.
+"""
+import  random
+
+# ==============================================================================
+class Stimulus(object):
+    def __init__(self, width, length=None, seed=None, log=None, name="stimulus"):
+        self.width = width
+        self.length = length
+        self.seed = random.getrandbits(32) if seed is None else seed
+        if log is not None:
+            log.info("%s: %s words of %d bits, seed %d" % (name, "endless" if length is None else length, width, self.seed))
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError("endless stimulus has no length")
+        return self.length
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        n = 0
+        while self.length is None or n < self.length:
+            yield rng.getrandbits(self.width)
+            n += 1
+
+    def replay(self):
+        """New iterator over the same words, from the first one."""
+        return iter(self)
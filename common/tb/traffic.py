@@ -0,0 +1,136 @@
+"""
+Traffic profiles for valid/ready shaping.
+
+A profile turns a name and a few parameters into an activity pattern: a
+NumPy uint8 array where 1 means the master offers data (valid) or the slave
+accepts it (ready) on that clock. The same profile drives the bulk drivers
+(pattern=profile) and the cocotbext-axi pause generators
+(set_pause_generator(profile.pause_generator())).
+
+Profiles are also selected by spec strings, e.g. "bursty:on=16,off=4", so
+testbenches can take them from environment variables:
+
+    always                      active every cycle
+    bernoulli:duty=0.5          each cycle active with probability duty
+    bursty:on=8,off=8           on/off Markov chain, mean burst and gap lengths
+    periodic:on=1,off=1         on cycles active followed by off idle cycles
+    stalls:every=1000,stall=200 active, with a stall of `stall` cycles at a random
+                                point of every `every` cycles (duty < 1 adds noise)
+"""
+import  itertools
+import  os
+import  random
+import  numpy   as np
+
+# Default pattern length, repeated by the drivers
+PATTERN_LENGTH = 4096
+
+# ==============================================================================
+def _rng(seed=None):
+    return np.random.default_rng(random.getrandbits(32) if seed is None else seed)
+
+def bernoulli(length, duty=0.5, seed=None):
+    """length cycles, each one active with probability duty."""
+    return (_rng(seed).random(length) < duty).astype(np.uint8)
+
+def gaps(count, low, high, seed=None):
+    """count single cycle pulses, each one after low..high (inclusive) idle cycles."""
+    idle = _rng(seed).integers(low, high + 1, count)
+    pattern = np.zeros(int(idle.sum()) + count, dtype=np.uint8)
+    pattern[np.cumsum(idle + 1) - 1] = 1
+    return pattern
+
+# ==============================================================================
+def _always(rng, length):
+    return np.ones(length, dtype=np.uint8)
+
+def _bernoulli(rng, length, duty=0.5):
+    return (rng.random(length) < duty).astype(np.uint8)
+
+def _bursty(rng, length, on=8, off=8):
+    # Geometric burst and gap lengths with means on and off
+    n = 2 * (length // int(on + off) + 2)
+    bursts = rng.geometric(1.0 / on, n)
+    idles = rng.geometric(1.0 / off, n)
+    runs = np.column_stack((bursts, idles)).ravel()
+    values = np.tile(np.array([1, 0], dtype=np.uint8), n)
+    if rng.random() < off / float(on + off):
+        runs, values = runs[1:], values[1:]
+    pattern = np.repeat(values, runs)
+    while len(pattern) < length:
+        pattern = np.concatenate((pattern, _bursty(rng, length, on, off)))
+    return pattern[:length]
+
+def _periodic(rng, length, on=1, off=1):
+    period = np.concatenate((np.ones(int(on), dtype=np.uint8), np.zeros(int(off), dtype=np.uint8)))
+    return np.resize(period, max(length, len(period)))
+
+def _stalls(rng, length, every=1000, stall=200, duty=1.0):
+    every, stall = int(every), int(stall)
+    length = max(length, every)
+    pattern = _bernoulli(rng, length, duty) if duty < 1 else _always(rng, length)
+    for start in range(0, length, every):
+        offset = start + int(rng.integers(0, max(every - stall, 0) + 1))
+        pattern[offset:offset + stall] = 0
+    return pattern
+
+PROFILES = {
+    "always": _always,
+    "bernoulli": _bernoulli,
+    "bursty": _bursty,
+    "periodic": _periodic,
+    "stalls": _stalls,
+}
+
+# ==============================================================================
+class Profile(object):
+    def __init__(self, name, **params):
+        if name not in PROFILES:
+            raise ValueError("unknown traffic profile %r, expected one of %s" % (name, ", ".join(sorted(PROFILES))))
+        self.name = name
+        self.params = params
+
+    def __repr__(self):
+        return "%s(%s)" % (self.name, ", ".join("%s=%s" % item for item in sorted(self.params.items())))
+
+    def period(self):
+        """Cycles after which a periodic or stalls pattern repeats, 1 for the random ones."""
+        if self.name == "periodic":
+            return int(self.params.get("on", 1)) + int(self.params.get("off", 1))
+        if self.name == "stalls":
+            return int(self.params.get("every", 1000))
+        return 1
+
+    def pattern(self, length=PATTERN_LENGTH, seed=None):
+        """
+        Activity pattern (1 = active) of at least length cycles, a whole
+        number of periods, so that drivers repeating it keep the period.
+        """
+        period = self.period()
+        length = max(-(-length // period), 1) * period
+        return PROFILES[self.name](_rng(seed), length, **self.params)
+
+    def duty(self, length=PATTERN_LENGTH, seed=None):
+        """Measured fraction of active cycles."""
+        return float(self.pattern(length, seed).mean())
+
+    def pause_generator(self, length=PATTERN_LENGTH, seed=None):
+        """Endless pause iterator for cocotbext-axi set_pause_generator() (1 = pause)."""
+        return itertools.cycle((1 - self.pattern(length, seed)).tolist())
+
+def profile(spec, **params):
+    """Profile from a spec string "name:key=value,..." plus keyword parameters."""
+    if isinstance(spec, Profile):
+        return spec
+    name, _, args = spec.partition(":")
+    values = {}
+    for arg in filter(None, args.split(",")):
+        key, _, value = arg.partition("=")
+        value = float(value)
+        values[key.strip()] = int(value) if value.is_integer() else value
+    values.update(params)
+    return Profile(name.strip(), **values)
+
+def from_env(variable, default):
+    """Profile selected by an environment variable, e.g. SINK_TRAFFIC=bursty:on=32,off=8."""
+    return profile(os.getenv(variable) or default)
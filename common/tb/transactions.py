@@ -0,0 +1,152 @@
+"""
+Transaction traces.
+
+With TRACE_TRANSACTIONS=1 every handshake on the ports passed to trace() is
+recorded on the edge of its ClockDomain, in columns of 8 byte integers, and
+written at the end of each cocotb test to
+RESULT_PATH/transactions/<test>.npz, one NumPy structured array per port:
+
+    time_ns     float64   edge of the transfer
+    cycle       int64     cycle of the port clock domain
+    data_hash   int64     hash(data), the word itself below 2**61 - 1
+    <field>     int64     sideband fields (tkeep, tlast, tid, tuser, tdest)
+    <state>     int64     fill count and flags sampled on the same edge
+
+Fields wider than 63 bits are stored as their hash and unresolved values
+('X', 'U') as -1. A port traced again in the same test (a new ClockDomain
+per phase) is appended to. Throughput over time, bursts and latency are
+then computed offline:
+
+    trace = np.load("transactions/random_write_read.npz")
+    write, read = trace["write"], trace["read"]
+    latency = read["time_ns"] - write["time_ns"][:len(read)]
+"""
+import  os
+import  numpy               as np
+from    array               import array
+from    cocotb.utils        import get_sim_time
+from    signals             import reader, flag
+
+# Fields recorded on AXI-Stream ports when present (see axis())
+AXIS_FIELDS = ("tkeep", "tlast", "tid", "tuser", "tdest")
+
+# Ports of the current test, by name
+_ports = {}
+_installed = False
+
+# ==============================================================================
+def enabled():
+    return os.getenv("TRACE_TRANSACTIONS") == "1"
+
+def _safe(read, hashed=False):
+    # int64 column value of a reader: -1 when unresolved, hashed when asked or too wide
+    def value():
+        try:
+            v = read()
+        except ValueError:
+            return -1
+        return hash(v) if hashed or v >= (1 << 63) else v
+    return value
+
+class Port(object):
+    """Handshakes of one port: a transfer is valid at valid_level and ready at ready_level on the edge."""
+    def __init__(self, domain, name, valid, data, ready=None, valid_level=1, ready_level=1, fields=None, state=None):
+        self.domain = domain
+        self.name = name
+        self.is_valid = flag(valid, valid_level)
+        self.is_ready = flag(ready, ready_level) if ready is not None else None
+        self.read_data = _safe(reader(data), hashed=True)
+        self.names = ["data_hash"] + list(fields or {}) + list(state or {})
+        self.readers = [_safe(reader(handle)) for handle in list((fields or {}).values()) + list((state or {}).values())]
+        self.time = array("d")
+        self.cycle = array("q")
+        self.columns = [array("q") for _ in self.names]
+
+    def sample(self):
+        if self.is_valid() and (self.is_ready is None or self.is_ready()):
+            self.time.append(get_sim_time("ns"))
+            self.cycle.append(self.domain.cycle)
+            columns = self.columns
+            columns[0].append(self.read_data())
+            for column, read in zip(columns[1:], self.readers):
+                column.append(read())
+
+    def extend(self, other):
+        self.time.extend(other.time)
+        self.cycle.extend(other.cycle)
+        for column, more in zip(self.columns, other.columns):
+            column.extend(more)
+
+    def __len__(self):
+        return len(self.time)
+
+    def records(self):
+        """Transfers as a NumPy structured array."""
+        dtype = [("time_ns", np.float64), ("cycle", np.int64)] + [(name, np.int64) for name in self.names]
+        out = np.empty(len(self), dtype=dtype)
+        out["time_ns"] = np.frombuffer(self.time, dtype=np.float64)
+        out["cycle"] = np.frombuffer(self.cycle, dtype=np.int64)
+        for name, column in zip(self.names, self.columns):
+            out[name] = np.frombuffer(column, dtype=np.int64)
+        return out
+
+# ==============================================================================
+def trace(domain, name, valid, data, ready=None, valid_level=1, ready_level=1, fields=None, state=None):
+    """
+    Record the transfers of a port on every edge of domain (a ClockDomain)
+    when TRACE_TRANSACTIONS=1. fields and state map column names to handles.
+    Returns the Port, or None when tracing is off.
+    """
+    if not enabled():
+        return None
+    _install()
+    port = Port(domain, name, valid, data, ready, valid_level, ready_level, fields, state)
+    if name in _ports:
+        _ports[name].append(port)
+    else:
+        _ports[name] = [port]
+    return domain.add(port)
+
+def axis(domain, name, bus, state=None):
+    """trace() of the AXI-Stream port with prefix bus of a DUT (e.g. dut, "s_axis"), with its sideband fields."""
+    dut, prefix = bus
+    fields = {}
+    for field in AXIS_FIELDS:
+        try:
+            fields[field] = getattr(dut, "%s_%s" % (prefix, field))
+        except AttributeError:
+            pass
+    return trace(domain, name, getattr(dut, prefix + "_tvalid"), getattr(dut, prefix + "_tdata"),
+                 ready=getattr(dut, prefix + "_tready"), fields=fields, state=state)
+
+def write(test, path=None):
+    """Write the ports of this test to path (RESULT_PATH/transactions/<test>.npz) and forget them."""
+    if not _ports:
+        return None
+    arrays = {}
+    for name, ports in _ports.items():
+        for port in ports[1:]:
+            ports[0].extend(port)
+        arrays[name] = ports[0].records()
+    _ports.clear()
+    path = path or os.path.join(os.getenv("RESULT_PATH", "."), "transactions", test + ".npz")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, **arrays)
+    return path
+
+def _install():
+    # Written at the end of every test, like simspeed records
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    from cocotb.regression import RegressionManager
+    record_result = RegressionManager._record_result
+
+    def _record_result(self, test, outcome, wall_time_s, sim_time_ns):
+        path = write(test.__qualname__)
+        if path is not None:
+            self.log.info("Transactions of %s written to %s" % (test.__qualname__, path))
+        return record_result(self, test, outcome, wall_time_s, sim_time_ns)
+
+    RegressionManager._record_result = _record_result
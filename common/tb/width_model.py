@@ -0,0 +1,75 @@
+"""
+Vectorized reference model of width conversion.
+
+Words are unpacked into an (N, width) matrix of bits, LSB first. Packing N
+narrow words into one wide word (up) or splitting a wide word into N narrow
+ones (down) is then a reshape of the flattened bit stream.
+"""
+import  collections
+import  numpy   as np
+
+StreamCheck = collections.namedtuple("StreamCheck", ["compared", "errors", "mismatches", "windows", "expected", "received", "unmatched"])
+
+# ==============================================================================
+def to_bits(words, width):
+    """Return an (len(words), width) uint8 matrix with the bits of every word, LSB first."""
+    n_bytes = (width + 7) // 8
+    if width <= 64:
+        raw = np.asarray([int(w) for w in words], dtype=np.uint64).astype("<u8").view(np.uint8)
+        raw = raw.reshape(-1, 8)[:, :n_bytes]
+    else:
+        raw = np.frombuffer(b"".join(int(w).to_bytes(n_bytes, "little") for w in words), dtype=np.uint8)
+        raw = raw.reshape(-1, n_bytes)
+    return np.unpackbits(raw, axis=1, bitorder="little")[:, :width]
+
+def from_bits(bits):
+    """Inverse of to_bits(): one Python integer per row."""
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+def regroup(words, in_width, out_width):
+    """Bits of a stream of in_width words regrouped as out_width words (an incomplete last word is dropped)."""
+    bits = to_bits(words, in_width).ravel()
+    n = len(bits) // out_width
+    return bits[:n * out_width].reshape(n, out_width)
+
+def pack(words, in_width, out_width):
+    """Reference output of a FIFO converting in_width words into out_width words."""
+    return from_bits(regroup(words, in_width, out_width))
+
+# ==============================================================================
+def compare_streams(input_data, input_width, output_data, output_width, max_errors=10, context=0):
+    """
+    Compare a whole captured stream against the written one.
+    Both streams are regrouped to the wider of the two widths and compared up
+    to the shorter one. Returns the number of words compared, the number of
+    mismatches, (index, expected, received) of the first max_errors and, for
+    each of them, the same tuples of the `context` words before and after it.
+    The lengths of both streams are returned in words of the wider width, a
+    trailing partial output word counting as one, with (index, expected,
+    received) of the first max_errors missing or extra words, None on the
+    side that has no word.
+    """
+    width = max(input_width, output_width)
+    expected = regroup(input_data, input_width, width)
+    received = regroup(output_data, output_width, width)
+    # Output bits left after the whole words, zero padded
+    rest = to_bits(output_data, output_width).ravel()[len(received) * width:]
+    if len(rest):
+        partial = np.zeros((1, width), dtype=np.uint8)
+        partial[0, :len(rest)] = rest
+        received = np.vstack([received, partial])
+    n = min(len(expected), len(received))
+    wrong = np.flatnonzero(np.any(expected[:n] != received[:n], axis=1))
+    first = wrong[:max_errors]
+    mismatches = list(zip(first.tolist(), from_bits(expected[first]), from_bits(received[first])))
+    windows = []
+    for index in first.tolist():
+        around = np.arange(max(index - context, 0), min(index + context + 1, n))
+        windows.append(list(zip(around.tolist(), from_bits(expected[around]), from_bits(received[around]))))
+    end = min(max(len(expected), len(received)), n + max_errors)
+    unmatched = [(index,
+                  from_bits(expected[index:index + 1])[0] if index < len(expected) else None,
+                  from_bits(received[index:index + 1])[0] if index < len(received) else None)
+                 for index in range(n, end)]
+    return StreamCheck(n, len(wrong), mismatches, windows, len(expected), len(received), unmatched)
@@ -0,0 +1,103 @@
+-------------------------------------------------------------------------------
+-- NAME:        fifo_bram_soak.vhd
+-- DESCRPTION:  File-driven self-checking harness of fifo_bram (soak runs)
+-------------------------------------------------------------------------------
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+--! Streams the words of g_DATA_FILE through fifo_bram with the write and
+--! read activity of the pattern files, and checks them against the same
+--! file, without cocotb in the loop. done is set once the result file is
+--! written, and the clock stops. Files are written by common/tb/soak.py.
+entity fifo_bram_soak is
+  generic (
+    RAM_WIDTH            : natural  := 32;
+    RAM_DEPTH            : natural  := 512;
+    g_WORDS              : natural  := 1000;
+    g_CLK_PERIOD_PS      : positive := 10000;
+    g_DATA_FILE          : string   := "data.hex";
+    g_WRITE_PATTERN_FILE : string   := "write_pattern.hex";
+    g_READ_PATTERN_FILE  : string   := "read_pattern.hex";
+    g_RESULT_FILE        : string   := "soak.txt"
+  );
+  port (
+    done : out std_logic
+  );
+end entity;
+
+architecture behavioral of fifo_bram_soak is
+
+  constant c_CLK_PERIOD : time := g_CLK_PERIOD_PS * 1 ps;
+
+  signal clk        : std_logic := '0';
+  signal rst        : std_logic := '1';
+  signal finished   : std_logic;
+  signal wr_en      : std_logic;
+  signal wr_data    : std_logic_vector(RAM_WIDTH - 1 downto 0);
+  signal full       : std_logic;
+  signal rd_en      : std_logic;
+  signal rd_valid   : std_logic;
+  signal rd_data    : std_logic_vector(RAM_WIDTH - 1 downto 0);
+  signal written    : natural;
+
+begin
+
+  clk  <= not clk after c_CLK_PERIOD / 2 when finished /= '1' else clk;
+  rst  <= '0' after 4 * c_CLK_PERIOD;
+  done <= finished;
+
+  dut : entity work.fifo_bram
+    generic map (
+      RAM_WIDTH => RAM_WIDTH,
+      RAM_DEPTH => RAM_DEPTH
+    )
+    port map (
+      clk        => clk,
+      rst        => rst,
+      wr_en      => wr_en,
+      wr_data    => wr_data,
+      rd_en      => rd_en,
+      rd_valid   => rd_valid,
+      rd_data    => rd_data,
+      empty      => open,
+      empty_next => open,
+      full       => full,
+      full_next  => open,
+      fill_count => open
+    );
+
+  source : entity work.soak_source
+    generic map (
+      g_WIDTH        => RAM_WIDTH,
+      g_WORDS        => g_WORDS,
+      g_DATA_FILE    => g_DATA_FILE,
+      g_PATTERN_FILE => g_WRITE_PATTERN_FILE
+    )
+    port map (
+      clk   => clk,
+      rst   => rst,
+      full  => full,
+      data  => wr_data,
+      valid => wr_en,
+      count => written
+    );
+
+  sink : entity work.soak_sink
+    generic map (
+      g_WIDTH         => RAM_WIDTH,
+      g_WORDS         => g_WORDS,
+      g_EXPECTED_FILE => g_DATA_FILE,
+      g_PATTERN_FILE  => g_READ_PATTERN_FILE,
+      g_RESULT_FILE   => g_RESULT_FILE
+    )
+    port map (
+      clk   => clk,
+      rst   => rst,
+      data  => rd_data,
+      valid => rd_valid,
+      ready => rd_en,
+      done  => finished
+    );
+
+end architecture;
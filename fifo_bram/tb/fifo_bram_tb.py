@@ -4,11 +4,24 @@ from    cocotb.triggers             import Timer, RisingEdge
 from    cocotb.result               import TestFailure
 from    cocotb.clock                import Clock
 from    cocotb_coverage.coverage    import *
-import  random
 import  os
+from    scoreboard                  import Scoreboard
+from    stimulus                    import Stimulus
+from    drivers                     import ClockDomain, StreamSource, StreamSink
+from    traffic                     import gaps, from_env
+from    benchmark                   import Benchmark
+from    coverage_histogram          import histogram
+from    directed                    import OccupancyDirector
+from    signals                     import reader
+import  transactions
+import  coverage_report
+import  simspeed
+import  profiler
 
 
 c_CLK_PERIOD = 10 #ns
+simspeed.track("clk")
+profiler.install()
 input_data_length = 2000
 RAM_DEPTH = 512
 # ==============================================================================
@@ -105,8 +118,19 @@ class TB(object):
         clk_100MHz = Clock(dut.clk, c_CLK_PERIOD, units='ns')
         cocotb.start_soon(clk_100MHz.start(start_high=True))
 
+        # Data checker
+        self.scoreboard = Scoreboard(dut._log)
+
+        # Drivers, monitors and coverage share one coroutine per clock edge
+        self.clk = ClockDomain(dut.clk)
+
         # Functional coverage
-        cocotb.start_soon(self.fill_count_coverage())
+        self.fill_count_coverage()
+
+        # Both ports, fill count and flags when TRACE_TRANSACTIONS=1
+        state = {"fill_count": dut.fill_count, "empty": dut.empty, "full": dut.full}
+        transactions.trace(self.clk, "write", dut.wr_en, dut.wr_data, ready=dut.full, ready_level=0, state=state)
+        transactions.trace(self.clk, "read", dut.rd_valid, dut.rd_data, ready=dut.rd_en, state=state)
 
     async def reset(self, aclk, aresetn, active_level=0):
 
@@ -121,22 +145,16 @@ class TB(object):
         await RisingEdge(aclk)
         await RisingEdge(aclk)    
 
+    # Replay the stimulus in the scoreboard instead of storing it
+    def expect(self, data):
+        self.scoreboard = Scoreboard(self.dut._log, expected=data.replay())
+
     # Write data function
     async def write_data(self, data, continuous_input = True):
-        length = len(data)
-        for i in range(length):
-            if continuous_input == False:
-                write_period = random.randint(1, 5)
-                for x in range(write_period):
-                    await RisingEdge(self.dut.clk)
-            # Write data to FIFO
-            while self.dut.full_next.value == 1:
-                await RisingEdge(self.dut.clk)
-            self.dut.wr_data.value = data[i]
-            self.dut.wr_en.value = 1
-            # Wait for rising edge of clk
-            await RisingEdge(self.dut.clk)
-            self.dut.wr_en.value = 0
+        # wr_en only while full_next is low, 1 to 5 idle cycles between words if not continuous
+        pattern = None if continuous_input else gaps(len(data), 1, 5)
+        source = self.clk.add(StreamSource(self.dut.wr_data, self.dut.wr_en, data, gate=self.dut.full_next, gate_level=0, pattern=pattern, on_accept=self.scoreboard.push))
+        await source.wait()
 
     async def single_write_data(self, data):
         await RisingEdge(self.dut.clk)
@@ -147,48 +165,31 @@ class TB(object):
 
     # Read data function
     async def read_data(self,data_length, continuous_read = True):
-        data = []
-        counter = 0
-        while counter < data_length:
-            while self.dut.empty.value == 1:
-                await RisingEdge(self.dut.clk)
-            if continuous_read == False:
-                read_period = random.randint(1, 5)
-                for i in range(read_period):
-                    await RisingEdge(self.dut.clk)
-            self.dut.rd_en.value = 1
-            # Wait for rising edge of clk
-            await RisingEdge(self.dut.clk)
-            if self.dut.rd_valid.value == 1:
-                # Append data to list
-                data.append(int(str(self.dut.rd_data.value), 2))
-                counter += 1
-            self.dut.rd_en.value = 0
-        return data
+        # rd_en only while rd_valid is high, 1 to 5 idle cycles between reads if not continuous
+        pattern = [1] if continuous_read else gaps(data_length, 1, 5)
+        # Check data against the written one
+        sink = self.clk.add(StreamSink(self.dut.rd_data, self.dut.rd_valid, self.scoreboard.check, ready=self.dut.rd_en, pattern=pattern, wait_valid=True, count=data_length))
+        await sink.wait()
 
     async def single_read_data(self):
         await RisingEdge(self.dut.clk)
         self.dut.rd_en.value = 1
         await RisingEdge(self.dut.clk)
         if self.dut.rd_valid.value == 1:
-            return int(str(self.dut.rd_data.value), 2)
+            return reader(self.dut.rd_data)()
         self.dut.rd_en.value = 0
         return None
 
-    def test_data(self, data, output_data):
-        for i in range(len(data)):
-            # print("index: ", i, "data read:", output_data[i],"data expected:", data[i])
-            assert data[i] == output_data[i]
-        assert data == output_data
-
-    async def fill_count_coverage(self):
-        @fill_count_all_counts
-        def sample(fill_count):
-            pass
-        while True:
-            await RisingEdge(self.dut.clk)
-            fill_count = self.dut.fill_count.value
-            sample(fill_count)
+    def fill_count_coverage(self):
+        # Batched in a histogram, added to coverage_db by flush_all()
+        sample = histogram("bram.fill_count.all_counts").sample
+        fill_count = reader(self.dut.fill_count)
+        def on_edge():
+            try:
+                sample(fill_count())
+            except ValueError:
+                pass    # not resolvable before reset
+        self.clk.on_edge(on_edge)
 
     def assert_empty_flag(self):
         @empty_flag_set
@@ -260,15 +261,16 @@ async def continuous_input(dut):
 
     await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = True) )
     # Read data from FIFO
-    output_data = await tb.read_data(input_data_length,continuous_read= True)
+    await tb.read_data(input_data_length,continuous_read= True)
 
-    # compare two list: data and output_data
-    tb.test_data(data, output_data)
+    # check that all data written was read back in order
+    tb.scoreboard.finish()
 
     # Wait for 10 rising edges of clk
     await Timer(10*c_CLK_PERIOD, 'ns')
@@ -279,15 +281,16 @@ async def random_input(dut):
 
     await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = False) )
     # Read data from FIFO
-    output_data = await tb.read_data(input_data_length, continuous_read= True)
+    await tb.read_data(input_data_length, continuous_read= True)
 
-    # compare two list: data and output_data
-    tb.test_data(data, output_data)
+    # check that all data written was read back in order
+    tb.scoreboard.finish()
 
     # Wait for 10 rising edges of clk
     await Timer(10*c_CLK_PERIOD, 'ns')
@@ -298,15 +301,16 @@ async def random_read(dut):
 
     await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = True) )
     # Read data from FIFO
-    output_data = await tb.read_data(input_data_length, continuous_read= False)
+    await tb.read_data(input_data_length, continuous_read= False)
 
-    # compare two list: data and output_data
-    tb.test_data(data, output_data)
+    # check that all data written was read back in order
+    tb.scoreboard.finish()
 
     # Wait for 10 rising edges of clk
     await Timer(10*c_CLK_PERIOD, 'ns')
@@ -317,15 +321,41 @@ async def random_write_read(dut):
 
     await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = False))
     # Read data from FIFO
-    output_data = await tb.read_data(input_data_length, continuous_read= False)
+    await tb.read_data(input_data_length, continuous_read= False)
+
+    # check that all data written was read back in order
+    tb.scoreboard.finish()
+
+    # Wait for 10 rising edges of clk
+    await Timer(10*c_CLK_PERIOD, 'ns')
+
+@cocotb.test(skip = False, stage = 4, timeout_time=0.2, timeout_unit='ms')
+async def directed_occupancy(dut):
+    tb = TB(dut)
+
+    await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # compare two list: data and output_data
-    tb.test_data(data, output_data)
+    # Endless random words, written and read as the director steers fill_count to the unhit bins
+    data = Stimulus(32, log=dut._log)
+    tb.expect(data)
+    target = float(os.getenv("COVERAGE_TARGET", 100))
+    director = tb.clk.add(OccupancyDirector(dut.fill_count, histogram("bram.fill_count.all_counts"), target=target, log=dut._log))
+    tb.clk.add(StreamSource(dut.wr_data, dut.wr_en, data, gate=dut.full_next, gate_level=0, pattern=director.write, on_accept=tb.scoreboard.push))
+    tb.clk.add(StreamSink(dut.rd_data, dut.rd_valid, tb.scoreboard.check, ready=dut.rd_en, pattern=director.read, wait_valid=True))
+    await director.wait()
+
+    # The director only reads from now on, wait for the last word written to come out
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    while tb.scoreboard.pending:
+        await RisingEdge(dut.clk)
+    tb.scoreboard.finish()
 
     # Wait for 10 rising edges of clk
     await Timer(10*c_CLK_PERIOD, 'ns')
@@ -336,8 +366,9 @@ async def fifo_full(dut):
 
     await tb.reset(dut.clk, dut.rst, active_level=1)
 
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = True))
 
@@ -375,8 +406,9 @@ async def fifo_empty(dut):
 
     tb.assert_empty_flag()
     tb.assert_empty_next_flag()
-    # Generate a vector with random integers
-    data = [random.randint(0, 2**32 - 1) for _ in range(input_data_length)]
+    # Random words generated on the fly from a logged seed
+    data = Stimulus(32, input_data_length, log=dut._log)
+    tb.expect(data)
     # Write data to FIFO
     cocotb.start_soon(tb.write_data(data,continuous_input = True))
     # Read all data from FIFO
@@ -401,11 +433,31 @@ async def fifo_empty(dut):
     # Wait for 10 rising edges of clk
     await Timer(10*c_CLK_PERIOD, 'ns')
 
-    # Sets the coverage yml file
-    cg_group = coverage_db["bram"]
-    dut._log.info(f"Functional coverage percentage: {cg_group.cover_percentage:.2f}%")  # Log the coverage level of the whole covergroup
+    # Coverage files of this run (RESULT_PATH), merged by coverage_report.py
+    coverage_report.export(dut._log, "bram")
 
-    coverage_file = os.path.join(
-        os.getenv("RESULT_PATH", "../../doc/"), "functional_coverage.yml"
-    )
-    coverage_db.export_to_yaml(filename=coverage_file)
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 5)
+async def benchmark(dut):
+    tb = TB(dut)
+
+    await tb.reset(dut.clk, dut.rst, active_level=1)
+
+    # Traffic and length set by runner.run_benchmark()
+    words = int(os.getenv("BENCHMARK_WORDS", 2000))
+    width = int(dut.RAM_WIDTH)
+    bench = Benchmark(width, width, c_CLK_PERIOD, c_CLK_PERIOD)
+    data = Stimulus(width, words, log=dut._log)
+    tb.expect(data)
+    def accepted(word):
+        tb.scoreboard.push()
+        bench.input()
+    def received(word):
+        tb.scoreboard.check(word)
+        bench.output()
+
+    tb.clk.add(StreamSource(dut.wr_data, dut.wr_en, data, gate=dut.full_next, gate_level=0, pattern=from_env("SOURCE_TRAFFIC", "always"), on_accept=accepted))
+    sink = tb.clk.add(StreamSink(dut.rd_data, dut.rd_valid, received, ready=dut.rd_en, pattern=from_env("SINK_TRAFFIC", "always"), wait_valid=True, count=words))
+    await sink.wait()
+
+    tb.scoreboard.finish()
+    bench.write(log=dut._log)
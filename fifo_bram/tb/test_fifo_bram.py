@@ -1,17 +1,20 @@
-from    cocotb_test.simulator   import run
 import  pytest
 import  os
 import  glob
+import  sys
 
 current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from    runner  import run_sim, SIMULATORS
+
 vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
 
-@pytest.mark.skipif(os.getenv("SIM") != "ghdl", reason="")
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
 def test_fifo_bram_vhdl():
-    run(
+    run_sim(
         vhdl_sources=vhdl_src,      # vhdl sources
         toplevel="fifo_bram",       # top level HDL
-        module="fifo_bram_tb",      # name of cocotb test module
-        toplevel_lang="vhdl",
-        sim_build="sim_build"
+        module="fifo_bram_tb"       # name of cocotb test module
     )
\ No newline at end of file
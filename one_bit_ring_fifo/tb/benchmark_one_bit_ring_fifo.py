@@ -0,0 +1,34 @@
+import  pytest
+import  os
+import  glob
+import  sys
+
+current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from    runner  import run_benchmark, BENCHMARK_TRAFFIC, SIMULATORS
+
+vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
+
+# Output at least as wide as the input, so that the ring does not overflow with
+# the source always active
+@pytest.mark.parametrize("source, sink", BENCHMARK_TRAFFIC)
+@pytest.mark.parametrize(
+    "parameters", [
+                    {"g_data_in_width": "8",    "g_data_out_width": "64",   "g_fifo_depth": "64"},
+                    {"g_data_in_width": "16",   "g_data_out_width": "20",   "g_fifo_depth": "32"},
+                    {"g_data_in_width": "32",   "g_data_out_width": "48",   "g_fifo_depth": "4096"}
+                   ]
+)
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
+def test_benchmark_one_bit_ring_fifo(parameters, source, sink):
+    run_benchmark(
+        vhdl_sources=vhdl_src,              # sources
+        toplevel="one_bit_ring_fifo",       # top level HDL
+        module="one_bit_ring_fifo_tb",      # name of cocotb test module
+        ip="one_bit_ring_fifo",
+        parameters=parameters,
+        source=source,
+        sink=sink
+    )
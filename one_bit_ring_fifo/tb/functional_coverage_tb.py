@@ -2,6 +2,8 @@ import  collections
 from    cocotb.triggers             import RisingEdge
 from    cocotb.result               import TestFailure
 from    cocotb_coverage.coverage    import *
+from    coverage_histogram          import histogram
+from    signals                     import reader
 
 
 class FC(object):
@@ -62,33 +64,24 @@ class FC(object):
   #------------------ Inputs ------------------#
   #------------------ Outputs ------------------#
   """
-    Coverage of empty_out_out
+    Coverage of empty_out, sampled on every edge of the clock domain
+    into a histogram (see coverage_histogram.flush_all)
   """
-  async def run_empty_coverage(self):
-    # call coverage point
-    @self.empty_coverage
-    def sample(empty):
-      pass
+  async def run_empty_coverage(self, clk):
+    sample = histogram("one_bit_ring_fifo.empty").sample
+    empty_out = reader(self.dut.empty_out)
 
     # start surveillance
     await self.wait_for_resetn()
-    while True:
-      await RisingEdge(self.dut.clk)
-      empty = self.dut.empty_out.value
-      sample(empty)
+    clk.on_edge(lambda: sample(empty_out()))
   """
     Coverage of full_out
   """
-  async def run_full_coverage(self):
-    # call coverage point
-    @self.full_coverage
-    def sample(full):
-      pass
+  async def run_full_coverage(self, clk):
+    sample = histogram("one_bit_ring_fifo.full").sample
+    full_out = reader(self.dut.full_out)
 
     # start surveillance
     await self.wait_for_resetn()
-    while True:
-      await RisingEdge(self.dut.clk)
-      full = self.dut.full_out.value
-      sample(full)
+    clk.on_edge(lambda: sample(full_out()))
   #------------------ FSMs ------------------#
\ No newline at end of file
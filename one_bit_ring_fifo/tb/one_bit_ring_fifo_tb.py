@@ -1,14 +1,71 @@
 import  numpy                       as np
-import  random
 import  os
 import  cocotb
-from    cocotb.triggers             import Timer, RisingEdge
+from    cocotb.triggers             import RisingEdge
 from    cocotb.clock                import Clock
 from    cocotb_coverage.coverage    import *
 from    functional_coverage_tb      import FC
+from    stimulus                    import Stimulus
+from    drivers                     import ClockDomain, PatternDriver, StreamSource, StreamSink
+from    traffic                     import from_env, gaps
+from    benchmark                   import Benchmark
+import  coverage_report
+import  simspeed
+import  profiler
+from    drain                       import drain
+from    signals                     import Generics, Group, reader
 
 # Constants
 c_CLK_PERIOD = 10       # ns
+simspeed.track("clk")
+profiler.install()
+
+# ==============================================================================
+class RingBufferModel(object):
+    """
+    Golden model of the one bit ring FIFO stored as a uint8 array of bits.
+    The DUT reads the memory as it was before the previous cycle's write, so
+    each write is kept pending for one cycle and then applied in place, which
+    keeps the per-cycle cost independent of g_fifo_depth.
+    """
+    def __init__(self, data_in_width, data_out_width, fifo_depth):
+        self.data_in_width = data_in_width
+        self.data_out_width = data_out_width
+        self.fifo_depth = fifo_depth
+        self.ring = np.zeros(fifo_depth, dtype=np.uint8)
+        self.in_offsets = np.arange(data_in_width)
+        self.out_offsets = np.arange(data_out_width)
+        self.wr_index = 0
+        self.rd_index = 0
+        self.data_ctr = 0
+        self.pending_write = None
+        self.data_out = []
+
+    # Apply the write of the previous cycle
+    def commit(self):
+        if self.pending_write is not None:
+            index, bits = self.pending_write
+            self.ring[index] = bits
+            self.pending_write = None
+
+    # Write data_in_width bits, LSB first
+    def write(self, value):
+        data_in_bytes = value.to_bytes((self.data_in_width + 7) // 8, "little")
+        bits = np.unpackbits(np.frombuffer(data_in_bytes, dtype=np.uint8), bitorder="little")[:self.data_in_width]
+        self.pending_write = ((self.wr_index + self.in_offsets) % self.fifo_depth, bits)
+        self.wr_index = (self.wr_index + self.data_in_width) % self.fifo_depth
+        # maximum is fifo_depth
+        self.data_ctr = min(self.data_ctr + self.data_in_width, self.fifo_depth)
+
+    # Read data_out_width bits, LSB first
+    def read(self):
+        bits = self.ring[(self.rd_index + self.out_offsets) % self.fifo_depth]
+        value = int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+        self.data_out.append(value)
+        self.rd_index = (self.rd_index + self.data_out_width) % self.fifo_depth
+        # minimum is 0
+        self.data_ctr = max(self.data_ctr - self.data_out_width, 0)
+        return value
 
 # ==============================================================================
 class TB(object):
@@ -24,19 +81,19 @@ class TB(object):
         self.dut.data_valid_in.value = 0
         self.dut.data_out_ready.value = 1
         
+        # Drivers, monitors and golden model share one coroutine per clock edge
+        self.clk = ClockDomain(dut.clk)
+
         # Helper variables  
-        self.ring_buffer_wr_index = 0
-        self.r0_one_bit_ring_fifo_array = int(self.dut.g_fifo_depth) * [0]
-        self.r1_one_bit_ring_fifo_array = int(self.dut.g_fifo_depth) * [0]
-        self.ring_buffer_rd_index = 0
-        self.ring_buffer_data_ctr = 0
+        self.generics = Generics(dut)
+        self.golden_model = RingBufferModel(self.generics.g_data_in_width, self.generics.g_data_out_width, self.generics.g_fifo_depth)
         self.data_out_value_array = []
-        self.expected_data_out_value_array = []
+        self.expected_data_out_value_array = self.golden_model.data_out
 
         # Functional coverage functions  
         self.fc = FC(dut)
-        cocotb.start_soon(self.fc.run_empty_coverage())
-        cocotb.start_soon(self.fc.run_full_coverage())
+        cocotb.start_soon(self.fc.run_empty_coverage(self.clk))
+        cocotb.start_soon(self.fc.run_full_coverage(self.clk))
 
     # reset dut
     async def reset(self):
@@ -49,87 +106,62 @@ class TB(object):
     # data_out_ready signal control
     async def control_data_out_ready(self, randomize = False):
         if randomize:
-            length_pattern = 100
-            random_pattern = [random.randint(0, 1) for _ in range(length_pattern)]
-            while True:
-                for i in range(length_pattern):
-                    await RisingEdge(self.dut.clk)
-                    self.dut.data_out_ready.value = random_pattern[i]
+            # data_out_ready shaped by SINK_TRAFFIC
+            self.clk.add(PatternDriver(self.dut.data_out_ready, from_env("SINK_TRAFFIC", "bernoulli:duty=0.5")))
         else:
             self.dut.data_out_ready.value = 1
 
     # Update ring buffer golden model
     async def run_ring_buffer_golden_model(self):
-        while True:
-            await RisingEdge(self.dut.clk)
-            if self.ring_buffer_data_ctr >= int(self.dut.g_data_out_width) and (self.dut.data_out_valid.value == 1 and self.dut.data_out_ready.value == 1):
-                await self.read_ring_buffer_golden_model()        
-
-            self.r1_one_bit_ring_fifo_array = self.r0_one_bit_ring_fifo_array.copy()
-
-            if self.dut.data_valid_in.value == 1:
-                data_to_write = int(self.dut.data_in.value)
-                await self.write_ring_buffer_golden_model(data_to_write)
-
-    # Read ring buffer golden model
-    async def read_ring_buffer_golden_model(self):
-        data_out_width = int(self.dut.g_data_out_width)
-        # read data_out_width bits from the ring buffer starting from the current read index
-        data_out_bin = ''.join(str(self.r1_one_bit_ring_fifo_array[(self.ring_buffer_rd_index + i) % int(self.dut.g_fifo_depth)]) for i in range(data_out_width))
-        # convert binary string to integer
-        data_out_value = int(data_out_bin[::-1], 2)  # Reverse back to original order for conversion
-        self.expected_data_out_value_array.append(data_out_value)        
-        # update the ring buffer index
-        self.ring_buffer_rd_index = (self.ring_buffer_rd_index + data_out_width) % int(self.dut.g_fifo_depth)
-        # update the ring buffer data counter (minimum is 0)
-        self.ring_buffer_data_ctr = max(self.ring_buffer_data_ctr - data_out_width, 0)
-
-    # Write ring buffer golden model
-    async def write_ring_buffer_golden_model(self, data_in_value):
-        data_in_width = int(self.dut.g_data_in_width)
-        # convert data_in_value to binary string and pad with leading zeros
-        data_in_bin = bin(data_in_value)[2:].zfill(data_in_width)[::-1]  # Reverse the string to match LSB to MSB order
-        # update the ring buffer array bit by bit
-        for i in range(data_in_width):
-            self.r0_one_bit_ring_fifo_array[(self.ring_buffer_wr_index+i) % int(self.dut.g_fifo_depth)] = int(data_in_bin[i])
-        # update the ring buffer index
-        self.ring_buffer_wr_index = (self.ring_buffer_wr_index + data_in_width) % int(self.dut.g_fifo_depth)
-        # update the ring buffer data counter (maximum is fifo_depth)
-        self.ring_buffer_data_ctr = min(self.ring_buffer_data_ctr + data_in_width, int(self.dut.g_fifo_depth))
+        golden_model = self.golden_model
+        data_out_width = golden_model.data_out_width
+        handshakes = Group(self.dut.data_out_valid, self.dut.data_out_ready, self.dut.data_valid_in)
+        data_in = reader(self.dut.data_in)
+        def on_edge():
+            data_out_valid, data_out_ready, data_valid_in = handshakes.sample()
+            if golden_model.data_ctr >= data_out_width and data_out_valid and data_out_ready:
+                golden_model.read()
+
+            golden_model.commit()
+
+            if data_valid_in:
+                golden_model.write(data_in())
+        self.clk.on_edge(on_edge)
 
     # Read ring buffer
     async def read_dut(self):
-        while True:
-            await RisingEdge(self.dut.clk)
-            if self.dut.data_out_valid.value == 1 and self.dut.data_out_ready.value == 1:
-                self.data_out_value_array.append(int(self.dut.data_out.value))
+        self.clk.add(StreamSink(self.dut.data_out, self.dut.data_out_valid, self.data_out_value_array.append, ready=self.dut.data_out_ready))
 
     # Write ring buffer
     async def write_dut(self, total_writes, fixed_cycle_wait = False, cycles_between_writes = 5):        
-        data_in_width = int(self.dut.g_data_in_width)
-        for i in range(total_writes):
-            # generate random data_in value (works for any data_in_width)
-            random_bits = np.random.randint(0, 2, size=data_in_width, dtype=np.uint8)
-            data_in_value = int(''.join(map(str, random_bits)), 2)
-            # write data_in value
-            await RisingEdge(self.dut.clk)
-            self.dut.data_in.value = data_in_value
-            self.dut.data_valid_in.value = 1
-            # waiting time between writes
-            if fixed_cycle_wait:
-                # wait for a fixed number of cycles
-                for j in range(cycles_between_writes):
-                    await RisingEdge(self.dut.clk)
-                    self.dut.data_valid_in.value = 0
-            else:
-                # wait random number of cycles between 0 and 20
-                wait_cycles = np.random.randint(0, 20)
-                for j in range(wait_cycles):
-                    await RisingEdge(self.dut.clk)
-                    self.dut.data_valid_in.value = 0
-        # deactivate data_valid_in
-        await RisingEdge(self.dut.clk)
-        self.dut.data_valid_in.value = 0
+        data_in_width = self.generics.g_data_in_width
+        # random data_in values (any data_in_width), reproducible from the logged seed
+        stimulus = Stimulus(data_in_width, total_writes, log=self.dut._log)
+        # waiting time between writes
+        if fixed_cycle_wait:
+            # fixed number of cycles
+            pattern = [0] * cycles_between_writes + [1]
+        else:
+            # random number of cycles between 0 and 19
+            pattern = gaps(total_writes, 0, 19)
+        # data_valid_in has no backpressure, every word is written in a single cycle
+        source = self.clk.add(StreamSource(self.dut.data_in, self.dut.data_valid_in, stimulus, pattern=pattern))
+        await source.wait()
+
+    # Wait until the golden model has no whole output word left, then check the DUT level
+    async def drain(self):
+        golden_model = self.golden_model
+        # Words read so far plus the whole words still in the model
+        expected = lambda: len(golden_model.data_out) + golden_model.data_ctr // golden_model.data_out_width
+        await drain(self.dut.clk, expected, lambda: len(self.data_out_value_array), idle=[(self.dut.data_out_valid, 0)], log=self.dut._log)
+        self.check_level()
+
+    # empty_out and full_out agree with the bits left in the golden model
+    def check_level(self):
+        bits = self.golden_model.data_ctr
+        empty, full = Group(self.dut.empty_out, self.dut.full_out).sample()
+        assert empty == (bits == 0), "empty_out is %d with %d unread bits in the golden model" % (empty, bits)
+        assert full == (bits == self.golden_model.fifo_depth), "full_out is %d with %d unread bits in the golden model" % (full, bits)
 
     # Check data
     async def check_data(self, total_reads):
@@ -152,11 +184,11 @@ async def master_random_valid_slave_always_ready(dut):
     cocotb.start_soon(tb.read_dut())
 
     # Write data to ring buffer
-    total_writes = 5 * int(dut.g_fifo_depth)
+    total_writes = 5 * tb.generics.g_fifo_depth
     await tb.write_dut(total_writes)
 
-    # Wait some time
-    await Timer(50*c_CLK_PERIOD, 'ns')
+    # Until the DUT delivered every word of the golden model and data_out_valid is low
+    await tb.drain()
 
     # Check data
     total_reads = len(tb.expected_data_out_value_array)
@@ -180,11 +212,11 @@ async def master_random_valid_slave_random_ready(dut):
     cocotb.start_soon(tb.read_dut())
 
     # Write data to ring buffer
-    total_writes = 5 * int(dut.g_fifo_depth)
+    total_writes = 5 * tb.generics.g_fifo_depth
     await tb.write_dut(total_writes)
 
-    # Wait some time
-    await Timer(50*c_CLK_PERIOD, 'ns')
+    # Until the DUT delivered every word of the golden model and data_out_valid is low
+    await tb.drain()
 
     # Check data
     total_reads = len(tb.expected_data_out_value_array)
@@ -208,11 +240,11 @@ async def master_always_valid_slave_always_ready(dut):
     cocotb.start_soon(tb.read_dut())
 
     # Write data to ring buffer
-    total_writes = 3 * int(dut.g_fifo_depth) 
+    total_writes = 3 * tb.generics.g_fifo_depth 
     await tb.write_dut(total_writes, fixed_cycle_wait = True, cycles_between_writes = 0)
 
-    # Wait some time
-    await Timer(50*c_CLK_PERIOD, 'ns')
+    # Until the DUT delivered every word of the golden model and data_out_valid is low
+    await tb.drain()
 
     # Check data
     total_reads = len(tb.expected_data_out_value_array)
@@ -234,11 +266,11 @@ async def master_always_valid_slave_random_ready(dut):
     cocotb.start_soon(tb.read_dut())
 
     # Write data to ring buffer
-    total_writes = 3 * int(dut.g_fifo_depth) 
+    total_writes = 3 * tb.generics.g_fifo_depth 
     await tb.write_dut(total_writes, fixed_cycle_wait = True, cycles_between_writes = 0)
 
-    # Wait some time
-    await Timer(50*c_CLK_PERIOD, 'ns')
+    # Until the DUT delivered every word of the golden model and data_out_valid is low
+    await tb.drain()
 
     # Check data
     total_reads = len(tb.expected_data_out_value_array)
@@ -248,13 +280,41 @@ async def master_always_valid_slave_random_ready(dut):
 # ==============================================================================
 @cocotb.test(skip = (os.getenv("TEST_NAME") not in ["functional_coverage", "test_all"]), stage = 5)
 async def functional_coverage(dut):
-    # Sets the coverage yml file
-    cg_group = coverage_db["one_bit_ring_fifo"]
-    dut._log.info(f"Functional coverage percentage: {cg_group.cover_percentage:.2f}%")  # Log the coverage level of the whole covergroup
+    # Coverage files of this run (RESULT_PATH), merged by coverage_report.py
+    coverage_report.export(dut._log, "one_bit_ring_fifo")
+
+    raise cocotb.result.TestSuccess("Test passed")
 
-    coverage_file = os.path.join(
-        os.getenv("RESULT_PATH", "../../doc/"), "functional_coverage.yml"
-    )
-    coverage_db.export_to_yaml(filename=coverage_file)
+# ==============================================================================
+@cocotb.test(skip = os.getenv("BENCHMARK_FILE") is None, stage = 6)
+async def benchmark(dut):
 
-    raise cocotb.result.TestSuccess("Test passed")
\ No newline at end of file
+    # TB class
+    tb = TB(dut)
+    await tb.reset()
+
+    # Traffic and length set by runner.run_benchmark(). data_valid_in has no
+    # backpressure, latencies are only meaningful while the ring does not overflow.
+    data_in_width = tb.generics.g_data_in_width
+    data_out_width = tb.generics.g_data_out_width
+    words = int(os.getenv("BENCHMARK_WORDS", 2000))
+    bench = Benchmark(data_in_width, data_out_width, c_CLK_PERIOD, c_CLK_PERIOD)
+    def accepted(word):
+        bench.input()
+    def received(word):
+        tb.data_out_value_array.append(word)
+        bench.output()
+
+    # Run ring buffer golden model
+    cocotb.start_soon(tb.run_ring_buffer_golden_model())
+    tb.clk.add(StreamSink(dut.data_out, dut.data_out_valid, received, ready=dut.data_out_ready, pattern=from_env("SINK_TRAFFIC", "always")))
+    source = tb.clk.add(StreamSource(dut.data_in, dut.data_valid_in, Stimulus(data_in_width, words, log=dut._log), pattern=from_env("SOURCE_TRAFFIC", "always"), on_accept=accepted))
+    await source.wait()
+
+    # Until the DUT delivered every word of the golden model and data_out_valid is low
+    await tb.drain()
+
+    # Check data
+    total_reads = len(tb.expected_data_out_value_array)
+    await tb.check_data(total_reads)
+    bench.write(log=dut._log)
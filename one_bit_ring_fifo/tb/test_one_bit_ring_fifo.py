@@ -1,9 +1,14 @@
-from    cocotb_test.simulator   import run
 import  pytest
 import  os
 import  glob
+import  sys
 
 current_dir = os.path.dirname(__file__)
+# Shared helpers: common/ of the repository, or the fifo_common package when installed
+COMMON_TB = [os.path.join(current_dir, path) for path in ("../../common/tb", "../node_modules/@curbeloangles-dev/fifo_common/tb", "../../fifo_common/tb")]
+sys.path.insert(0, next((path for path in COMMON_TB if os.path.isdir(path)), COMMON_TB[0]))
+from    runner  import run_sim, SIMULATORS
+
 vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
 
 @pytest.mark.parametrize(
@@ -13,16 +18,14 @@ vhdl_src = glob.glob(os.path.join(current_dir, "../src/*.vhd"))
                     {"g_data_in_width": "16",   "g_data_out_width": "20",   "g_fifo_depth": "32"},
                     {"g_data_in_width": "20",   "g_data_out_width": "16",   "g_fifo_depth": "32"},
                     {"g_data_in_width": "32",   "g_data_out_width": "10",   "g_fifo_depth": "128"},
-                    {"g_data_in_width": "64",   "g_data_out_width": "8",    "g_fifo_depth": "256"}
+                    {"g_data_in_width": "64",   "g_data_out_width": "8",    "g_fifo_depth": "256"},
+                    {"g_data_in_width": "32",   "g_data_out_width": "48",   "g_fifo_depth": "4096"}
                     ])
-@pytest.mark.skipif(os.getenv("SIM") != "ghdl", reason="")
+@pytest.mark.skipif(os.getenv("SIM") not in SIMULATORS, reason="")
 def test_one_bit_ring_fifo_tb_ghdl(parameters):
-    run(
+    run_sim(
         vhdl_sources=vhdl_src,                  # vhdl sources
         toplevel="one_bit_ring_fifo",           # top level HDL
         module="one_bit_ring_fifo_tb",          # name of cocotb test module
-        toplevel_lang="vhdl",
-        parameters=parameters,
-        extra_env=parameters, 
-        sim_build="sim_build"
+        parameters=parameters
     )
\ No newline at end of file